@@ -44,6 +44,12 @@ def create_app(config_name='default'):
     app.jinja_env.filters['nl2br'] = nl2br
     # --- ▲ 커스텀 Jinja2 필터 등록 끝 ▲ ---
 
+    # 지난 예약 자동 처리 스레드 (설정 시에만, 디버그 리로더의 감시 프로세스에서는 실행 안 함)
+    sweep_interval = app.config.get('BOOKING_SWEEP_INTERVAL_SECONDS') or 0
+    if sweep_interval > 0 and not app.testing and (not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        from .services.booking_sweeper import start_periodic_sweeper
+        start_periodic_sweeper(app, sweep_interval)
+
     # 임시 메인 라우트
     @app.route('/')
     def index():
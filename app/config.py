@@ -19,6 +19,19 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False # SQLAlchemy 이벤트 처리 안 함 (성능 향상)
     BOOTSTRAP_SERVE_LOCAL = False # Bootstrap 로컬 파일 대신 CDN 사용 (True로 변경 시 로컬 파일 필요)
 
+    # 지난 예약 자동 이용 완료 처리 (0이면 앱 내부 주기 실행 안 함, `flask sweep-bookings` 로 수동/cron 실행 가능)
+    BOOKING_SWEEP_INTERVAL_SECONDS = int(os.environ.get('BOOKING_SWEEP_INTERVAL_SECONDS') or 0)
+    BOOKING_SWEEP_GRACE_MINUTES = int(os.environ.get('BOOKING_SWEEP_GRACE_MINUTES') or 30) # 종료 후 유예 시간
+
+    # 프로/타석/이용권 템플릿 선택지 캐시: 이 간격(초)마다 DB 버전 스탬프를 확인 (0이면 매번 확인)
+    REFERENCE_CACHE_CHECK_SECONDS = float(os.environ.get('REFERENCE_CACHE_CHECK_SECONDS') or 5)
+
+    # 관리자 JSON API 직렬화 응답 LRU 캐시 항목 수 (프로세스별)
+    API_PAYLOAD_CACHE_SIZE = int(os.environ.get('API_PAYLOAD_CACHE_SIZE') or 256)
+
+    # 로그인 사용자(user_loader) 캐시: 다른 워커의 권한 변경은 최대 이 시간(초) 후 반영
+    PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS') or 60)
+
     # 향후 추가될 설정들...
     # MAIL_SERVER = os.environ.get('MAIL_SERVER')
     # MAIL_PORT = int(os.environ.get('MAIL_PORT') or 25)
@@ -40,9 +53,18 @@ class ProductionConfig(Config):
     # 데이터베이스 URL도 운영 DB로 변경 필요
 
 
+class TestingConfig(Config):
+    """테스트/벤치마크 환경 설정 (메모리 DB)"""
+    TESTING = True
+    BOOKING_SWEEP_INTERVAL_SECONDS = 0
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    WTF_CSRF_ENABLED = False
+
+
 # 설정 이름과 클래스를 매핑
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
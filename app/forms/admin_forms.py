@@ -1,11 +1,15 @@
 # app/forms/admin_forms.py
 from wtforms import StringField, SubmitField, SelectField, BooleanField, TextAreaField, PasswordField, IntegerField, DateField, DateTimeLocalField
 from flask_wtf import FlaskForm
-from wtforms.widgets import DateInput, DateTimeLocalInput
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from wtforms.widgets import DateInput, DateTimeLocalInput, HiddenInput
 from wtforms.validators import DataRequired, Length, ValidationError, Email, Optional, NumberRange
+from app.extensions import db
 from app.models import Pro, Booth, User, TicketTemplate, Ticket, Holding
-from app.models.enums import BoothSystemType, BookingType # Enum 임포트
+from app.models.enums import BoothSystemType, BookingType, BookingStatus # Enum 임포트
 from app.models.ticket_template import TicketCategory 
+from app.services.user_service import member_search_label
+from app.services.reference_cache import pro_choices
 
 
 def coerce_int_or_none(value):
@@ -17,6 +21,27 @@ def coerce_int_or_none(value):
         return None
 
 
+class MemberField(IntegerField):
+    """
+    회원 ID 하나만 받는 필드.
+    전체 회원 choices 대신 자동완성 검색(/admin/api/users/search)으로 선택하고,
+    제출된 ID 가 실제 회원인지만 확인합니다.
+    """
+    widget = HiddenInput()
+
+    def pre_validate(self, form):
+        if self.data is not None and db.session.get(User, self.data) is None:
+            raise ValidationError('선택한 회원을 찾을 수 없습니다.')
+
+    @property
+    def member_label(self):
+        """폼 재표시 시 검색창에 채울 회원 표시 문자열"""
+        if self.data is None:
+            return ''
+        user = db.session.get(User, self.data)
+        return member_search_label(user) if user else ''
+
+
 class BoothForm(FlaskForm):
     """타석(부스) 등록/수정 폼"""
     name = StringField('타석 이름', validators=[
@@ -186,8 +211,7 @@ class TicketTemplateForm(FlaskForm):
 
 class TicketIssueForm(FlaskForm):
     """이용권 발급 폼"""
-    user_id = SelectField('회원 선택', coerce=int, validators=[DataRequired(message="회원을 선택해주세요.")])
-    # user_id의 choices는 라우트에서 동적으로 채워줍니다.
+    user_id = MemberField('회원 선택', validators=[DataRequired(message="회원을 선택해주세요.")])
 
     ticket_template_id = SelectField('템플릿 선택 (선택 사항)', coerce=coerce_int_or_none, validators=[Optional()])
     # ticket_template_id의 choices도 라우트에서 동적으로 채워줍니다.
@@ -236,6 +260,14 @@ class TicketIssueForm(FlaskForm):
         #         return False
         return True
     
+class TicketBulkIssueForm(FlaskForm):
+    """이용권 일괄 발급 (CSV 업로드) 폼"""
+    csv_file = FileField('CSV 파일', validators=[FileRequired(message="CSV 파일을 선택해주세요."), FileAllowed(['csv'], 'CSV 파일만 업로드할 수 있습니다.')],
+                         description="헤더: phone,template,start_date,price,memo (template 은 템플릿 ID 또는 이름, price/memo 는 선택)")
+    dry_run = BooleanField('검증만 하기 (저장하지 않음)', default=False)
+    submit = SubmitField('일괄 발급')
+
+
 class TicketEditForm(FlaskForm):
     """발급된 이용권 수정 폼"""
     # 수정 가능 필드
@@ -261,9 +293,8 @@ class TicketEditForm(FlaskForm):
     # 폼 초기화 시 pro_id choices 로딩 필요
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # 프로 선택지 동적 로딩
-        self.pro_id.choices = [('', '담당 프로 없음')] + \
-                              [(p.id, p.name) for p in Pro.query.order_by(Pro.name).all()]
+        # 프로 선택지 동적 로딩 (기준 데이터 캐시)
+        self.pro_id.choices = [('', '담당 프로 없음')] + pro_choices()
         
 class HoldingForm(FlaskForm):
     """이용권 홀딩 추가/수정 폼"""
@@ -285,7 +316,7 @@ class HoldingForm(FlaskForm):
 class BookingForm(FlaskForm):
     """관리자 예약 생성/수정 폼"""
     # coerce 함수 적용
-    user_id = SelectField('회원', coerce=coerce_int_or_none, validators=[DataRequired(message="회원을 선택해주세요.")])
+    user_id = MemberField('회원', validators=[DataRequired(message="회원을 선택해주세요.")])
     booth_id = SelectField('타석', coerce=coerce_int_or_none, validators=[DataRequired(message="타석을 선택해주세요.")])
     booking_type = SelectField('예약 유형', coerce=BookingType, validators=[DataRequired()],
                                choices=[(t.value, t.value) for t in BookingType], # <<< 수정!
@@ -334,3 +365,49 @@ class BookingForm(FlaskForm):
             if field.data is not None and field.data < 30:
                  raise ValidationError('레슨 예약 시 최소 이용 시간은 30분입니다.')
     # --- ▲ 레슨 예약 시 최소 이용 시간 검증 끝 ▲ ---
+
+
+class RecurringBookingForm(FlaskForm):
+    """관리자 반복(매주) 레슨 예약 폼"""
+    user_id = MemberField('회원', validators=[DataRequired(message="회원을 선택해주세요.")])
+    booth_id = SelectField('타석', coerce=coerce_int_or_none, validators=[DataRequired(message="타석을 선택해주세요.")])
+    pro_id = SelectField('담당 프로', coerce=coerce_int_or_none, validators=[DataRequired(message="담당 프로를 선택해주세요.")])
+    start_date = DateField('첫 레슨 날짜', validators=[DataRequired()], format='%Y-%m-%d', widget=DateInput())
+    start_hour = SelectField('시작 시', coerce=int, validators=[Optional()],
+                             choices=[(h, f"{h:02d}") for h in range(0, 24)])
+    start_minute = SelectField('시작 분', coerce=int, validators=[Optional()],
+                               choices=[(m, f"{m:02d}") for m in range(0, 60, 10)])
+    duration = SelectField('이용 시간 (분)', coerce=int, validators=[DataRequired()],
+                           choices=[(m, f"{m}분") for m in range(30, 181, 10)],
+                           default=70)
+    weeks = IntegerField('반복 횟수 (주)', default=8, validators=[DataRequired(), NumberRange(min=2, max=12, message="반복 횟수는 2~12주 사이로 입력해주세요.")])
+    lesson_count_to_use = IntegerField('회당 레슨 횟수', default=1, validators=[Optional(), NumberRange(min=1)])
+    memo = TextAreaField('메모 (선택 사항)')
+    submit = SubmitField('반복 예약 생성')
+
+
+def coerce_booking_status_or_none(value):
+    if not value:
+        return None
+    if isinstance(value, BookingStatus):
+        return value
+    try:
+        return BookingStatus[value]
+    except KeyError:
+        return None
+
+
+class BookingFilterForm(FlaskForm):
+    """예약 목록 필터 폼 (GET 파라미터)"""
+    class Meta:
+        csrf = False # 조회용 GET 폼
+
+    date_from = DateField('시작일', validators=[Optional()], format='%Y-%m-%d', widget=DateInput())
+    date_to = DateField('종료일', validators=[Optional()], format='%Y-%m-%d', widget=DateInput())
+    booth_id = SelectField('타석', coerce=coerce_int_or_none, validators=[Optional()])
+    pro_id = SelectField('프로', coerce=coerce_int_or_none, validators=[Optional()])
+    status = SelectField('상태', coerce=coerce_booking_status_or_none, validators=[Optional()],
+                         choices=[('', '전체 상태')] + [(s.name, s.value) for s in BookingStatus])
+    member = StringField('회원 (이름 또는 연락처 뒷자리)', validators=[Optional(), Length(max=100)])
+    # booth_id, pro_id 의 choices 는 라우트에서 동적으로 채워줍니다.
+
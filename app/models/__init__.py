@@ -7,3 +7,5 @@ from .ticket_template import TicketTemplate, TicketCategory
 from .ticket import Ticket
 from .holding import Holding
 from .booking import Booking
+from .cache_version import CacheVersion
+from .daily_stat import DailyStat
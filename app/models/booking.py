@@ -27,6 +27,16 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
+    __table_args__ = (
+        # 지난 예약 일괄 처리(sweep-bookings) 조회용
+        db.Index('ix_booking_status_end_time', 'status', 'end_time'),
+        # 예약 목록 필터 + (start_time, id) 커서 페이지네이션용
+        db.Index('ix_booking_booth_start_time', 'booth_id', 'start_time'),
+        db.Index('ix_booking_pro_start_time', 'pro_id', 'start_time'),
+        db.Index('ix_booking_user_start_time', 'user_id', 'start_time'),
+        db.Index('ix_booking_status_start_time', 'status', 'start_time'),
+    )
+
     # Relationships
     user = db.relationship('User', backref=db.backref('bookings', lazy='dynamic'))
     booth = db.relationship('Booth', backref=db.backref('bookings', lazy='dynamic'))
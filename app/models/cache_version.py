@@ -0,0 +1,25 @@
+# app/models/cache_version.py
+from sqlalchemy import event, insert
+from app.extensions import db
+
+REFERENCE_CACHE_NAME = 'reference_data' # 기준 데이터(프로/타석/템플릿) 선택지 캐시
+
+class CacheVersion(db.Model):
+    """
+    프로세스 내 캐시의 공유 버전 스탬프.
+    데이터 변경 시 version 을 올리면 다른 워커(프로세스)도 다음 확인 때 캐시를 다시 읽습니다.
+    """
+    __tablename__ = 'cache_version'
+
+    name = db.Column(db.String(50), primary_key=True) # 캐시 이름 (예: 'reference_data')
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
+
+
+# 버전 증가는 UPDATE 만 하므로 db.create_all() 시에도 행을 만들어 둠 (마이그레이션 환경은 alembic 에서 처리)
+@event.listens_for(CacheVersion.__table__, 'after_create')
+def _seed_cache_versions(target, connection, **kw):
+    connection.execute(insert(target).values(name=REFERENCE_CACHE_NAME, version=0))
@@ -0,0 +1,25 @@
+# app/models/daily_stat.py
+from app.extensions import db
+
+class DailyStat(db.Model):
+    """
+    일별 집계 (매출/타석 이용/레슨 소진). 예약·이용권 서비스에서 증감하고 rebuild-daily-stats 로 재계산합니다.
+    키 컬럼은 NULL 대신 0 / '' 를 사용합니다 (UNIQUE 충돌 기반 UPSERT 를 위해).
+    - 예약 집계 행: booth_id = 타석, category = 사용한 타석 이용권의 대분류
+    - 판매 집계 행: booth_id = 0, category = 판매한 이용권의 대분류
+    """
+    __tablename__ = 'daily_stats'
+
+    stat_date = db.Column(db.Date, primary_key=True) # 예약 시작일 / 이용권 발급일
+    booth_id = db.Column(db.Integer, primary_key=True, default=0) # 0: 타석 무관 (이용권 판매)
+    pro_id = db.Column(db.Integer, primary_key=True, default=0) # 0: 담당 프로 없음
+    category = db.Column(db.String(20), primary_key=True, default='') # TicketCategory 이름, '': 없음
+
+    booking_count = db.Column(db.Integer, nullable=False, default=0) # 예약 수 (취소 제외)
+    booked_minutes = db.Column(db.Integer, nullable=False, default=0) # 예약 시간 합계 (분)
+    lesson_count = db.Column(db.Integer, nullable=False, default=0) # 소진 레슨 횟수
+    ticket_count = db.Column(db.Integer, nullable=False, default=0) # 판매 이용권 수
+    revenue = db.Column(db.Integer, nullable=False, default=0) # 판매 금액 합계 (원)
+
+    def __repr__(self):
+        return f'<DailyStat {self.stat_date} booth={self.booth_id} pro={self.pro_id} {self.category}>'
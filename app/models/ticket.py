@@ -1,6 +1,7 @@
 # app/models/ticket.py
 import datetime
 from app.extensions import db
+from .ticket_template import TicketCategory
 # from .ticket_template import TicketTemplate # TicketTemplate과의 관계 설정 시 필요 (아래에서 추가)
 # from .user import User # User와의 관계 설정 시 필요
 # from .pro import Pro # Pro와의 관계 설정 시 필요
@@ -11,7 +12,8 @@ class Ticket(db.Model):
     ticket_template_id = db.Column(db.Integer, db.ForeignKey('ticket_template.id'), nullable=True, index=True) # 어떤 템플릿 기반인지 (템플릿 없이 직접 생성도 가능하도록 nullable)
 
     name = db.Column(db.String(150), nullable=False) # 실제 발급된 이용권 이름 (예: "홍길동님 3개월권", "기간권-1개월 (레슨 5회)")
-    # category = db.Column(db.Enum(TicketCategory)) # template 에서 가져오거나, 직접 설정도 가능하도록 할 수 있음
+    # 발급 시 템플릿의 대분류를 복사해 둠 (예약 시 template 조인 없이 이용권 검색용, 템플릿 미사용 시 None)
+    category = db.Column(db.Enum(TicketCategory), nullable=True)
 
     issue_date = db.Column(db.Date, nullable=False, default=datetime.date.today) # 발급일
     start_date = db.Column(db.Date, nullable=False) # 이용 시작일
@@ -34,6 +36,16 @@ class Ticket(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
+    __table_args__ = (
+        # 예약 시 이용권 검색 (회원 + 활성 + 대분류 + 만료일 순)
+        db.Index('ix_ticket_user_active_category_expiry', 'user_id', 'is_active', 'category', 'expiry_date'),
+        # 정산용 판매 내역 내보내기 (발급일 범위 + id 순)
+        db.Index('ix_ticket_issue_date', 'issue_date', 'id'),
+        # 잔여 횟수는 음수가 될 수 없음 (조건부 UPDATE 차감과 함께 동시 예약 시 초과 사용 방지)
+        db.CheckConstraint('remaining_taseok_count >= 0', name='ck_ticket_remaining_taseok_count_nonnegative'),
+        db.CheckConstraint('remaining_lesson_count >= 0', name='ck_ticket_remaining_lesson_count_nonnegative'),
+    )
+
     # Relationships
     user = db.relationship('User', backref=db.backref('tickets', lazy='dynamic')) # User와는 backref 유지 가능
     ticket_template = db.relationship('TicketTemplate', backref=db.backref('issued_tickets', lazy='dynamic')) # Template과도 backref 유지 가능
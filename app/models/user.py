@@ -1,5 +1,7 @@
 # app/models/user.py 수정
 import datetime
+import sqlite3
+from sqlalchemy import event, DDL
 # from app import db, login_manager # <- 기존 코드 주석 처리 또는 삭제
 from app.extensions import db, login_manager # <- 수정된 임포트
 from flask_login import UserMixin
@@ -19,7 +21,7 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(20), unique=True, nullable=False, index=True)
-    phone_last4 = db.Column(db.String(4))
+    phone_last4 = db.Column(db.String(4), index=True) # 뒷자리 검색용
     password_hash = db.Column(db.String(255))
     is_admin = db.Column(db.Boolean, default=False)
     master_expiry_date = db.Column(db.Date, nullable=True)
@@ -27,6 +29,12 @@ class User(UserMixin, db.Model):
     memo = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     last_login_at = db.Column(db.DateTime, nullable=True)
+    # 회원/보유 이용권/홀딩 변경 시 증가하는 버전 (관리자 JSON API 의 ETag 용, services/api_cache.py 참고)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.CheckConstraint('remaining_lesson_total >= 0', name='ck_user_remaining_lesson_total_nonnegative'),
+    )
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -45,7 +53,45 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.name} ({self.phone})>'
 
+# --- 회원 검색용 FTS5(trigram) 색인 (SQLite 전용) ---
+# user 테이블을 content 로 쓰는 외부 콘텐츠 FTS 테이블이며 트리거로 동기화합니다.
+# 주의: batch_alter_table 로 user 테이블을 재생성하는 마이그레이션은 트리거도 다시 만들어야 합니다.
+USER_SEARCH_TABLE = 'user_search'
+USER_SEARCH_MIN_SQLITE_VERSION = (3, 34, 0) # trigram 토크나이저 지원 버전
+
+USER_SEARCH_CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5("
+    "name, phone, memo, content='user', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON user BEGIN "
+    "INSERT INTO user_search(rowid, name, phone, memo) VALUES (new.id, new.name, new.phone, new.memo); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON user BEGIN "
+    "INSERT INTO user_search(user_search, rowid, name, phone, memo) VALUES ('delete', old.id, old.name, old.phone, old.memo); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF name, phone, memo ON user BEGIN "
+    "INSERT INTO user_search(user_search, rowid, name, phone, memo) VALUES ('delete', old.id, old.name, old.phone, old.memo); "
+    "INSERT INTO user_search(rowid, name, phone, memo) VALUES (new.id, new.name, new.phone, new.memo); END",
+]
+USER_SEARCH_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS user_search_au",
+    "DROP TRIGGER IF EXISTS user_search_ad",
+    "DROP TRIGGER IF EXISTS user_search_ai",
+    "DROP TABLE IF EXISTS user_search",
+]
+
+
+def _sqlite_supports_trigram(ddl, target, bind, **kw):
+    return sqlite3.sqlite_version_info >= USER_SEARCH_MIN_SQLITE_VERSION
+
+# db.create_all() / drop_all() 시에도 색인이 함께 생성/삭제되도록 (마이그레이션 환경은 alembic 에서 처리)
+for _sql in USER_SEARCH_CREATE_SQL:
+    event.listen(User.__table__, 'after_create',
+                 DDL(_sql).execute_if(dialect='sqlite', callable_=_sqlite_supports_trigram))
+for _sql in USER_SEARCH_DROP_SQL:
+    event.listen(User.__table__, 'before_drop', DDL(_sql).execute_if(dialect='sqlite'))
+
+
 # user_loader 를 클래스 정의 밖으로 이동하고 User 클래스를 참조하도록 수정
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    # 매 요청 User 행 조회 대신 캐시된 가벼운 Principal(id, name, is_admin) 사용
+    from app.services.principal_cache import load_principal
+    return load_principal(int(user_id))
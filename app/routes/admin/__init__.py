@@ -24,3 +24,5 @@ from . import views_user
 from . import views_ticket_template
 from . import views_ticket
 from . import views_booking
+from . import views_export
+from . import views_report
@@ -5,27 +5,80 @@ from . import bp # admin 블루프린트
 from app.extensions import db
 from app.models import User, Booth, Pro, Ticket, Booking # 필요한 모델 임포트
 from app.models.enums import BookingType, BookingStatus # Enum 임포트
-# from app.forms.admin_forms import BookingForm, BookingFilterForm # 나중에 만들 폼 임포트
-from app.services.booking_service import create_booking, cancel_booking # 서비스 함수 임포트
-from sqlalchemy import or_ # 검색용
-from app.forms.admin_forms import BookingForm # BookingForm 임포트
+from app.services.booking_service import create_booking, cancel_booking, get_day_availability, create_recurring_booking, filter_bookings_query # 서비스 함수 임포트
+from app.services.reference_cache import booth_choices, pro_choices
+from sqlalchemy import or_, and_ # 검색용
+from sqlalchemy.orm import joinedload
+from app.forms.admin_forms import BookingForm, RecurringBookingForm, BookingFilterForm # BookingForm 임포트
 
 
 
-# 예약 목록 조회 (기본 틀)
+# 예약 목록 커서: "시작시간(ISO)_ID" 형식 (keyset/seek 페이지네이션용)
+def _encode_booking_cursor(booking):
+    return f"{booking.start_time.isoformat()}_{booking.id}"
+
+def _decode_booking_cursor(value):
+    try:
+        start_str, id_str = value.rsplit('_', 1)
+        return datetime.datetime.fromisoformat(start_str), int(id_str)
+    except (ValueError, AttributeError):
+        return None
+
+
+# 예약 목록 조회 (필터 + 커서 기반 페이지네이션)
 @bp.route('/bookings')
 def list_bookings():
-    # TODO: 필터링 및 페이지네이션 구현
-    page = request.args.get('page', 1, type=int)
     per_page = 15
-
-    # 예시: 모든 예약을 최신순으로
-    pagination = Booking.query.order_by(Booking.start_time.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    bookings = pagination.items
+    form = BookingFilterForm(formdata=request.args)
+    form.booth_id.choices = [('', '전체 타석')] + booth_choices()
+    form.pro_id.choices = [('', '전체 프로')] + pro_choices()
+    form.validate()
+
+    query = filter_bookings_query(
+        date_from=form.date_from.data,
+        date_to=form.date_to.data,
+        booth_id=form.booth_id.data,
+        pro_id=form.pro_id.data,
+        status=form.status.data,
+        user_id=request.args.get('user_id', type=int),
+        member=(form.member.data or '').strip() or None
+    ).options(
+        joinedload(Booking.user), joinedload(Booking.booth), joinedload(Booking.pro) # 목록에서 쓰는 관계를 한 번에 로드
+    )
+
+    # OFFSET/COUNT 대신 (start_time, id) 기준 seek: 깊은 페이지도 같은 비용
+    after = _decode_booking_cursor(request.args.get('after')) # 다음 페이지 (더 과거)
+    before = _decode_booking_cursor(request.args.get('before')) # 이전 페이지 (더 최근)
+    if before:
+        start_time, booking_id = before
+        query = query.filter(or_(Booking.start_time > start_time,
+                                 and_(Booking.start_time == start_time, Booking.id > booking_id)))
+        rows = query.order_by(Booking.start_time.asc(), Booking.id.asc()).limit(per_page + 1).all()
+        has_more_recent = len(rows) > per_page
+        bookings = list(reversed(rows[:per_page]))
+        has_older = True
+    else:
+        if after:
+            start_time, booking_id = after
+            query = query.filter(or_(Booking.start_time < start_time,
+                                     and_(Booking.start_time == start_time, Booking.id < booking_id)))
+        rows = query.order_by(Booking.start_time.desc(), Booking.id.desc()).limit(per_page + 1).all()
+        has_older = len(rows) > per_page
+        bookings = rows[:per_page]
+        has_more_recent = after is not None
+
+    # 페이지 이동 링크에 유지할 필터 파라미터
+    filter_args = {k: v for k, v in request.args.items() if k not in ('after', 'before', 'page') and v}
+    next_url = url_for('admin.list_bookings', after=_encode_booking_cursor(bookings[-1]), **filter_args) if has_older and bookings else None
+    prev_url = url_for('admin.list_bookings', before=_encode_booking_cursor(bookings[0]), **filter_args) if has_more_recent and bookings else None
 
     return render_template('booking/list_bookings.html',
                            bookings=bookings,
-                           pagination=pagination,
+                           form=form,
+                           next_url=next_url,
+                           prev_url=prev_url,
+                           is_filtered=bool(filter_args),
+                           filter_args=filter_args, # 내보내기 링크에 같은 필터 적용
                            title="전체 예약 목록",
                            BookingStatus=BookingStatus)
 
@@ -34,14 +87,9 @@ def list_bookings():
 def create_booking_form():
     form = BookingForm() # 폼 객체 생성
 
-    users = User.query.order_by(User.name).all()
-    booths = Booth.query.filter_by(is_available=True).order_by(Booth.name).all()
-    pros = Pro.query.order_by(Pro.name).all()
-
-    # SelectField choices 동적 할당 (이제 users, booths, pros 사용 가능)
-    form.user_id.choices = [('', '--- 회원 선택 ---')] + [(u.id, f"{u.name} ({u.phone})") for u in users]
-    form.booth_id.choices = [('', '--- 타석 선택 ---')] + [(b.id, b.name) for b in booths]
-    form.pro_id.choices = [('', '--- 프로 선택 (레슨 시) ---')] + [(p.id, p.name) for p in pros]
+    # SelectField choices 동적 할당 (회원은 자동완성 검색, 타석/프로는 기준 데이터 캐시)
+    form.booth_id.choices = [('', '--- 타석 선택 ---')] + booth_choices(available_only=True)
+    form.pro_id.choices = [('', '--- 프로 선택 (레슨 시) ---')] + pro_choices()
 
     # 오늘 날짜를 시작 날짜 기본값으로 설정 (선택적)
     if not form.start_date.data:
@@ -59,9 +107,8 @@ def create_booking_post():
     form = BookingForm() # POST 데이터로 폼 인스턴스 생성
 
     # SelectField choices 다시 로드 (유효성 검증 실패 시 폼 다시 보여줄 때 필요)
-    form.user_id.choices = [('', '--- 회원 선택 ---')] + [(u.id, f"{u.name} ({u.phone})") for u in User.query.order_by(User.name).all()]
-    form.booth_id.choices = [('', '--- 타석 선택 ---')] + [(b.id, b.name) for b in Booth.query.filter_by(is_available=True).order_by(Booth.name).all()]
-    form.pro_id.choices = [('', '--- 프로 선택 (레슨 시) ---')] + [(p.id, p.name) for p in Pro.query.order_by(Pro.name).all()]
+    form.booth_id.choices = [('', '--- 타석 선택 ---')] + booth_choices(available_only=True)
+    form.pro_id.choices = [('', '--- 프로 선택 (레슨 시) ---')] + pro_choices()
 
     if form.validate_on_submit():
         # --- ▼ 날짜 및 시간 데이터 조합 ▼ ---
@@ -116,6 +163,65 @@ def create_booking_post():
 
 
 
+# 관리자 반복(매주) 레슨 예약 생성
+@bp.route('/bookings/create_recurring', methods=['GET', 'POST'])
+def create_recurring_booking_view():
+    form = RecurringBookingForm()
+    form.booth_id.choices = [('', '--- 타석 선택 ---')] + booth_choices(available_only=True)
+    form.pro_id.choices = [('', '--- 프로 선택 ---')] + pro_choices()
+
+    conflicts = []
+    if request.method == 'GET' and not form.start_date.data:
+        form.start_date.data = datetime.date.today()
+
+    if form.validate_on_submit():
+        first_start = datetime.datetime.combine(
+            form.start_date.data,
+            datetime.time(hour=form.start_hour.data or 0, minute=form.start_minute.data or 0)
+        )
+        success, message, new_bookings, conflicts = create_recurring_booking(
+            user_id=form.user_id.data,
+            booth_id=form.booth_id.data,
+            pro_id=form.pro_id.data,
+            first_start=first_start,
+            duration=form.duration.data,
+            weeks=form.weeks.data,
+            memo=form.memo.data,
+            lesson_count_to_use=form.lesson_count_to_use.data or 1
+        )
+        if success:
+            flash(message, 'success')
+            return redirect(url_for('admin.view_user', user_id=form.user_id.data))
+        flash(message, 'danger')
+    elif request.method == 'POST':
+        flash("입력 값을 확인해주세요.", "warning")
+
+    return render_template('booking/create_recurring_booking_form.html',
+                           title="반복 레슨 예약 생성",
+                           form=form,
+                           conflicts=conflicts)
+
+
+# 일자별 타석 예약 가능 시간 조회 API (예약 화면에서 사용)
+@bp.route('/api/availability')
+def get_availability():
+    date_str = request.args.get('date', '')
+    duration = request.args.get('duration', 70, type=int)
+    try:
+        target_date = datetime.date.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'date 는 YYYY-MM-DD 형식이어야 합니다.'}), 400
+    if not duration or duration <= 0 or duration > 24 * 60:
+        return jsonify({'error': 'duration 값이 올바르지 않습니다.'}), 400
+
+    booths = get_day_availability(target_date, duration)
+    return jsonify({
+        'date': target_date.isoformat(),
+        'duration': duration,
+        'booths': booths
+    })
+
+
 # 예약 상세 보기 (필요시)
 @bp.route('/bookings/<int:booking_id>')
 def view_booking(booking_id):
@@ -2,6 +2,7 @@
 from flask import render_template, redirect, url_for, flash, request
 from . import bp # admin 블루프린트 객체
 from app.extensions import db
+from app.services.reference_cache import bump_reference_version
 from app.models import Booth
 from app.models.enums import BoothSystemType, BoothStatus # Enum 필요시 사용
 from app.forms.admin_forms import BoothForm
@@ -29,6 +30,7 @@ def add_booth():
         )
         db.session.add(booth)
         try:
+            bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
             db.session.commit()
             flash(f'타석 "{booth.name}" 이(가) 성공적으로 추가되었습니다.', 'success')
             return redirect(url_for('admin.list_booths'))
@@ -53,6 +55,7 @@ def edit_booth(booth_id):
         booth.is_available = form.is_available.data
         booth.memo = form.memo.data
         try:
+            bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
             db.session.commit()
             flash(f'타석 "{booth.name}" 의 정보가 수정되었습니다.', 'success')
             return redirect(url_for('admin.list_booths'))
@@ -87,6 +90,7 @@ def delete_booth(booth_id):
     try:
         booth_name = booth.name
         db.session.delete(booth)
+        bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
         db.session.commit()
         flash(f'타석 "{booth_name}" 이(가) 삭제되었습니다.', 'success')
     except Exception as e:
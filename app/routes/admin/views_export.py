@@ -0,0 +1,67 @@
+# app/routes/admin/views_export.py
+# 정산용 내보내기 (예약 / 이용권 판매 내역, CSV 또는 JSON Lines 스트리밍)
+import datetime
+from flask import Response, stream_with_context, request, abort
+from . import bp # admin 블루프린트
+from app.forms.admin_forms import BookingFilterForm
+from app.services.export_service import (
+    booking_export_rows, ticket_export_rows, stream_export,
+    BOOKING_EXPORT_COLUMNS, TICKET_EXPORT_COLUMNS, EXPORT_FORMATS
+)
+from app.services.reference_cache import booth_choices, pro_choices
+
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+def _export_response(name, columns, rows, fmt, date_from, date_to):
+    """행 제너레이터를 첨부 파일 스트리밍 응답으로 감쌉니다 (요청 컨텍스트 유지)."""
+    period = f"{date_from or 'all'}_{date_to or 'all'}"
+    return Response(
+        stream_with_context(stream_export(columns, rows, fmt)),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{name}_{period}.{fmt}"'}
+    )
+
+
+def _parse_date_arg(name):
+    """YYYY-MM-DD 날짜 파라미터 (없으면 None, 형식이 틀리면 ValueError)."""
+    value = request.args.get(name, '').strip()
+    return datetime.date.fromisoformat(value) if value else None
+
+
+# 예약 내역 내보내기 (예약 목록과 같은 필터 파라미터 사용)
+@bp.route('/exports/bookings.<fmt>')
+def export_bookings(fmt):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    form = BookingFilterForm(formdata=request.args)
+    form.booth_id.choices = [('', '전체 타석')] + booth_choices()
+    form.pro_id.choices = [('', '전체 프로')] + pro_choices()
+    user_id = request.args.get('user_id', type=int)
+    if not form.validate() or (request.args.get('user_id') and user_id is None):
+        abort(400) # 잘못된 필터로 전체 내역이 내보내지지 않도록
+
+    rows = booking_export_rows(
+        date_from=form.date_from.data,
+        date_to=form.date_to.data,
+        booth_id=form.booth_id.data,
+        pro_id=form.pro_id.data,
+        status=form.status.data,
+        user_id=user_id,
+        member=(form.member.data or '').strip() or None
+    )
+    return _export_response('bookings', BOOKING_EXPORT_COLUMNS, rows, fmt, form.date_from.data, form.date_to.data)
+
+
+# 이용권 판매 내역 내보내기 (발급일 기준 기간)
+@bp.route('/exports/tickets.<fmt>')
+def export_tickets(fmt):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    try:
+        date_from = _parse_date_arg('date_from')
+        date_to = _parse_date_arg('date_to')
+    except ValueError:
+        abort(400) # 잘못된 날짜로 전체 판매 내역이 내보내지지 않도록
+    rows = ticket_export_rows(date_from=date_from, date_to=date_to)
+    return _export_response('ticket_sales', TICKET_EXPORT_COLUMNS, rows, fmt, date_from, date_to)
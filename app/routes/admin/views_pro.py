@@ -2,6 +2,7 @@
 from flask import render_template, redirect, url_for, flash, request
 from . import bp # admin 블루프린트 객체 가져오기 (__init__.py 에서 정의)
 from app.extensions import db
+from app.services.reference_cache import bump_reference_version
 from app.models import Pro
 from app.forms.admin_forms import ProForm
 
@@ -22,6 +23,7 @@ def add_pro():
         pro = Pro(name=form.name.data)
         db.session.add(pro)
         try:
+            bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
             db.session.commit()
             flash(f'프로 "{pro.name}" 님이 성공적으로 추가되었습니다.', 'success')
             return redirect(url_for('admin.list_pros'))
@@ -44,6 +46,7 @@ def edit_pro(pro_id):
     if form.validate_on_submit():
         pro.name = form.name.data
         try:
+            bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
             db.session.commit()
             flash(f'프로 "{pro.name}" 님의 정보가 수정되었습니다.', 'success')
             return redirect(url_for('admin.list_pros'))
@@ -72,6 +75,7 @@ def delete_pro(pro_id):
     try:
         pro_name = pro.name # 삭제 메시지용 이름 저장
         db.session.delete(pro)
+        bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
         db.session.commit()
         flash(f'프로 "{pro_name}" 님이 삭제되었습니다.', 'success')
     except Exception as e:
@@ -0,0 +1,33 @@
+# app/routes/admin/views_report.py
+# 매출/이용 리포트 (daily_stats 일별 집계만 조회)
+import datetime
+from flask import render_template, request
+from . import bp # admin 블루프린트
+from app.models.ticket_template import TicketCategory
+from app.services.reference_cache import get_reference_data
+from app.services.stats_service import get_stats_report
+
+REPORT_DEFAULT_MONTHS = 12
+
+
+@bp.route('/reports')
+def view_report():
+    today = datetime.date.today()
+    # 기본 기간: 최근 12개월 (11개월 전 1일 ~ 오늘)
+    first_month = (today.year * 12 + today.month - 1) - (REPORT_DEFAULT_MONTHS - 1)
+    default_from = datetime.date(first_month // 12, first_month % 12 + 1, 1)
+    date_from = request.args.get('date_from', default_from, type=datetime.date.fromisoformat)
+    date_to = request.args.get('date_to', today, type=datetime.date.fromisoformat)
+    period = request.args.get('period', 'month')
+    if period not in ('month', 'day'):
+        period = 'month'
+
+    report = get_stats_report(date_from, date_to, period=period)
+    reference = get_reference_data()
+    booth_names = {booth_id: name for booth_id, name, _ in reference['booths']}
+    pro_names = {pro_id: name for pro_id, name in reference['pros']}
+    category_names = {c.name: c.value for c in TicketCategory}
+
+    return render_template('report/view_report.html', title="매출/이용 리포트",
+                           report=report, date_from=date_from, date_to=date_to, period=period,
+                           booth_names=booth_names, pro_names=pro_names, category_names=category_names)
@@ -4,10 +4,15 @@ from flask import render_template, redirect, url_for, flash, request, jsonify
 from . import bp # admin 블루프린트
 from app.extensions import db
 from app.models import User, Pro, TicketTemplate, Ticket, Holding
-from app.forms.admin_forms import TicketIssueForm, TicketEditForm, HoldingForm
+from app.forms.admin_forms import TicketIssueForm, TicketEditForm, HoldingForm, TicketBulkIssueForm
 from app.models.ticket_template import TicketCategory 
 from app.services.holding_service import add_new_holding, delete_existing_holding, update_existing_holding
-from app.services.ticket_service import delete_ticket_by_id 
+from app.services.ticket_service import delete_ticket_by_id, calculate_template_expiry_date, bulk_issue_tickets, read_bulk_issue_csv
+from app.services.reference_cache import pro_choices, ticket_template_choices, get_reference_version
+from app.services.api_cache import cached_json_response, get_user_data_version
+from app.services.stats_service import record_ticket_sales
+from app.services.booking_service import adjust_user_lesson_total
+from sqlalchemy import select
 
 # 이용권 발급 페이지
 @bp.route('/tickets/issue', methods=['GET', 'POST'])
@@ -16,14 +21,11 @@ def issue_ticket(user_id_from_url=None):
     form = TicketIssueForm()
 
     # SelectField choices 동적 로딩
-    # 모든 사용자 목록 (탈퇴 회원 등 제외 로직 추가 가능)
-    form.user_id.choices = [(u.id, f"{u.name} ({u.phone})") for u in User.query.order_by(User.name).all()]
+    # 회원은 자동완성 검색으로 선택 (MemberField 가 회원 존재 여부만 검증)
     # 활성화된 이용권 템플릿 목록 (카테고리별 정렬 등 가능)
-    form.ticket_template_id.choices = [('', '템플릿 선택 안 함')] + \
-                                      [(t.id, f"{t.name} ({t.category.value})") for t in TicketTemplate.query.filter_by(is_active=True).order_by(TicketTemplate.name).all()]
+    form.ticket_template_id.choices = [('', '템플릿 선택 안 함')] + ticket_template_choices()
     # 모든 프로 목록
-    form.pro_id.choices = [('', '담당 프로 없음')] + \
-                          [(p.id, p.name) for p in Pro.query.order_by(Pro.name).all()]
+    form.pro_id.choices = [('', '담당 프로 없음')] + pro_choices()
 
     # URL을 통해 특정 회원이 미리 선택된 경우
     if user_id_from_url and request.method == 'GET':
@@ -71,19 +73,10 @@ def issue_ticket(user_id_from_url=None):
                 if price is None and template.price is not None:
                     price = template.price
 
-                # 카테고리에 따라 횟수, 기간, 만료일 등 설정
-                category = template.category
+                # 카테고리에 따라 횟수, 기간, 만료일 등 설정 (일괄 발급과 같은 계산 사용)
                 total_taseok = template.total_count
                 total_lesson = template.total_lesson_count
-                duration_days = template.duration_days
-                validity_days_from_template = template.default_validity_days # 횟수제 템플릿의 유효기간
-
-                if category in [TicketCategory.PERIOD, TicketCategory.COMBO] and duration_days:
-                    expiry_date = start_date + datetime.timedelta(days=duration_days -1) # 시작일 포함
-                elif category in [TicketCategory.COUNT, TicketCategory.COUPON] and validity_days_from_template:
-                    expiry_date = start_date + datetime.timedelta(days=validity_days_from_template -1)
-                else: # LESSON_ADD 또는 유효기간 없는 경우
-                    expiry_date = None
+                expiry_date = calculate_template_expiry_date(template, start_date)
             else: # 템플릿 미사용 (수동 입력)
                 # 수동 입력 값으로 횟수, 기간, 만료일 설정
                 total_taseok = form.total_taseok_count_manual.data
@@ -102,6 +95,7 @@ def issue_ticket(user_id_from_url=None):
             new_ticket = Ticket(
                 user_id=user.id,
                 ticket_template_id=template.id if template else None,
+                category=template.category if template else None, # 예약 시 이용권 검색용 대분류
                 name=ticket_name,
                 start_date=start_date,
                 expiry_date=expiry_date,
@@ -115,6 +109,7 @@ def issue_ticket(user_id_from_url=None):
             )
             new_ticket.update_status() # 초기 상태 업데이트
             db.session.add(new_ticket)
+            record_ticket_sales([new_ticket]) # 일별 집계 (매출)
 
             # 5. User 모델 업데이트 (레슨 횟수, 최종 만료일) - user_service 사용 권장
             if total_lesson:
@@ -136,12 +131,40 @@ def issue_ticket(user_id_from_url=None):
     return render_template('ticket/issue_ticket_form.html', title="이용권 발급", form=form, current_tickets=current_tickets)
 
 
+# 이용권 일괄 발급 (CSV 업로드)
+@bp.route('/tickets/bulk_issue', methods=['GET', 'POST'])
+def bulk_issue_tickets_upload():
+    form = TicketBulkIssueForm()
+    result = None # {'issued': n, 'errors': [...], 'dry_run': bool}
+
+    if form.validate_on_submit():
+        try:
+            rows = read_bulk_issue_csv(form.csv_file.data.read())
+            issued, errors = bulk_issue_tickets(rows, dry_run=form.dry_run.data)
+            result = {'issued': issued, 'errors': errors, 'dry_run': form.dry_run.data}
+            if form.dry_run.data:
+                flash(f'검증 완료: 발급 가능 {issued}건, 오류 {len(errors)}건 (저장되지 않음)', 'info')
+            else:
+                flash(f'이용권 {issued}건이 발급되었습니다. (오류 {len(errors)}건 제외)', 'success' if not errors else 'warning')
+        except (ValueError, UnicodeDecodeError) as e:
+            flash(f'CSV 파일을 읽을 수 없습니다: {e}', 'danger')
+        except Exception as e:
+            flash(f'일괄 발급 중 오류가 발생했습니다: {e}', 'danger')
+
+    return render_template('ticket/bulk_issue_form.html', title="이용권 일괄 발급", form=form, result=result)
+
+
 # (선택적) 템플릿 선택 시 템플릿 정보 가져오는 API (JavaScript에서 사용)
+# ETag: 템플릿 변경 시 올라가는 기준 데이터 버전 사용 -> 변경 없으면 조회 없이 304
 @bp.route('/api/ticket_template/<int:template_id>')
 def get_ticket_template_info(template_id):
-    template = db.session.get(TicketTemplate, template_id)
-    if template:
-        return jsonify({
+    etag = f"ticket-template-{template_id}-v{get_reference_version()}"
+
+    def build_payload():
+        template = db.session.get(TicketTemplate, template_id)
+        if not template:
+            return {'error': 'Template not found'}, 404
+        return {
             'name': template.generate_ticket_name(), # User 정보 없이 기본 이름 생성
             'category': template.category.name, # Enum의 name
             'category_value': template.category.value, # Enum의 value
@@ -150,46 +173,51 @@ def get_ticket_template_info(template_id):
             'total_lesson_count': template.total_lesson_count,
             'default_validity_days': template.default_validity_days,
             'price': template.price
-        })
-    return jsonify({'error': 'Template not found'}), 404
+        }
+
+    return cached_json_response(etag, build_payload)
 
 
 # --- ▼ 회원 정보 및 보유 티켓 목록 API 추가 ▼ ---
+# ETag: User.data_version (회원/이용권/홀딩 변경 시 증가) -> 변경 없으면 티켓 조회 없이 304
 @bp.route('/api/user/<int:user_id>/tickets')
 def get_user_tickets_info(user_id):
-    user = db.session.get(User, user_id)
-    if not user:
+    version = get_user_data_version(user_id)
+    if version is None:
         return jsonify({'error': 'User not found'}), 404
 
-    tickets_data = []
-    # User 모델에 tickets 관계가 설정되어 있어야 함 (이전에 Ticket 모델에 user 관계 설정함)
-    # 활성화된 티켓, 만료일 순 정렬 등 필요에 따라 쿼리 수정
-    user_tickets = user.tickets.order_by(Ticket.expiry_date.desc(), Ticket.created_at.desc()).all()
-
-    for ticket in user_tickets:
-        tickets_data.append({
-            'id': ticket.id,
-            'name': ticket.name,
-            'start_date': ticket.start_date.isoformat() if ticket.start_date else None,
-            'expiry_date': ticket.expiry_date.isoformat() if ticket.expiry_date else None,
-            'total_taseok_count': ticket.total_taseok_count,
-            'remaining_taseok_count': ticket.remaining_taseok_count,
-            'total_lesson_count': ticket.total_lesson_count,
-            'remaining_lesson_count': ticket.remaining_lesson_count,
-            'is_active': ticket.is_active,
-            'is_used_up': ticket.is_used_up,
-            'is_expired': ticket.is_expired
-            # 필요시 pro 정보 등 추가
-        })
-
-    return jsonify({
-        'user_id': user.id,
-        'name': user.name,
-        'phone': user.phone,
-        'master_expiry_date': user.master_expiry_date.isoformat() if user.master_expiry_date else None,
-        'remaining_lesson_total': user.remaining_lesson_total,
-        'tickets': tickets_data
-    })
+    def build_payload():
+        user = db.session.get(User, user_id)
+        tickets_data = []
+        # 활성화된 티켓, 만료일 순 정렬 등 필요에 따라 쿼리 수정
+        user_tickets = user.tickets.order_by(Ticket.expiry_date.desc(), Ticket.created_at.desc()).all()
+
+        for ticket in user_tickets:
+            tickets_data.append({
+                'id': ticket.id,
+                'name': ticket.name,
+                'start_date': ticket.start_date.isoformat() if ticket.start_date else None,
+                'expiry_date': ticket.expiry_date.isoformat() if ticket.expiry_date else None,
+                'total_taseok_count': ticket.total_taseok_count,
+                'remaining_taseok_count': ticket.remaining_taseok_count,
+                'total_lesson_count': ticket.total_lesson_count,
+                'remaining_lesson_count': ticket.remaining_lesson_count,
+                'is_active': ticket.is_active,
+                'is_used_up': ticket.is_used_up,
+                'is_expired': ticket.is_expired
+                # 필요시 pro 정보 등 추가
+            })
+
+        return {
+            'user_id': user.id,
+            'name': user.name,
+            'phone': user.phone,
+            'master_expiry_date': user.master_expiry_date.isoformat() if user.master_expiry_date else None,
+            'remaining_lesson_total': user.remaining_lesson_total,
+            'tickets': tickets_data
+        }
+
+    return cached_json_response(f"user-tickets-{user_id}-v{version}", build_payload)
 
 @bp.route('/tickets/edit/<int:ticket_id>', methods=['GET', 'POST'])
 def edit_ticket(ticket_id):
@@ -204,6 +232,8 @@ def edit_ticket(ticket_id):
     form = TicketEditForm(obj=ticket) # 폼 로드 시 현재 티켓 정보 채우기
 
     if form.validate_on_submit():
+        # 수정 전 판매 정보 (담당 프로/가격 변경 시 일별 집계 보정용)
+        original_sale = {'issue_date': ticket.issue_date, 'pro_id': ticket.pro_id, 'category': ticket.category, 'price': ticket.price}
         # 폼 데이터로 티켓 객체 업데이트 (주의: obj=ticket으로 초기화했으므로, 필드별로 할당하는 것이 더 안전할 수 있음)
         # form.populate_obj(ticket) # 이 방식 대신 필드별 할당 권장
 
@@ -229,7 +259,12 @@ def edit_ticket(ticket_id):
             lesson_diff = new_remaining_lesson - original_remaining_lesson
             user = ticket.user # 티켓 소유자
             if user:
-                user.remaining_lesson_total = (user.remaining_lesson_total or 0) + lesson_diff
+                if lesson_diff:
+                    # 통합 레슨으로 예약한 횟수는 이 이용권 잔여 횟수에서 빠지지 않으므로, 줄일 때 0 미만이 되지 않게 UPDATE 로 조정
+                    if (user.remaining_lesson_total or 0) + lesson_diff < 0:
+                        flash(f"회원 통합 레슨 잔여 횟수({user.remaining_lesson_total or 0}회)보다 많이 줄여 0회로 맞춥니다.", "warning")
+                    adjust_user_lesson_total(user.id, lesson_diff)
+                    db.session.expire(user, ['remaining_lesson_total'])
             else:
                 # 이론적으로는 발생하기 어려움
                 flash("티켓 소유자 정보를 찾을 수 없어 레슨 횟수 연동에 실패했습니다.", "error")
@@ -237,6 +272,11 @@ def edit_ticket(ticket_id):
             # 2. 최종 만료일 재계산 (ticket.update_status() 호출만으로도 될 수 있으나, 명시적 호출 권장)
             # user_service.recalculate_master_expiry_date(user) # 서비스 구현 후 사용
 
+            # 3. 담당 프로/가격이 바뀌면 일별 집계의 판매 내역 이동
+            if (original_sale['pro_id'], original_sale['price']) != (ticket.pro_id, ticket.price):
+                record_ticket_sales([original_sale], sign=-1)
+                record_ticket_sales([ticket])
+
             db.session.commit()
             flash(f'이용권 정보 (ID: {ticket.id})가 수정되었습니다.', 'success')
             return redirect(url_for('admin.view_user', user_id=ticket.user_id)) # 회원 상세 페이지로
@@ -254,33 +294,38 @@ def edit_ticket(ticket_id):
 
 
 # 특정 티켓의 홀딩 목록 조회 API (모달용)
+# ETag: 티켓 소유 회원의 data_version (홀딩/티켓 변경 시 증가)
 @bp.route('/api/ticket/<int:ticket_id>/holdings')
 def get_ticket_holdings(ticket_id):
-    ticket = db.session.get(Ticket, ticket_id)
-    if not ticket:
+    version = db.session.execute(
+        select(User.data_version).join(Ticket, Ticket.user_id == User.id).where(Ticket.id == ticket_id)
+    ).scalar()
+    if version is None:
         return jsonify({'error': 'Ticket not found'}), 404
 
-    holdings_data = []
-    for holding in ticket.holdings.order_by(Holding.start_date.asc()).all():
-        holdings_data.append({
-            'id': holding.id,
-            'start_date': holding.start_date.isoformat(),
-            'end_date': holding.end_date.isoformat(),
-            'duration_days': holding.duration_days,
-            'reason': holding.reason
-        })
-    ticket_info = {
-        'id': ticket.id,
-        'name': ticket.name,
-        'start_date': ticket.start_date.isoformat() if ticket.start_date else None,
-        'expiry_date': ticket.expiry_date.isoformat() if ticket.expiry_date else None
-    }
-    
-    # 템플릿 렌더링 대신 JSON 반환
-    return jsonify({
-        'ticket_info': ticket_info, # 티켓 정보 추가
-        'holdings': holdings_data
-        })
+    def build_payload():
+        ticket = db.session.get(Ticket, ticket_id)
+        holdings_data = []
+        for holding in ticket.holdings.order_by(Holding.start_date.asc()).all():
+            holdings_data.append({
+                'id': holding.id,
+                'start_date': holding.start_date.isoformat(),
+                'end_date': holding.end_date.isoformat(),
+                'duration_days': holding.duration_days,
+                'reason': holding.reason
+            })
+        ticket_info = {
+            'id': ticket.id,
+            'name': ticket.name,
+            'start_date': ticket.start_date.isoformat() if ticket.start_date else None,
+            'expiry_date': ticket.expiry_date.isoformat() if ticket.expiry_date else None
+        }
+        return {
+            'ticket_info': ticket_info, # 티켓 정보 추가
+            'holdings': holdings_data
+        }
+
+    return cached_json_response(f"ticket-holdings-{ticket_id}-v{version}", build_payload)
 
 # 특정 홀딩 정보 조회 API (수정 폼 채우기용)
 @bp.route('/api/holding/<int:holding_id>')
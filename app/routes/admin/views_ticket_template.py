@@ -2,6 +2,8 @@
 from flask import render_template, redirect, url_for, flash, request
 from . import bp # admin 블루프린트
 from app.extensions import db
+from app.services.reference_cache import bump_reference_version
+from app.services.ticket_service import change_template_category
 from app.models import TicketTemplate # TicketTemplate 모델
 from app.models.ticket_template import TicketCategory # Enum
 from app.forms.admin_forms import TicketTemplateForm # 폼
@@ -40,6 +42,7 @@ def add_ticket_template():
         )
         db.session.add(template)
         try:
+            bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
             db.session.commit()
             flash(f'이용권 템플릿 "{template.name}"이(가) 성공적으로 추가되었습니다.', 'success')
             return redirect(url_for('admin.list_ticket_templates'))
@@ -60,8 +63,10 @@ def edit_ticket_template(template_id):
     form = TicketTemplateForm(obj=template, original_name=template.name) # obj=template 으로 폼 필드 자동 채움
 
     if form.validate_on_submit():
-        form.populate_obj(template) # 폼 데이터를 template 객체에 반영
         try:
+            change_template_category(template, form.category.data) # 발급된 이용권 대분류/일별 집계도 함께 변경
+            form.populate_obj(template) # 폼 데이터를 template 객체에 반영
+            bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
             db.session.commit()
             flash(f'이용권 템플릿 "{template.name}"의 정보가 수정되었습니다.', 'success')
             return redirect(url_for('admin.list_ticket_templates'))
@@ -85,6 +90,7 @@ def toggle_active_ticket_template(template_id):
 
     template.is_active = not template.is_active
     try:
+        bump_reference_version() # 선택지 캐시 갱신 (같은 트랜잭션으로 커밋)
         db.session.commit()
         status = "활성화" if template.is_active else "비활성화"
         flash(f'이용권 템플릿 "{template.name}"이(가) {status}되었습니다.', 'success')
@@ -1,30 +1,57 @@
 # app/routes/admin/views_user.py
 import datetime
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify, Response, stream_with_context
 from flask_login import current_user # 현재 로그인 사용자 정보
 from . import bp # admin 블루프린트
 from app.extensions import db
 from app.models import User, Ticket
+from sqlalchemy.orm import joinedload
 from app.forms.admin_forms import UserEditForm, UserPasswordResetForm
+from app.services.holding_service import get_holdings_by_ticket
+from app.services.principal_cache import invalidate_principal
+from app.services.user_service import search_members, member_search_label, member_search_query, iter_member_csv, MEMBER_SEARCH_DEFAULT_LIMIT
 
 # 회원 목록 조회
 @bp.route('/users')
 def list_users():
     page = request.args.get('page', 1, type=int)
-    # 검색 기능 (간단 예시 - 이름 또는 연락처로 검색)
-    search_term = request.args.get('search', '')
-    query = User.query
+    search_term = request.args.get('search', '').strip()
 
     if search_term:
-        # SQLite는 ILIKE를 직접 지원하지 않으므로 lower 함수와 like 사용 또는 SQLAlchemy의 ilike 사용
-        # 여기서는 간단히 like 사용 (대소문자 구분 가능성 있음)
-        search_pattern = f"%{search_term}%"
-        query = query.filter(User.name.like(search_pattern) | User.phone.like(search_pattern))
+        # 이름/연락처/메모 검색 (SQLite 는 FTS5 trigram 색인 사용, 관련도순)
+        query = member_search_query(search_term)
+    else:
+        query = User.query.order_by(User.created_at.desc())
 
-    pagination = query.order_by(User.created_at.desc()).paginate(page=page, per_page=10, error_out=False)
+    pagination = query.paginate(page=page, per_page=10, error_out=False)
     users = pagination.items
     return render_template('user/list_users.html', users=users, pagination=pagination, title="회원 목록", search_term=search_term)
 
+# 회원 CSV 내보내기 (스트리밍 응답, 회원 수와 무관하게 메모리 일정)
+@bp.route('/users/export.csv')
+def export_users_csv():
+    filename = f"members_{datetime.date.today():%Y%m%d}.csv"
+    return Response(
+        stream_with_context(iter_member_csv()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+# 회원 검색 API (예약/이용권 발급 폼의 자동완성용)
+@bp.route('/api/users/search')
+def search_users_api():
+    term = request.args.get('q', '')
+    limit = request.args.get('limit', MEMBER_SEARCH_DEFAULT_LIMIT, type=int)
+    users = search_members(term, limit=limit)
+    return jsonify({
+        'results': [{
+            'id': u.id,
+            'name': u.name,
+            'phone': u.phone,
+            'label': member_search_label(u)
+        } for u in users]
+    })
+
 # 회원 상세 정보 조회
 @bp.route('/users/<int:user_id>')
 def view_user(user_id):
@@ -35,19 +62,23 @@ def view_user(user_id):
 
     password_reset_form = UserPasswordResetForm()
 
-    # 회원 보유 티켓 미리 정렬
-    user_tickets_query = user.tickets.order_by(
-        Ticket.is_active.desc(), # Ticket 모델 직접 사용
+    # 회원 보유 티켓 미리 정렬 (담당 프로는 함께 로드)
+    user_tickets = Ticket.query.filter_by(user_id=user.id).options(
+        joinedload(Ticket.pro)
+    ).order_by(
+        Ticket.is_active.desc(),
         Ticket.expiry_date.desc(),
         Ticket.created_at.desc()
-    )
-    user_tickets = user_tickets_query.all() # 정렬된 리스트 가져오기
+    ).all()
+    # 모든 티켓의 홀딩 내역을 한 번에 조회 (티켓 수와 무관하게 쿼리 수 고정)
+    holdings_by_ticket = get_holdings_by_ticket([t.id for t in user_tickets])
 
     return render_template('user/view_user.html',
                            user=user,
                            title=f"회원 정보: {user.name}",
                            password_reset_form=password_reset_form,
-                           user_tickets=user_tickets) # 정렬된 티켓 리스트 전달
+                           user_tickets=user_tickets, # 정렬된 티켓 리스트 전달
+                           holdings_by_ticket=holdings_by_ticket)
 
 # 회원 정보 수정
 @bp.route('/users/edit/<int:user_id>', methods=['GET', 'POST'])
@@ -65,6 +96,7 @@ def edit_user(user_id):
         user_to_edit.is_admin = form.is_admin.data
         try:
             db.session.commit()
+            invalidate_principal(user_to_edit.id) # 로그인 사용자 캐시 (이름/관리자 권한) 갱신
             flash(f'회원 "{user_to_edit.name}" 님의 정보가 수정되었습니다.', 'success')
             return redirect(url_for('admin.view_user', user_id=user_to_edit.id))
         except Exception as e:
@@ -97,6 +129,7 @@ def reset_user_password(user_id):
         user_to_reset.last_login_at = None # 마지막 로그인 기록 초기화 (선택적)
         try:
             db.session.commit()
+            invalidate_principal(user_to_reset.id)
             flash(f'회원 "{user_to_reset.name}" 님의 비밀번호가 "0000"으로 초기화되었습니다.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -6,6 +6,7 @@ from werkzeug.urls import url_parse # 리디렉션 URL 검증용
 from app.extensions import db # db 객체 임포트
 from app.models import User # User 모델 임포트
 from app.forms.auth_forms import LoginForm, RegistrationForm # 만든 폼 임포트
+from app.services.principal_cache import invalidate_principal
 
 
 # 블루프린트 객체 생성 (이전 코드 유지)
@@ -51,6 +52,7 @@ def login():
         # 마지막 로그인 시간 업데이트
         user.last_login_at = datetime.datetime.utcnow()
         db.session.commit()
+        invalidate_principal(user.id) # 다음 요청부터 최신 정보로 캐시
 
         flash(f'{user.name}님, 환영합니다!', 'success') # 성공 메시지
 
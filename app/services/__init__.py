@@ -1,4 +1,11 @@
 # app/services/__init__.py
-from .holding_service import add_new_holding, delete_existing_holding, update_existing_holding, recalculate_master_expiry_date 
-from .ticket_service import delete_ticket_by_id 
-from .booking_service import create_booking, cancel_booking, is_booth_available 
\ No newline at end of file
+from .holding_service import add_new_holding, delete_existing_holding, update_existing_holding, recalculate_master_expiry_date, get_holdings_by_ticket
+from .ticket_service import delete_ticket_by_id, expire_overdue_tickets, bulk_issue_tickets, read_bulk_issue_csv, calculate_template_expiry_date, change_template_category
+from .booking_service import create_booking, cancel_booking, is_booth_available, get_day_availability, create_recurring_booking
+from .booking_sweeper import sweep_past_bookings, start_periodic_sweeper
+from .user_service import search_members, member_search_label, member_search_query, iter_member_import, iter_member_csv
+from .reference_cache import get_reference_data, get_reference_version, bump_reference_version, pro_choices, booth_choices, ticket_template_choices
+from .api_cache import cached_json_response, get_user_data_version, mark_user_data_changed
+from .principal_cache import load_principal, invalidate_principal
+from .export_service import booking_export_rows, ticket_export_rows, stream_export
+from .stats_service import record_booking_stats, record_ticket_sales, rebuild_daily_stats, get_stats_report
@@ -0,0 +1,120 @@
+# app/services/api_cache.py
+# 관리자 JSON API 의 조건부 GET (ETag / If-None-Match -> 304) 과 직렬화된 응답 LRU 캐시.
+# - 회원 관련 응답의 ETag 는 User.data_version 을 사용합니다.
+#   회원/이용권/홀딩이 바뀌면 커밋 시점에 해당 회원의 data_version 을 1 올립니다.
+#   (ORM 변경은 flush 이벤트로 자동 수집, Core UPDATE 는 mark_user_data_changed() 로 직접 표시)
+# - LRU 키에 버전이 포함되므로 엔티티가 바뀌면 이전 항목은 더 이상 사용되지 않고 밀려납니다.
+import threading
+from collections import OrderedDict
+from flask import current_app, request
+from sqlalchemy import event, update, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import User, Ticket, Holding
+
+_CHANGED_USERS_KEY = 'changed_user_ids'
+DEFAULT_PAYLOAD_CACHE_SIZE = 256
+
+
+class PayloadLRU:
+    """직렬화된 JSON 문자열을 보관하는 스레드 안전 LRU"""
+    def __init__(self, max_size=DEFAULT_PAYLOAD_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._items[key] = body
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+def _get_payload_cache() -> PayloadLRU:
+    cache = current_app.extensions.get('api_payload_cache')
+    if cache is None:
+        size = current_app.config.get('API_PAYLOAD_CACHE_SIZE', DEFAULT_PAYLOAD_CACHE_SIZE)
+        cache = current_app.extensions.setdefault('api_payload_cache', PayloadLRU(size))
+    return cache
+
+
+def cached_json_response(etag: str, build_payload):
+    """
+    ETag 가 클라이언트 If-None-Match 와 같으면 payload 를 만들지 않고 304 를 반환합니다.
+    아니면 LRU 에서 직렬화 결과를 찾고, 없을 때만 build_payload() 를 호출합니다.
+    build_payload 가 (dict, status) 를 반환하면 오류 응답으로 보고 캐시하지 않습니다.
+    """
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        cache = _get_payload_cache()
+        body = cache.get(etag)
+        if body is None:
+            payload = build_payload()
+            if isinstance(payload, tuple):
+                data, status = payload
+                return current_app.response_class(current_app.json.dumps(data), status=status,
+                                                  mimetype='application/json')
+            body = current_app.json.dumps(payload)
+            cache.put(etag, body)
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache' # 매번 재검증 (변경 없으면 304)
+    return response
+
+
+# --- 회원 데이터 버전 (User.data_version) ---
+def get_user_data_version(user_id: int) -> int | None:
+    """회원이 없으면 None"""
+    return db.session.execute(select(User.data_version).where(User.id == user_id)).scalar()
+
+
+def mark_user_data_changed(*user_ids):
+    """Core UPDATE 처럼 flush 를 거치지 않는 변경 후 호출 -> 커밋 시 data_version 증가"""
+    db.session.info.setdefault(_CHANGED_USERS_KEY, set()).update(uid for uid in user_ids if uid)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault(_CHANGED_USERS_KEY, set())
+    holding_ticket_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+        elif isinstance(obj, Ticket):
+            changed.add(obj.user_id)
+        elif isinstance(obj, Holding):
+            holding_ticket_ids.add(obj.ticket_id)
+    if holding_ticket_ids:
+        rows = session.connection().execute(select(Ticket.user_id).where(Ticket.id.in_(holding_ticket_ids)))
+        changed.update(user_id for user_id, in rows)
+    changed.discard(None)
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_changed_users(session):
+    session.flush() # 남은 변경도 수집
+    user_ids = session.info.pop(_CHANGED_USERS_KEY, None)
+    if user_ids:
+        session.execute(
+            update(User).where(User.id.in_(user_ids))
+            .values(data_version=User.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop(_CHANGED_USERS_KEY, None)
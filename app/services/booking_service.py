@@ -4,8 +4,10 @@ from app.extensions import db
 from app.models import User, Booth, Ticket, Booking, Pro, TicketTemplate
 from app.models.enums import BookingType, BookingStatus, BoothStatus
 from app.models.ticket_template import TicketCategory
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, case, update, func, select
 from .holding_service import recalculate_master_expiry_date
+from .api_cache import mark_user_data_changed
+from .stats_service import record_booking_stats
 
 
 # --- 예약 가능 여부 확인 관련 함수 ---
@@ -32,35 +34,113 @@ def is_booth_available(booth_id: int, start_time: datetime.datetime, end_time: d
 
     return overlapping_booking_query.first() is None
 
-def find_available_ticket_for_taseok(user: User, booking_start_time: datetime.datetime) -> Ticket | None:
-    """타석 이용에 사용할 수 있는 유효한 티켓을 찾습니다 (기간권 우선, 다음 횟수권)"""
-    booking_date = booking_start_time.date()
 
-    # 1. 유효한 기간권 검색 (시작일 <= 예약일 <= 만료일)
-    valid_period_ticket = Ticket.query.filter(
-        Ticket.user_id == user.id,
-        Ticket.is_active == True,
-        or_(Ticket.ticket_template.has(TicketTemplate.category == TicketCategory.PERIOD),
-            Ticket.ticket_template.has(TicketTemplate.category == TicketCategory.COMBO)), # 기간권 또는 종합권
-        Ticket.start_date <= booking_date,
-        Ticket.expiry_date >= booking_date
-    ).order_by(Ticket.expiry_date.asc()).first() # 만료일 임박한 것부터 사용? 정책 결정 필요
+SLOT_MINUTES = 10 # 예약 시작 시간 단위 (BookingForm.start_minute 과 동일)
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
 
-    if valid_period_ticket:
-        return valid_period_ticket
+def get_day_availability(target_date: datetime.date, duration_minutes: int) -> list[dict]:
+    """
+    하루 동안 모든 타석의 예약 가능한 시작 시간을 계산합니다.
+
+    타석 목록과 해당 일자의 SCHEDULED 예약을 한 번의 쿼리(outer join)로 가져온 뒤,
+    타석별로 10분 단위 슬롯 비트맵(int)을 만들어 메모리에서 빈 시간을 찾습니다.
 
-    # 2. 유효한 횟수권/쿠폰 검색 (잔여 횟수 > 0, 시작일 <= 예약일 <= 만료일)
-    valid_count_ticket = Ticket.query.filter(
-        Ticket.user_id == user.id,
+    :param target_date: 조회할 날짜
+    :param duration_minutes: 이용 시간(분)
+    :return: [{'booth_id', 'booth_name', 'is_bookable', 'free_start_times': ['HH:MM', ...]}, ...]
+    """
+    day_start = datetime.datetime.combine(target_date, datetime.time.min)
+    needed_slots = -(-duration_minutes // SLOT_MINUTES) # 올림
+    # 자정 직전 시작 예약은 다음날로 넘어가므로 이용 시간만큼 조회 구간을 늘림
+    window_end = day_start + datetime.timedelta(minutes=(SLOTS_PER_DAY + needed_slots) * SLOT_MINUTES)
+
+    rows = db.session.query(
+        Booth.id, Booth.name, Booth.is_available, Booth.current_status,
+        Booking.start_time, Booking.end_time
+    ).outerjoin(Booking, and_(
+        Booking.booth_id == Booth.id,
+        Booking.status == BookingStatus.SCHEDULED,
+        Booking.end_time > day_start,
+        Booking.start_time < window_end
+    )).order_by(Booth.name).all()
+
+    # 타석별 슬롯 비트맵 구성 (bit i = day_start + i*10분 슬롯이 예약됨)
+    booths = {}
+    for booth_id, name, is_available, current_status, start_time, end_time in rows:
+        booth = booths.get(booth_id)
+        if booth is None:
+            booth = booths[booth_id] = {
+                'booth_id': booth_id,
+                'booth_name': name,
+                'is_bookable': bool(is_available) and current_status == BoothStatus.AVAILABLE,
+                'bitmap': 0
+            }
+        if start_time is None:
+            continue # 예약 없는 타석 (outer join)
+        first = max(0, int((start_time - day_start).total_seconds() // 60) // SLOT_MINUTES)
+        last = -(-int((end_time - day_start).total_seconds() // 60) // SLOT_MINUTES) # 종료 슬롯 올림 (exclusive)
+        if last > first:
+            booth['bitmap'] |= ((1 << (last - first)) - 1) << first
+
+    mask = (1 << needed_slots) - 1
+    result = []
+    for booth in booths.values():
+        bitmap = booth.pop('bitmap')
+        free_start_times = []
+        if booth['is_bookable']:
+            for slot in range(SLOTS_PER_DAY):
+                if not (bitmap >> slot) & mask:
+                    minutes = slot * SLOT_MINUTES
+                    free_start_times.append(f"{minutes // 60:02d}:{minutes % 60:02d}")
+        booth['free_start_times'] = free_start_times
+        result.append(booth)
+    return result
+
+# 타석 이용에 쓰이는 이용권 대분류 (정책: 기간권/종합권 우선, 다음 횟수권/쿠폰)
+PERIOD_TICKET_CATEGORIES = (TicketCategory.PERIOD, TicketCategory.COMBO)
+COUNT_TICKET_CATEGORIES = (TicketCategory.COUNT, TicketCategory.COUPON)
+
+def find_candidate_tickets(user_id: int, booking_date: datetime.date, until_date: datetime.date = None) -> list[Ticket]:
+    """
+    예약일에 사용할 수 있는 회원의 이용권 후보를 한 번의 쿼리로 가져옵니다.
+
+    Ticket.category (발급 시 복사된 대분류) 와 복합 인덱스를 사용하며,
+    정책 순서(기간권/종합권 → 횟수권/쿠폰, 같은 그룹은 만료일 임박 순)로 정렬하여 반환합니다.
+    until_date 를 주면 booking_date ~ until_date 중 하루라도 유효한 이용권을 모두 가져옵니다
+    (반복 예약용, 날짜별 필터는 tickets_valid_on 사용).
+    """
+    policy_rank = case((Ticket.category.in_(PERIOD_TICKET_CATEGORIES), 0), else_=1)
+    return Ticket.query.filter(
+        Ticket.user_id == user_id,
         Ticket.is_active == True,
-        or_(Ticket.ticket_template.has(TicketTemplate.category == TicketCategory.COUNT),
-            Ticket.ticket_template.has(TicketTemplate.category == TicketCategory.COUPON)), # 횟수권 또는 쿠폰
-        Ticket.remaining_taseok_count > 0,
-        Ticket.start_date <= booking_date,
-        Ticket.expiry_date >= booking_date # 횟수권도 만료일 체크
-    ).order_by(Ticket.expiry_date.asc()).first() # 만료일 임박한 것부터 사용
+        Ticket.category.in_(PERIOD_TICKET_CATEGORIES + COUNT_TICKET_CATEGORIES),
+        Ticket.start_date <= (until_date or booking_date),
+        Ticket.expiry_date >= booking_date
+    ).order_by(policy_rank, Ticket.expiry_date.asc(), Ticket.id.asc()).all()
+
+def tickets_valid_on(candidates: list[Ticket], day: datetime.date) -> list[Ticket]:
+    """후보 목록 중 해당 날짜에 유효한 이용권만 (정렬 순서 유지)"""
+    return [t for t in candidates if t.start_date <= day and t.expiry_date and t.expiry_date >= day]
+
+def pick_taseok_ticket(candidates: list[Ticket]) -> Ticket | None:
+    """정렬된 후보 중 타석 이용에 사용할 티켓 선택 (기간권 우선, 다음 잔여 횟수가 있는 횟수권/쿠폰)"""
+    for ticket in candidates:
+        if ticket.category in PERIOD_TICKET_CATEGORIES:
+            return ticket
+        if (ticket.remaining_taseok_count or 0) > 0:
+            return ticket
+    return None
+
+def pick_lesson_ticket(candidates: list[Ticket]) -> Ticket | None:
+    """정렬된 후보 중 레슨 잔여 횟수가 있는 쿠폰 레슨 티켓 선택 (만료일 임박 순)"""
+    for ticket in candidates:
+        if ticket.category == TicketCategory.COUPON and (ticket.remaining_lesson_count or 0) > 0:
+            return ticket
+    return None
 
-    return valid_count_ticket
+def find_available_ticket_for_taseok(user: User, booking_start_time: datetime.datetime) -> Ticket | None:
+    """타석 이용에 사용할 수 있는 유효한 티켓을 찾습니다 (기간권 우선, 다음 횟수권)"""
+    return pick_taseok_ticket(find_candidate_tickets(user.id, booking_start_time.date()))
 
 def find_available_ticket_for_lesson(user: User, booking_start_time: datetime.datetime) -> tuple[Ticket | None, bool]:
     """
@@ -68,27 +148,91 @@ def find_available_ticket_for_lesson(user: User, booking_start_time: datetime.da
 
     :return: (사용할 쿠폰 티켓 객체 또는 None, 통합 레슨 횟수 사용 가능 여부)
     """
-    booking_date = booking_start_time.date()
-
-    # 1. 유효한 쿠폰 레슨 티켓 검색 (잔여 레슨 횟수 > 0, 기간 유효)
-    valid_coupon_ticket = Ticket.query.filter(
-        Ticket.user_id == user.id,
-        Ticket.is_active == True,
-        Ticket.ticket_template.has(TicketTemplate.category == TicketCategory.COUPON),
-        Ticket.remaining_lesson_count > 0,
-        Ticket.start_date <= booking_date,
-        Ticket.expiry_date >= booking_date
-    ).order_by(Ticket.expiry_date.asc()).first()
-
-    if valid_coupon_ticket:
+    coupon_ticket = pick_lesson_ticket(find_candidate_tickets(user.id, booking_start_time.date()))
+    if coupon_ticket:
         # 쿠폰 사용 시에는 타석 횟수도 같이 차감되므로 타석 권한 별도 확인 불필요
-        return valid_coupon_ticket, False # 쿠폰 티켓 반환, 통합 레슨 사용 안 함
-
-    # 2. 사용자 통합 레슨 횟수 확인
-    can_use_total_lesson = (user.remaining_lesson_total or 0) > 0
+        return coupon_ticket, False # 쿠폰 티켓 반환, 통합 레슨 사용 안 함
 
     # 쿠폰 티켓이 없고, 통합 레슨 횟수가 있다면 True 반환
-    return None, can_use_total_lesson
+    return None, (user.remaining_lesson_total or 0) > 0
+
+
+# --- 잔여 횟수 차감/복구 (조건부 UPDATE 한 번으로 원자적으로 처리) ---
+# 값을 파이썬으로 읽어 계산 후 다시 쓰면 동시 예약 시 마지막 1회를 두 예약이 함께 쓸 수 있으므로,
+# "remaining >= n" 조건을 건 UPDATE 의 rowcount 로 성공 여부를 판단합니다.
+
+def _execute_counter_update(stmt) -> bool:
+    result = db.session.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount == 1
+
+def sync_ticket_status(ticket_id: int):
+    """UPDATE 로 변경된 잔여 횟수를 다시 읽어 만료/소진/활성 상태 플래그를 갱신합니다."""
+    ticket = db.session.get(Ticket, ticket_id)
+    if ticket:
+        db.session.expire(ticket, ['remaining_taseok_count', 'remaining_lesson_count'])
+        ticket.update_status()
+        mark_user_data_changed(ticket.user_id) # API ETag 갱신용
+
+def deduct_ticket_counts(ticket_id: int, taseok: int = 0, lesson: int = 0) -> bool:
+    """이용권의 타석/레슨 잔여 횟수를 차감합니다. 하나라도 부족하면 아무것도 바꾸지 않고 False."""
+    values = {}
+    conditions = [Ticket.id == ticket_id]
+    if taseok:
+        values['remaining_taseok_count'] = Ticket.remaining_taseok_count - taseok
+        conditions.append(Ticket.remaining_taseok_count >= taseok)
+    if lesson:
+        values['remaining_lesson_count'] = Ticket.remaining_lesson_count - lesson
+        conditions.append(Ticket.remaining_lesson_count >= lesson)
+    if not values:
+        return True
+    if not _execute_counter_update(update(Ticket).where(*conditions).values(**values)):
+        return False
+    sync_ticket_status(ticket_id)
+    return True
+
+def restore_ticket_count(ticket_id: int, remaining_column, total_column, count: int) -> bool:
+    """취소 시 이용권 잔여 횟수 복구 (총 횟수보다 적을 때만, 횟수제가 아닌 경우 변경 없음)"""
+    restored = _execute_counter_update(
+        update(Ticket).where(
+            Ticket.id == ticket_id,
+            remaining_column.isnot(None),
+            or_(total_column.is_(None), remaining_column < total_column)
+        ).values({remaining_column: remaining_column + count})
+    )
+    if restored:
+        sync_ticket_status(ticket_id)
+    return restored
+
+def deduct_user_lesson_total(user_id: int, count: int) -> bool:
+    """회원 통합 레슨 횟수 차감. 부족하면 False."""
+    deducted = _execute_counter_update(
+        update(User).where(User.id == user_id, User.remaining_lesson_total >= count)
+        .values(remaining_lesson_total=User.remaining_lesson_total - count)
+    )
+    if deducted:
+        mark_user_data_changed(user_id)
+    return deducted
+
+def restore_user_lesson_total(user_id: int, count: int) -> bool:
+    """회원 통합 레슨 횟수 복구"""
+    restored = _execute_counter_update(
+        update(User).where(User.id == user_id)
+        .values(remaining_lesson_total=func.coalesce(User.remaining_lesson_total, 0) + count)
+    )
+    if restored:
+        mark_user_data_changed(user_id)
+    return restored
+
+def adjust_user_lesson_total(user_id: int, diff: int) -> bool:
+    """회원 통합 레슨 횟수를 diff 만큼 조정 (관리자 이용권 수정). 0 미만이 되면 0 으로 맞춥니다."""
+    new_total = func.coalesce(User.remaining_lesson_total, 0) + diff
+    adjusted = _execute_counter_update(
+        update(User).where(User.id == user_id)
+        .values(remaining_lesson_total=case((new_total < 0, 0), else_=new_total))
+    )
+    if adjusted:
+        mark_user_data_changed(user_id)
+    return adjusted
 
 
 # --- 예약 생성 관련 함수 ---
@@ -114,8 +258,11 @@ def create_booking(user_id: int, booth_id: int, pro_id: int | None,
     used_lesson_ticket = None # 쿠폰 사용 시 여기에 할당됨
     use_total_lesson_count = False # User.remaining_lesson_total 사용 여부
 
+    # 타석/레슨 이용권 후보를 한 번에 조회한 뒤 메모리에서 정책에 따라 선택
+    candidate_tickets = find_candidate_tickets(user.id, start_time.date())
+
     if booking_type == BookingType.LESSON:
-        coupon_ticket, can_use_total = find_available_ticket_for_lesson(user, start_time)
+        coupon_ticket = pick_lesson_ticket(candidate_tickets)
         if coupon_ticket:
             # 쿠폰 잔여 횟수가 사용할 횟수보다 많은지 확인
             if (coupon_ticket.remaining_lesson_count or 0) < lesson_count_to_use:
@@ -126,18 +273,18 @@ def create_booking(user_id: int, booth_id: int, pro_id: int | None,
             used_lesson_ticket = coupon_ticket
         elif (user.remaining_lesson_total or 0) >= lesson_count_to_use: # 통합 레슨 횟수 확인
             use_total_lesson_count = True
-            used_taseok_ticket = find_available_ticket_for_taseok(user, start_time)
+            used_taseok_ticket = pick_taseok_ticket(candidate_tickets)
             if not used_taseok_ticket:
                  return False, "..." # 타석 이용권 없음
         else:
              return False, f"통합 레슨 잔여 횟수({user.remaining_lesson_total})가 부족합니다 ({lesson_count_to_use}회 필요).", None
     else: # BookingType.TASEOK_ONLY
         # 타석만 예약 시
-        used_taseok_ticket = find_available_ticket_for_taseok(user, start_time)
+        used_taseok_ticket = pick_taseok_ticket(candidate_tickets)
         if not used_taseok_ticket:
             return False, "예약에 필요한 유효한 타석 이용권이 없습니다.", None
         # 타석만 이용 시 쿠폰 레슨 티켓은 사용할 수 없도록 추가 검증 필요 (find_available_ticket_for_taseok 에서 처리하거나 여기서)
-        if used_taseok_ticket.ticket_template and used_taseok_ticket.ticket_template.category == TicketCategory.COUPON:
+        if used_taseok_ticket.category == TicketCategory.COUPON:
              return False, "쿠폰 레슨 이용권으로는 타석만 예약할 수 없습니다.", None
 
 
@@ -159,40 +306,23 @@ def create_booking(user_id: int, booth_id: int, pro_id: int | None,
         )
         # duration_minutes는 __init__에서 자동 계산됨
 
-        # 4. 이용권 및 레슨 횟수 차감
+        # 4. 이용권 및 레슨 횟수 차감 (조건부 UPDATE, 부족하면 예외 -> 롤백)
         if booking_type == BookingType.LESSON:
-            if used_lesson_ticket: # 쿠폰 사용 시
-                if (used_lesson_ticket.remaining_lesson_count or 0) >= lesson_count_to_use:
-                    used_lesson_ticket.remaining_lesson_count -= lesson_count_to_use # 지정된 횟수만큼 차감
-                    # 타석 횟수도 차감 (쿠폰 정책)
-                    if used_lesson_ticket.remaining_taseok_count is not None and (used_lesson_ticket.remaining_taseok_count or 0) >= lesson_count_to_use :
-                         used_lesson_ticket.remaining_taseok_count -= lesson_count_to_use
-                    else:
-                        raise Exception("쿠폰 타석 횟수 부족 (차감 단계 오류)")
-
-                    used_lesson_ticket.update_status()
-                    db.session.add(used_lesson_ticket)
-                else: raise Exception("사용 가능한 레슨 횟수가 없습니다.") # 쿠폰 횟수 부족
+            if used_lesson_ticket: # 쿠폰 사용 시: 레슨 + 타석 동일 횟수 차감 (쿠폰 정책)
+                if not deduct_ticket_counts(used_lesson_ticket.id, taseok=lesson_count_to_use, lesson=lesson_count_to_use):
+                    raise Exception("쿠폰 레슨/타석 잔여 횟수가 부족합니다.")
             elif use_total_lesson_count: # 통합 레슨 사용 시
-                if (user.remaining_lesson_total or 0) >= lesson_count_to_use:
-                    user.remaining_lesson_total -= lesson_count_to_use # 지정된 횟수만큼 차감
-                    db.session.add(user)
-                else: raise Exception("사용 가능한 레슨 횟수가 없습니다.") # 통합 횟수 부족
-
-        # ... (타석 횟수 차감 - 타석만 이용 or 쿠폰 사용 시) ...
-        if used_taseok_ticket and not used_lesson_ticket: # 타석 이용권만 사용 시 (레슨+타석권 또는 타석만)
-            if used_taseok_ticket.remaining_taseok_count is not None:
-                 if used_taseok_ticket.remaining_taseok_count > 0:
-                     used_taseok_ticket.remaining_taseok_count -= 1 # 타석은 1회 차감
-                     used_taseok_ticket.update_status()
-                     db.session.add(used_taseok_ticket)
-                 else: raise Exception("사용 가능한 타석 이용권이 없습니다.") # 타석 횟수 부족
-        elif used_taseok_ticket and used_lesson_ticket and used_taseok_ticket.id == used_lesson_ticket.id:
-            # 쿠폰 사용 시 타석 차감은 위 레슨 차감 로직에서 이미 처리됨
-            pass
+                if not deduct_user_lesson_total(user.id, lesson_count_to_use):
+                    raise Exception("사용 가능한 레슨 횟수가 없습니다.") # 통합 횟수 부족
+                db.session.expire(user, ['remaining_lesson_total'])
 
+        # ... (타석 횟수 차감 - 타석만 이용 or 통합 레슨 사용 시, 쿠폰은 위에서 처리됨) ...
+        if used_taseok_ticket and not used_lesson_ticket and used_taseok_ticket.remaining_taseok_count is not None:
+            if not deduct_ticket_counts(used_taseok_ticket.id, taseok=1): # 타석은 1회 차감
+                raise Exception("사용 가능한 타석 이용권이 없습니다.") # 타석 횟수 부족
 
         db.session.add(new_booking)
+        record_booking_stats([new_booking]) # 일별 집계 (같은 트랜잭션)
         db.session.commit()
 
         return True, "예약이 성공적으로 완료되었습니다.", new_booking
@@ -203,6 +333,126 @@ def create_booking(user_id: int, booth_id: int, pro_id: int | None,
         return False, f"예약 생성 중 오류가 발생했습니다: {e}", None
 
 
+def create_recurring_booking(user_id: int, booth_id: int, pro_id: int,
+                             first_start: datetime.datetime, duration: int, weeks: int,
+                             memo: str = None, lesson_count_to_use: int = 1) -> tuple[bool, str, list[Booking], list[dict]]:
+    """
+    매주 같은 시간의 레슨 예약을 weeks 회 한 번에 생성합니다 (하나의 트랜잭션).
+
+    모든 회차의 겹침 여부는 한 번의 기간 쿼리로, 이용권 차감은 한 번 조회한 후보 티켓에 대해
+    메모리에서 회차 순서대로 계획합니다. 한 회차라도 실패하면 아무것도 저장하지 않고
+    회차별 실패 사유를 반환합니다.
+
+    :return: (성공 여부, 메시지, 생성된 예약 목록, 회차별 실패 목록 [{'start_time', 'reason'}, ...])
+    """
+    if weeks < 1:
+        return False, "반복 횟수는 1회 이상이어야 합니다.", [], []
+
+    user = db.session.get(User, user_id)
+    if not user: return False, "사용자를 찾을 수 없습니다.", [], []
+
+    booth = db.session.get(Booth, booth_id)
+    if not booth or not booth.is_available or booth.current_status != BoothStatus.AVAILABLE:
+        return False, "선택한 타석은 예약할 수 없습니다.", [], []
+
+    occurrences = []
+    for week in range(weeks):
+        start_time = first_start + datetime.timedelta(weeks=week)
+        occurrences.append((start_time, start_time + datetime.timedelta(minutes=duration)))
+
+    # 1. 전체 기간의 기존 예약을 한 번에 조회
+    existing_bookings = Booking.query.filter(
+        Booking.booth_id == booth_id,
+        Booking.status == BookingStatus.SCHEDULED,
+        Booking.end_time > occurrences[0][0],
+        Booking.start_time < occurrences[-1][1]
+    ).all()
+
+    # 2. 전체 기간의 이용권 후보를 한 번에 조회
+    candidate_tickets = find_candidate_tickets(user.id, occurrences[0][0].date(), occurrences[-1][0].date())
+
+    conflicts = []
+    new_bookings = []
+    planned_ticket_deductions = {} # {ticket_id: [타석 차감, 레슨 차감]}
+    planned_lesson_total_deduction = 0
+    # 3. 회차별 차감 계획 (ORM 객체의 잔여 횟수를 메모리에서만 변경, 저장은 조건부 UPDATE 로)
+    with db.session.no_autoflush:
+        for start_time, end_time in occurrences:
+            overlapping = next((b for b in existing_bookings
+                                if b.end_time > start_time and b.start_time < end_time), None)
+            if overlapping:
+                conflicts.append({'start_time': start_time, 'reason': f"기존 예약(ID: {overlapping.id})과 시간이 겹칩니다."})
+                continue
+
+            day_tickets = tickets_valid_on(candidate_tickets, start_time.date())
+            used_taseok_ticket = None
+            used_lesson_ticket = None
+            coupon_ticket = pick_lesson_ticket(day_tickets)
+            if coupon_ticket:
+                if (coupon_ticket.remaining_lesson_count or 0) < lesson_count_to_use or \
+                        (coupon_ticket.remaining_taseok_count or 0) < lesson_count_to_use:
+                    conflicts.append({'start_time': start_time, 'reason': f"쿠폰 잔여 횟수가 부족합니다 ({lesson_count_to_use}회 필요)."})
+                    continue
+                coupon_ticket.remaining_lesson_count -= lesson_count_to_use
+                coupon_ticket.remaining_taseok_count -= lesson_count_to_use
+                used_taseok_ticket = used_lesson_ticket = coupon_ticket
+                planned = planned_ticket_deductions.setdefault(coupon_ticket.id, [0, 0])
+                planned[0] += lesson_count_to_use
+                planned[1] += lesson_count_to_use
+            elif (user.remaining_lesson_total or 0) >= lesson_count_to_use:
+                used_taseok_ticket = pick_taseok_ticket(day_tickets)
+                if not used_taseok_ticket:
+                    conflicts.append({'start_time': start_time, 'reason': "유효한 타석 이용권이 없습니다."})
+                    continue
+                user.remaining_lesson_total -= lesson_count_to_use
+                planned_lesson_total_deduction += lesson_count_to_use
+                if used_taseok_ticket.remaining_taseok_count is not None:
+                    used_taseok_ticket.remaining_taseok_count -= 1
+                    planned_ticket_deductions.setdefault(used_taseok_ticket.id, [0, 0])[0] += 1
+            else:
+                conflicts.append({'start_time': start_time, 'reason': f"통합 레슨 잔여 횟수({user.remaining_lesson_total})가 부족합니다."})
+                continue
+
+            new_bookings.append(Booking(
+                user_id=user_id,
+                booth_id=booth_id,
+                pro_id=pro_id,
+                booking_type=BookingType.LESSON,
+                start_time=start_time,
+                end_time=end_time,
+                status=BookingStatus.SCHEDULED,
+                memo=memo,
+                used_taseok_ticket_id=used_taseok_ticket.id,
+                used_lesson_ticket_id=used_lesson_ticket.id if used_lesson_ticket else None,
+                used_lesson_count=lesson_count_to_use
+            ))
+
+    # 계획용으로 변경한 메모리 값은 버리고, 실제 차감은 아래 조건부 UPDATE 로 수행
+    for ticket in candidate_tickets:
+        db.session.expire(ticket, ['remaining_taseok_count', 'remaining_lesson_count'])
+    db.session.expire(user, ['remaining_lesson_total'])
+
+    if conflicts:
+        db.session.rollback()
+        return False, f"{len(conflicts)}개 회차를 예약할 수 없어 전체 예약을 취소했습니다.", [], conflicts
+
+    # 4. 티켓별/회원별 합계를 한 번씩 차감하고 한 번에 저장
+    try:
+        for ticket_id, (taseok, lesson) in planned_ticket_deductions.items():
+            if not deduct_ticket_counts(ticket_id, taseok=taseok, lesson=lesson):
+                raise Exception("다른 예약과 동시에 처리되어 이용권 잔여 횟수가 부족합니다.")
+        if planned_lesson_total_deduction and not deduct_user_lesson_total(user.id, planned_lesson_total_deduction):
+            raise Exception("다른 예약과 동시에 처리되어 통합 레슨 잔여 횟수가 부족합니다.")
+        db.session.add_all(new_bookings)
+        record_booking_stats(new_bookings) # 일별 집계 (같은 트랜잭션)
+        db.session.commit()
+        return True, f"{len(new_bookings)}회 반복 예약이 성공적으로 완료되었습니다.", new_bookings, []
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error creating recurring booking: {e}")
+        return False, f"반복 예약 생성 중 오류가 발생했습니다: {e}", [], []
+
+
 # --- 예약 취소 관련 함수 ---
 
 def cancel_booking(booking_id: int, cancelled_by_admin: bool = False) -> tuple[bool, str]:
@@ -222,39 +472,32 @@ def cancel_booking(booking_id: int, cancelled_by_admin: bool = False) -> tuple[b
 
     try:
         lessons_to_rollback = booking.used_lesson_count or 0
-        # 1. 예약 상태 변경
-        original_status = booking.status
-        booking.status = BookingStatus.CANCELLED_ADMIN if cancelled_by_admin else BookingStatus.CANCELLED_USER
+        # 1. 예약 상태 변경 (SCHEDULED 일 때만 - 동시 취소 시 횟수가 두 번 복구되지 않도록 조건부 UPDATE)
+        new_status = BookingStatus.CANCELLED_ADMIN if cancelled_by_admin else BookingStatus.CANCELLED_USER
+        if not _execute_counter_update(
+            update(Booking).where(Booking.id == booking_id, Booking.status == BookingStatus.SCHEDULED)
+            .values(status=new_status)
+        ):
+            db.session.rollback()
+            return False, "이미 처리된 예약입니다."
+        db.session.expire(booking, ['status'])
 
         # 2. 횟수 롤백
 
         # 타석 횟수 롤백 (무조건 1회 롤백)
         if booking.used_taseok_ticket_id:
-            taseok_ticket = db.session.get(Ticket, booking.used_taseok_ticket_id)
-            if taseok_ticket and taseok_ticket.remaining_taseok_count is not None:
-                    if taseok_ticket.total_taseok_count is None or taseok_ticket.remaining_taseok_count < taseok_ticket.total_taseok_count:
-                        taseok_ticket.remaining_taseok_count += 1 # 항상 1회만 롤백
-                        taseok_ticket.update_status()
-                        db.session.add(taseok_ticket)
-
-
+            restore_ticket_count(booking.used_taseok_ticket_id, Ticket.remaining_taseok_count, Ticket.total_taseok_count, 1)
 
         # 레슨 횟수 롤백 (저장된 횟수만큼)
         if lessons_to_rollback > 0:
             if booking.used_lesson_ticket_id: # 쿠폰 사용 취소
-                lesson_ticket = db.session.get(Ticket, booking.used_lesson_ticket_id)
-                if lesson_ticket and lesson_ticket.remaining_lesson_count is not None:
-                    if lesson_ticket.total_lesson_count is None or lesson_ticket.remaining_lesson_count < lesson_ticket.total_lesson_count:
-                        lesson_ticket.remaining_lesson_count += lessons_to_rollback # 롤백
-                        lesson_ticket.update_status()
-                        db.session.add(lesson_ticket)
+                restore_ticket_count(booking.used_lesson_ticket_id, Ticket.remaining_lesson_count, Ticket.total_lesson_count, lessons_to_rollback)
             else: # 통합 레슨 횟수 사용 취소
-                user = booking.user
-                if user:
-                    user.remaining_lesson_total = (user.remaining_lesson_total or 0) + lessons_to_rollback # 롤백
-                    db.session.add(user)
+                restore_user_lesson_total(booking.user_id, lessons_to_rollback)
+                if booking.user:
+                    db.session.expire(booking.user, ['remaining_lesson_total'])
 
-        db.session.add(booking)
+        record_booking_stats([booking], sign=-1) # 일별 집계에서 제외
         db.session.commit()
         return True, "예약이 성공적으로 취소되었습니다."
 
@@ -263,6 +506,32 @@ def cancel_booking(booking_id: int, cancelled_by_admin: bool = False) -> tuple[b
         print(f"Error cancelling booking: {e}")
         return False, f"예약 취소 중 오류가 발생했습니다: {e}"
 
-# --- 예약 조회 관련 함수 (필요시 추가) ---
-# def get_bookings_by_date(date): ...
-# def get_user_bookings(user_id): ...
\ No newline at end of file
+# --- 예약 조회 관련 함수 ---
+
+def filter_bookings_query(date_from: datetime.date = None, date_to: datetime.date = None,
+                          booth_id: int = None, pro_id: int = None, status: BookingStatus = None,
+                          user_id: int = None, member: str = None):
+    """
+    예약 목록 필터 조건을 적용한 쿼리를 반환합니다 (정렬/페이지네이션은 호출하는 쪽에서).
+
+    :param date_from: 시작일 (해당 날짜 00:00 이후 시작)
+    :param date_to: 종료일 (해당 날짜 24:00 이전 시작)
+    :param member: 회원 이름 앞부분 또는 연락처 뒷 4자리
+    """
+    query = Booking.query
+    if date_from:
+        query = query.filter(Booking.start_time >= datetime.datetime.combine(date_from, datetime.time.min))
+    if date_to:
+        query = query.filter(Booking.start_time < datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time.min))
+    if booth_id:
+        query = query.filter(Booking.booth_id == booth_id)
+    if pro_id:
+        query = query.filter(Booking.pro_id == pro_id)
+    if status:
+        query = query.filter(Booking.status == status)
+    if user_id:
+        query = query.filter(Booking.user_id == user_id)
+    if member:
+        member_ids = select(User.id).where(or_(User.name.like(f"{member}%"), User.phone_last4 == member))
+        query = query.filter(Booking.user_id.in_(member_ids))
+    return query
\ No newline at end of file
@@ -0,0 +1,76 @@
+# app/services/booking_sweeper.py
+import datetime
+import threading
+import time
+from app.extensions import db
+from app.models import Booking
+from app.models.enums import BookingStatus
+from sqlalchemy import select, update
+
+
+def sweep_past_bookings(now: datetime.datetime = None, grace_minutes: int = 30,
+                        new_status: BookingStatus = BookingStatus.COMPLETED,
+                        chunk_size: int = 1000) -> tuple[int, float]:
+    """
+    종료 시간이 지난 SCHEDULED 예약을 일괄로 new_status(COMPLETED 또는 NO_SHOW)로 변경합니다.
+
+    ORM 객체를 불러오지 않고 ID 목록만 chunk_size 만큼 조회한 뒤 UPDATE ... WHERE id IN (...)
+    으로 변경하며, 청크마다 커밋하여 잠금 시간을 짧게 유지합니다.
+
+    :param now: 기준 시각 (기본값: 현재 시각)
+    :param grace_minutes: 종료 후 유예 시간(분). 이 시간이 지난 예약만 처리
+    :param new_status: 변경할 상태
+    :param chunk_size: 한 번에 처리할 예약 수
+    :return: (변경된 예약 수, 소요 시간(초))
+    """
+    if new_status not in (BookingStatus.COMPLETED, BookingStatus.NO_SHOW):
+        raise ValueError("new_status 는 COMPLETED 또는 NO_SHOW 만 가능합니다.")
+
+    started = time.perf_counter()
+    cutoff = (now or datetime.datetime.now()) - datetime.timedelta(minutes=grace_minutes)
+    changed = 0
+    last_id = 0
+    try:
+        while True:
+            ids = db.session.execute(
+                select(Booking.id).where(
+                    Booking.status == BookingStatus.SCHEDULED,
+                    Booking.end_time < cutoff,
+                    Booking.id > last_id
+                ).order_by(Booking.id).limit(chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            result = db.session.execute(
+                update(Booking)
+                .where(Booking.id.in_(ids), Booking.status == BookingStatus.SCHEDULED) # 그 사이 취소된 예약 제외
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            changed += result.rowcount
+            last_id = ids[-1]
+    except Exception:
+        db.session.rollback()
+        raise
+    return changed, time.perf_counter() - started
+
+
+def start_periodic_sweeper(app, interval_seconds: int):
+    """앱 프로세스 안에서 interval_seconds 마다 sweep_past_bookings 를 실행하는 데몬 스레드를 시작합니다."""
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            with app.app_context():
+                try:
+                    changed, elapsed = sweep_past_bookings(grace_minutes=app.config.get('BOOKING_SWEEP_GRACE_MINUTES', 30))
+                    if changed:
+                        app.logger.info(f"[sweep-bookings] {changed}건 이용 완료 처리 ({elapsed:.2f}s)")
+                except Exception as e:
+                    app.logger.error(f"[sweep-bookings] 오류: {e}")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name='booking-sweeper', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,114 @@
+# app/services/export_service.py
+# 정산용 예약/이용권 판매 내역 내보내기 (CSV / JSON Lines 스트리밍)
+import csv
+import datetime
+import enum
+import io
+import json
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from app.extensions import db
+from app.models import Booking, Booth, Pro, Ticket, TicketTemplate, User
+from .booking_service import filter_bookings_query
+
+EXPORT_BATCH_SIZE = 1000 # 한 번에 DB 에서 읽어 오는 행 수 (yield_per)
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+BOOKING_EXPORT_COLUMNS = [
+    'booking_id', 'start_time', 'end_time', 'duration_minutes', 'status', 'booking_type',
+    'member_name', 'member_phone', 'booth_name', 'pro_name', 'used_lesson_count',
+    'taseok_ticket_id', 'taseok_ticket_name', 'lesson_ticket_id', 'lesson_ticket_name', 'memo', 'created_at',
+]
+TICKET_EXPORT_COLUMNS = [
+    'ticket_id', 'issue_date', 'member_name', 'member_phone', 'ticket_name', 'category', 'template_name',
+    'pro_name', 'price', 'start_date', 'expiry_date', 'total_taseok_count', 'remaining_taseok_count',
+    'total_lesson_count', 'remaining_lesson_count', 'is_active', 'memo',
+]
+
+
+def booking_export_rows(date_from: datetime.date = None, date_to: datetime.date = None, **filters):
+    """
+    예약 목록과 같은 필터로 예약 내역을 회원/타석/프로/사용 이용권 이름과 함께 한 번의 조인 쿼리로 읽어
+    BOOKING_EXPORT_COLUMNS 순서의 튜플로 yield 합니다. (ORM 객체를 만들지 않고 yield_per 로 나눠 읽음)
+    """
+    taseok_ticket = aliased(Ticket)
+    lesson_ticket = aliased(Ticket)
+    query = filter_bookings_query(date_from=date_from, date_to=date_to, **filters) \
+        .join(User, Booking.user_id == User.id) \
+        .join(Booth, Booking.booth_id == Booth.id) \
+        .outerjoin(Pro, Booking.pro_id == Pro.id) \
+        .outerjoin(taseok_ticket, Booking.used_taseok_ticket_id == taseok_ticket.id) \
+        .outerjoin(lesson_ticket, Booking.used_lesson_ticket_id == lesson_ticket.id) \
+        .with_entities(
+            Booking.id, Booking.start_time, Booking.end_time, Booking.duration_minutes, Booking.status, Booking.booking_type,
+            User.name, User.phone, Booth.name, Pro.name, Booking.used_lesson_count,
+            Booking.used_taseok_ticket_id, taseok_ticket.name, Booking.used_lesson_ticket_id, lesson_ticket.name,
+            Booking.memo, Booking.created_at
+        ) \
+        .order_by(Booking.start_time, Booking.id) \
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    yield from query
+
+
+def ticket_export_rows(date_from: datetime.date = None, date_to: datetime.date = None):
+    """
+    발급일 기준 기간의 이용권 판매 내역 (회원/템플릿/담당 프로 이름 포함)을
+    TICKET_EXPORT_COLUMNS 순서의 튜플로 yield 합니다.
+    """
+    stmt = select(
+        Ticket.id, Ticket.issue_date, User.name, User.phone, Ticket.name, Ticket.category, TicketTemplate.name,
+        Pro.name, Ticket.price, Ticket.start_date, Ticket.expiry_date, Ticket.total_taseok_count, Ticket.remaining_taseok_count,
+        Ticket.total_lesson_count, Ticket.remaining_lesson_count, Ticket.is_active, Ticket.memo
+    ).join(User, Ticket.user_id == User.id) \
+        .outerjoin(TicketTemplate, Ticket.ticket_template_id == TicketTemplate.id) \
+        .outerjoin(Pro, Ticket.pro_id == Pro.id)
+    if date_from:
+        stmt = stmt.where(Ticket.issue_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Ticket.issue_date <= date_to)
+    stmt = stmt.order_by(Ticket.issue_date, Ticket.id) \
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    yield from db.session.execute(stmt)
+
+
+def _export_value(value):
+    """Enum 은 표시값, 날짜는 ISO 형식으로 변환"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def stream_export(columns: list[str], rows, fmt: str = 'csv', batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    행 이터레이터를 CSV(엑셀용 BOM 포함) 또는 JSON Lines 문자열 조각으로 변환해 yield 합니다.
+    batch_size 행마다 한 조각씩 내보내 전체 결과를 메모리에 만들지 않습니다.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        buffer.write('\ufeff')
+        writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        values = [_export_value(value) for value in row]
+        if fmt == 'csv':
+            writer.writerow(['' if value is None else value for value in values])
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+            buffer.write('\n')
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    chunk = buffer.getvalue()
+    if chunk:
+        yield chunk
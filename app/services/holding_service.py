@@ -2,7 +2,7 @@
 import datetime
 from app.extensions import db
 from app.models import Ticket, Holding, User # 필요한 모델 임포트
-from sqlalchemy import and_ # 겹침 검사용
+from sqlalchemy import and_, func # 겹침 검사용, 집계
 
 # User 최종 만료일 재계산 함수 (user_service.py로 옮기는 것이 더 적합할 수 있음)
 # 여기서는 임시로 여기에 정의하거나, user_service를 import해서 사용
@@ -13,19 +13,32 @@ def recalculate_master_expiry_date(user: User):
     if not user:
         return
 
-    latest_expiry = None
-    active_tickets = user.tickets.filter_by(is_active=True).all() # is_active 상태인 티켓만 고려
-
-    for ticket in active_tickets:
-        if ticket.expiry_date:
-            if latest_expiry is None or ticket.expiry_date > latest_expiry:
-                latest_expiry = ticket.expiry_date
+    # is_active 상태인 티켓만 고려, 티켓을 불러오지 않고 DB 집계(MAX)로 계산
+    latest_expiry = db.session.query(func.max(Ticket.expiry_date)).filter(
+        Ticket.user_id == user.id,
+        Ticket.is_active == True
+    ).scalar()
 
     user.master_expiry_date = latest_expiry
     # db.session.add(user) # user 객체는 이미 세션에 있을 수 있음
     # db.session.commit() # 호출하는 쪽에서 커밋하는 것이 좋음
 
 
+def get_holdings_by_ticket(ticket_ids: list[int]) -> dict[int, list[Holding]]:
+    """
+    여러 티켓의 홀딩 내역을 한 번의 IN 쿼리로 조회해 {ticket_id: [Holding, ...]} 으로 반환합니다.
+    (티켓마다 ticket.holdings 를 조회하는 N+1 방지, 건수는 목록 길이로 확인)
+    """
+    holdings_by_ticket = {}
+    if not ticket_ids:
+        return holdings_by_ticket
+    holdings = Holding.query.filter(Holding.ticket_id.in_(ticket_ids)) \
+        .order_by(Holding.ticket_id, Holding.start_date).all()
+    for holding in holdings:
+        holdings_by_ticket.setdefault(holding.ticket_id, []).append(holding)
+    return holdings_by_ticket
+
+
 def add_new_holding(ticket_id: int, start_date: datetime.date, end_date: datetime.date, reason: str = None) -> tuple[bool, str, Holding | None]:
     """
     새로운 홀딩을 추가하고 관련 데이터를 업데이트합니다.
@@ -0,0 +1,92 @@
+# app/services/principal_cache.py
+# Flask-Login user_loader 용 로그인 사용자 캐시.
+# 매 요청마다 User 행을 읽는 대신 id/이름/관리자 여부만 담은 가벼운 Principal 을 TTL/LRU 로 보관합니다.
+# 관리자 권한/비밀번호 변경, 로그인 시 invalidate_principal() 로 즉시 비우고,
+# 다른 워커(프로세스)에는 TTL(PRINCIPAL_CACHE_TTL_SECONDS) 이 지나면 반영됩니다.
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from flask_login import UserMixin
+from app.extensions import db
+
+DEFAULT_PRINCIPAL_TTL_SECONDS = 60
+DEFAULT_PRINCIPAL_CACHE_SIZE = 1024
+
+
+class Principal(UserMixin):
+    """세션과 무관한 로그인 사용자 정보 (current_user 로 사용)"""
+    def __init__(self, id, name, is_admin):
+        self.id = id
+        self.name = name
+        self.is_admin = bool(is_admin)
+
+    def __repr__(self):
+        return f'<Principal {self.id} {self.name}{" (admin)" if self.is_admin else ""}>'
+
+
+class PrincipalCache:
+    """스레드 안전 TTL + LRU 캐시 {user_id: (Principal, 만료시각)}"""
+    def __init__(self, ttl_seconds=DEFAULT_PRINCIPAL_TTL_SECONDS, max_size=DEFAULT_PRINCIPAL_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            principal, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return principal
+
+    def put(self, principal):
+        with self._lock:
+            self._items[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._items.move_to_end(principal.id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(user_id, None)
+
+
+def _get_principal_cache() -> PrincipalCache:
+    cache = current_app.extensions.get('principal_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('principal_cache', PrincipalCache(
+            ttl_seconds=current_app.config.get('PRINCIPAL_CACHE_TTL_SECONDS', DEFAULT_PRINCIPAL_TTL_SECONDS),
+            max_size=current_app.config.get('PRINCIPAL_CACHE_SIZE', DEFAULT_PRINCIPAL_CACHE_SIZE)
+        ))
+    return cache
+
+
+def load_principal(user_id: int) -> Principal | None:
+    """캐시에 있으면 DB 조회 없이 반환, 없으면 필요한 컬럼만 조회해 캐시"""
+    from app.models import User # user_loader 가 models/user.py 에서 호출하므로 지연 임포트
+    cache = _get_principal_cache()
+    principal = cache.get(user_id)
+    if principal is not None:
+        return principal
+    row = db.session.execute(
+        db.select(User.id, User.name, User.is_admin).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    principal = Principal(row.id, row.name, row.is_admin)
+    cache.put(principal)
+    return principal
+
+
+def invalidate_principal(user_id: int | None = None):
+    """관리자 권한/비밀번호/이름 변경, 로그인 시 호출 (user_id 없으면 전체 비움)"""
+    _get_principal_cache().invalidate(user_id)
@@ -0,0 +1,122 @@
+# app/services/reference_cache.py
+# 프로/타석/이용권 템플릿처럼 자주 읽고 드물게 바뀌는 기준 데이터를 프로세스 메모리에 캐시합니다.
+# - 변경하는 쪽(CRUD 뷰, init-booths)은 커밋 전에 bump_reference_version() 호출
+# - 읽는 쪽은 REFERENCE_CACHE_CHECK_SECONDS 마다 한 번만 DB 버전 스탬프를 확인 (그 사이에는 쿼리 0회)
+# - 같은 프로세스의 변경은 커밋 직후 바로 반영, 다른 워커의 변경은 다음 버전 확인 때 반영
+import threading
+import time
+from flask import current_app, g
+from sqlalchemy import event, update, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import Pro, Booth, TicketTemplate, CacheVersion
+from app.models.cache_version import REFERENCE_CACHE_NAME
+
+_SESSION_DIRTY_KEY = 'reference_cache_dirty'
+
+
+class _ReferenceCache:
+    """앱(프로세스)별 캐시 상태"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = None
+        self.version = None # 캐시된 데이터를 읽을 당시의 DB 버전
+        self.checked_at = 0.0 # 마지막 버전 확인 시각 (time.monotonic)
+
+    def invalidate(self):
+        with self.lock:
+            self.data = None
+            self.version = None
+
+
+def _get_cache() -> _ReferenceCache:
+    return current_app.extensions.setdefault('reference_cache', _ReferenceCache())
+
+
+def _read_db_version() -> int:
+    version = db.session.execute(
+        select(CacheVersion.version).where(CacheVersion.name == REFERENCE_CACHE_NAME)
+    ).scalar()
+    return version or 0
+
+
+def _load_reference_data() -> dict:
+    """ORM 객체 대신 (id, 이름 ...) 튜플로 저장 (세션과 무관하게 재사용)"""
+    return {
+        'pros': [(p.id, p.name) for p in Pro.query.order_by(Pro.name).all()],
+        'booths': [(b.id, b.name, b.is_available) for b in Booth.query.order_by(Booth.name).all()],
+        'ticket_templates': [(t.id, t.name, t.category.value if t.category else '')
+                             for t in TicketTemplate.query.filter_by(is_active=True).order_by(TicketTemplate.name).all()],
+    }
+
+
+def get_reference_data() -> dict:
+    """캐시된 기준 데이터를 반환합니다 (버전 확인 간격 내에는 DB 조회 없음)."""
+    if 'reference_data' in g: # 한 요청 안에서는 버전 확인도 한 번만
+        return g.reference_data
+    g.reference_data = _get_reference_data()
+    return g.reference_data
+
+
+def _get_reference_data() -> dict:
+    cache = _get_cache()
+    interval = current_app.config.get('REFERENCE_CACHE_CHECK_SECONDS', 5)
+    if cache.data is not None and time.monotonic() - cache.checked_at < interval:
+        return cache.data
+
+    with cache.lock:
+        if cache.data is not None and time.monotonic() - cache.checked_at < interval:
+            return cache.data
+        version = _read_db_version() # 버전을 먼저 읽어야 로딩 중 변경이 있어도 다음 확인 때 다시 읽음
+        if cache.data is None or version != cache.version:
+            cache.data = _load_reference_data()
+            cache.data['version'] = version
+            cache.version = version
+        cache.checked_at = time.monotonic()
+        return cache.data
+
+
+def bump_reference_version():
+    """
+    기준 데이터 변경을 알립니다. 현재 세션의 트랜잭션 안에서 버전을 올리므로
+    변경 내용과 함께 커밋되며, 커밋 후 이 프로세스의 캐시는 즉시 비워집니다.
+    """
+    # 버전 행은 마이그레이션(또는 create_all)에서 미리 만들어 두므로 UPDATE 만 (동시 첫 변경 시 INSERT 충돌 없음)
+    db.session.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == REFERENCE_CACHE_NAME)
+        .values(version=CacheVersion.version + 1)
+    )
+    db.session.info[_SESSION_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(_SESSION_DIRTY_KEY, False):
+        _get_cache().invalidate()
+        g.pop('reference_data', None)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_SESSION_DIRTY_KEY, None)
+
+
+def get_reference_version() -> int:
+    """캐시된 기준 데이터의 버전 (API ETag 등에 사용)"""
+    return get_reference_data()['version']
+
+
+# --- 폼 SelectField 용 선택지 ---
+def pro_choices():
+    return [(pro_id, name) for pro_id, name in get_reference_data()['pros']]
+
+
+def booth_choices(available_only: bool = False):
+    return [(booth_id, name) for booth_id, name, is_available in get_reference_data()['booths']
+            if is_available or not available_only]
+
+
+def ticket_template_choices():
+    """활성 이용권 템플릿 (이름 (카테고리))"""
+    return [(t_id, f"{name} ({category})") for t_id, name, category in get_reference_data()['ticket_templates']]
@@ -0,0 +1,184 @@
+# app/services/stats_service.py
+# 일별 집계(daily_stats) 증감/재계산 및 리포트 조회
+import datetime
+from sqlalchemy import select, delete, func, literal, insert, cast, Integer
+from sqlalchemy.dialects import sqlite, postgresql
+from app.extensions import db
+from app.models import Booking, Ticket, DailyStat
+from app.models.enums import BookingStatus
+
+STAT_FIELDS = ('booking_count', 'booked_minutes', 'lesson_count', 'ticket_count', 'revenue')
+CANCELLED_STATUSES = (BookingStatus.CANCELLED_USER, BookingStatus.CANCELLED_ADMIN) # 집계에서 제외하는 예약 상태
+
+
+def _category_key(category) -> str:
+    return category.name if category is not None else ''
+
+
+def _apply_deltas(deltas: dict):
+    """
+    {(stat_date, booth_id, pro_id, category): {필드: 증감}} 을 daily_stats 에 더합니다.
+    SQLite/PostgreSQL 은 키 충돌 시 UPDATE 하는 UPSERT 한 번(executemany)으로 처리합니다.
+    호출하는 쪽 트랜잭션 안에서 실행되며 커밋은 하지 않습니다.
+    """
+    rows = []
+    for (stat_date, booth_id, pro_id, category), values in deltas.items():
+        if any(values.get(field) for field in STAT_FIELDS):
+            rows.append({'stat_date': stat_date, 'booth_id': booth_id, 'pro_id': pro_id, 'category': category,
+                         **{field: values.get(field, 0) for field in STAT_FIELDS}})
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(DailyStat.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['stat_date', 'booth_id', 'pro_id', 'category'],
+            set_={field: DailyStat.__table__.c[field] + stmt.excluded[field] for field in STAT_FIELDS}
+        )
+        db.session.connection().execute(stmt, rows)
+        return
+
+    # 그 외 DB: 행 단위로 조회 후 갱신
+    for row in rows:
+        stat = db.session.get(DailyStat, (row['stat_date'], row['booth_id'], row['pro_id'], row['category']))
+        if stat is None:
+            db.session.add(DailyStat(**row))
+        else:
+            for field in STAT_FIELDS:
+                setattr(stat, field, getattr(stat, field) + row[field])
+
+
+def record_booking_stats(bookings, sign: int = 1):
+    """
+    예약 생성(sign=1)/취소(sign=-1) 시 예약 수, 예약 시간, 소진 레슨 횟수를 반영합니다.
+    대분류는 사용한 타석 이용권 기준이며, 이용권은 세션에 이미 로드된 경우 추가 조회하지 않습니다.
+    """
+    deltas = {}
+    for booking in bookings:
+        category = None
+        if booking.used_taseok_ticket_id:
+            ticket = db.session.get(Ticket, booking.used_taseok_ticket_id)
+            category = ticket.category if ticket else None
+        minutes = booking.duration_minutes
+        if minutes is None:
+            minutes = int((booking.end_time - booking.start_time).total_seconds() // 60)
+        key = (booking.start_time.date(), booking.booth_id, booking.pro_id or 0, _category_key(category))
+        values = deltas.setdefault(key, dict.fromkeys(STAT_FIELDS, 0))
+        values['booking_count'] += sign
+        values['booked_minutes'] += sign * minutes
+        values['lesson_count'] += sign * (booking.used_lesson_count or 0)
+    _apply_deltas(deltas)
+
+
+def record_ticket_sales(tickets, sign: int = 1):
+    """
+    이용권 발급(sign=1)/삭제·수정 전 값 취소(sign=-1) 시 판매 수와 판매 금액을 반영합니다.
+    tickets 는 Ticket 객체 또는 같은 컬럼 이름의 dict (일괄 발급 INSERT 값) 목록입니다.
+    """
+    today = datetime.date.today()
+    deltas = {}
+    for ticket in tickets:
+        get = ticket.get if isinstance(ticket, dict) else (lambda name, t=ticket: getattr(t, name))
+        key = (get('issue_date') or today, 0, get('pro_id') or 0, _category_key(get('category')))
+        values = deltas.setdefault(key, dict.fromkeys(STAT_FIELDS, 0))
+        values['ticket_count'] += sign
+        values['revenue'] += sign * (get('price') or 0)
+    _apply_deltas(deltas)
+
+
+def _booked_minutes_sql(dialect: str):
+    """
+    예약 시간(분) SQL 식. duration_minutes 가 비어 있으면 record_booking_stats 와 같이
+    종료 - 시작 시간을 분 단위(소수점 이하 버림)로 계산합니다.
+    """
+    if dialect == 'sqlite':
+        elapsed = func.strftime('%s', Booking.end_time) - func.strftime('%s', Booking.start_time)
+    else:
+        elapsed = func.floor(func.extract('epoch', Booking.end_time - Booking.start_time))
+    return func.coalesce(Booking.duration_minutes, cast(elapsed, Integer) // 60)
+
+
+def rebuild_daily_stats(date_from: datetime.date = None, date_to: datetime.date = None) -> int:
+    """
+    기간(없으면 전체)의 daily_stats 를 원본 예약/이용권에서 다시 계산합니다 (DELETE 후 INSERT ... SELECT).
+    :return: 생성된 집계 행 수
+    """
+    stats = DailyStat.__table__
+    booking_date = func.date(Booking.start_time)
+    used_ticket = Ticket.__table__.alias('used_ticket')
+    booked_minutes = _booked_minutes_sql(db.session.get_bind().dialect.name)
+
+    delete_stmt = delete(stats)
+    booking_select = select(
+        booking_date, Booking.booth_id, func.coalesce(Booking.pro_id, 0),
+        func.coalesce(used_ticket.c.category, ''),
+        func.count(Booking.id),
+        func.coalesce(func.sum(booked_minutes), 0),
+        func.coalesce(func.sum(Booking.used_lesson_count), 0),
+        literal(0), literal(0)
+    ).select_from(Booking.__table__.outerjoin(used_ticket, Booking.used_taseok_ticket_id == used_ticket.c.id)) \
+        .where(Booking.status.notin_(CANCELLED_STATUSES))
+    ticket_select = select(
+        Ticket.issue_date, literal(0), func.coalesce(Ticket.pro_id, 0), func.coalesce(Ticket.category, ''),
+        literal(0), literal(0), literal(0),
+        func.count(Ticket.id), func.coalesce(func.sum(Ticket.price), 0)
+    )
+    if date_from:
+        delete_stmt = delete_stmt.where(stats.c.stat_date >= date_from)
+        booking_select = booking_select.where(Booking.start_time >= datetime.datetime.combine(date_from, datetime.time.min))
+        ticket_select = ticket_select.where(Ticket.issue_date >= date_from)
+    if date_to:
+        delete_stmt = delete_stmt.where(stats.c.stat_date <= date_to)
+        booking_select = booking_select.where(Booking.start_time < datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time.min))
+        ticket_select = ticket_select.where(Ticket.issue_date <= date_to)
+    booking_select = booking_select.group_by(booking_date, Booking.booth_id, Booking.pro_id, used_ticket.c.category)
+    ticket_select = ticket_select.group_by(Ticket.issue_date, Ticket.pro_id, Ticket.category)
+
+    columns = ['stat_date', 'booth_id', 'pro_id', 'category'] + list(STAT_FIELDS)
+    try:
+        db.session.execute(delete_stmt)
+        created = 0
+        for source in (booking_select, ticket_select): # 예약 행은 booth_id > 0, 판매 행은 booth_id = 0 이라 키가 겹치지 않음
+            created += db.session.execute(insert(stats).from_select(columns, source)).rowcount
+        db.session.commit()
+        return created
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def get_stats_report(date_from: datetime.date, date_to: datetime.date, period: str = 'month') -> dict:
+    """
+    daily_stats 만 읽어 리포트 데이터를 만듭니다 (원본 예약/이용권은 조회하지 않음).
+
+    :param period: 'month' 또는 'day' (추이 그룹 단위)
+    :return: {'trend': [...], 'by_booth': [...], 'by_pro': [...], 'by_category': [...], 'totals': {...}}
+    """
+    sums = [func.sum(getattr(DailyStat, field)).label(field) for field in STAT_FIELDS]
+    in_range = (DailyStat.stat_date >= date_from, DailyStat.stat_date <= date_to)
+
+    def grouped(key):
+        rows = db.session.execute(
+            select(key.label('key'), *sums).where(*in_range).group_by(key).order_by(key)
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    # 추이: 일자별로 읽은 뒤 (기간당 최대 수백 행) 월 단위는 메모리에서 묶음
+    trend = {}
+    for row in grouped(DailyStat.stat_date):
+        key = row['key'].strftime('%Y-%m') if period == 'month' else row['key'].isoformat()
+        bucket = trend.setdefault(key, dict.fromkeys(STAT_FIELDS, 0))
+        for field in STAT_FIELDS:
+            bucket[field] += row[field] or 0
+
+    by_category = grouped(DailyStat.category)
+    totals = {field: sum(row[field] or 0 for row in by_category) for field in STAT_FIELDS}
+    return {
+        'trend': [{'key': key, **values} for key, values in trend.items()],
+        'by_booth': [row for row in grouped(DailyStat.booth_id) if row['key']], # 0 = 판매 집계 행
+        'by_pro': grouped(DailyStat.pro_id),
+        'by_category': by_category,
+        'totals': totals,
+    }
@@ -1,9 +1,15 @@
 # app/services/ticket_service.py
+import datetime
 from app.extensions import db
 # from app.models import Ticket, User, Booking # <<< Booking 임포트 주석 처리
-from app.models import Ticket, User # Booking 제외하고 임포트
+from app.models import Ticket, User, TicketTemplate, Booking
+from app.models.ticket_template import TicketCategory
 # from app.models.enums import BookingStatus # Booking 모델 구현 후 필요하므로 주석 처리
 from .holding_service import recalculate_master_expiry_date
+from .stats_service import record_ticket_sales, record_booking_stats, CANCELLED_STATUSES
+import csv
+import io
+from sqlalchemy import select, update, insert, func, and_, or_, bindparam
 
 def delete_ticket_by_id(ticket_id: int) -> tuple[bool, str]:
     """
@@ -39,6 +45,7 @@ def delete_ticket_by_id(ticket_id: int) -> tuple[bool, str]:
         ticket_name = ticket.name
         user_id = user.id # 리디렉션용
 
+        record_ticket_sales([ticket], sign=-1) # 일별 집계에서 판매 취소
         db.session.delete(ticket)
 
         recalculate_master_expiry_date(user)
@@ -52,4 +59,241 @@ def delete_ticket_by_id(ticket_id: int) -> tuple[bool, str]:
     except Exception as e:
         db.session.rollback()
         print(f"Error deleting ticket: {e}")
-        return False, f"이용권 삭제 중 오류가 발생했습니다: {e}"
\ No newline at end of file
+        return False, f"이용권 삭제 중 오류가 발생했습니다: {e}"
+
+
+def expire_overdue_tickets(today: datetime.date = None) -> tuple[int, int]:
+    """
+    만료일이 지난 이용권을 한 번의 UPDATE 로 만료/비활성 처리하고,
+    영향을 받은 회원들의 최종 만료일(master_expiry_date)을 한 번의 UPDATE 로 다시 계산합니다.
+
+    :param today: 기준일 (기본값: 오늘)
+    :return: (만료 처리된 이용권 수, 최종 만료일이 재계산된 회원 수)
+    """
+    today = today or datetime.date.today()
+    overdue = and_(Ticket.expiry_date < today,
+                   or_(Ticket.is_expired == False, Ticket.is_expired.is_(None), Ticket.is_active == True))
+    try:
+        user_ids = db.session.execute(select(Ticket.user_id).where(overdue).distinct()).scalars().all()
+        if not user_ids:
+            return 0, 0
+
+        expired = db.session.execute(
+            update(Ticket).where(overdue)
+            .values(is_expired=True, is_active=False)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        # 회원별 활성 이용권의 MAX(expiry_date) 로 최종 만료일 갱신 (활성 이용권이 없으면 NULL)
+        latest_expiry = select(func.max(Ticket.expiry_date)).where(
+            Ticket.user_id == User.id,
+            Ticket.is_active == True
+        ).correlate(User).scalar_subquery()
+        db.session.execute(
+            update(User).where(User.id.in_(user_ids))
+            .values(master_expiry_date=latest_expiry, data_version=User.data_version + 1) # API ETag 갱신
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return expired, len(user_ids)
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def calculate_template_expiry_date(template: TicketTemplate, start_date: datetime.date) -> datetime.date | None:
+    """템플릿 기준 만료일 (시작일 포함). 기간권/종합권은 duration_days, 횟수권/쿠폰은 default_validity_days."""
+    if template.category in [TicketCategory.PERIOD, TicketCategory.COMBO] and template.duration_days:
+        return start_date + datetime.timedelta(days=template.duration_days - 1)
+    if template.category in [TicketCategory.COUNT, TicketCategory.COUPON] and template.default_validity_days:
+        return start_date + datetime.timedelta(days=template.default_validity_days - 1)
+    return None # LESSON_ADD 또는 유효기간 없는 경우
+
+
+def change_template_category(template: TicketTemplate, new_category: TicketCategory) -> int:
+    """
+    템플릿 대분류 변경을 발급된 이용권(Ticket.category 복사본)과 일별 집계에 반영합니다.
+    예약/쿠폰 확인은 이용권의 대분류를 쓰므로 템플릿만 바꾸면 어긋납니다. 커밋은 호출하는 쪽에서 합니다.
+    :return: 대분류가 바뀐 이용권 수
+    """
+    if template.category == new_category:
+        return 0
+    tickets = Ticket.query.filter_by(ticket_template_id=template.id).all()
+    if not tickets:
+        return 0
+    bookings = Booking.query.filter(
+        Booking.used_taseok_ticket_id.in_(select(Ticket.id).where(Ticket.ticket_template_id == template.id)),
+        Booking.status.notin_(CANCELLED_STATUSES)
+    ).all()
+
+    # 이전 대분류로 쌓인 집계를 빼고, 바꾼 뒤 같은 값을 새 대분류로 다시 더함
+    record_ticket_sales(tickets, sign=-1)
+    record_booking_stats(bookings, sign=-1)
+    for ticket in tickets:
+        ticket.category = new_category # ORM 변경 → 회원 data_version 도 함께 갱신
+    record_ticket_sales(tickets)
+    record_booking_stats(bookings)
+    return len(tickets)
+
+
+# --- 이용권 일괄 발급 (CSV) ---
+BULK_ISSUE_COLUMNS = ['phone', 'template', 'start_date', 'price', 'memo'] # price, memo 는 선택
+BULK_ISSUE_CHUNK_SIZE = 1000 # INSERT/UPDATE 한 번에 처리할 행 수 (SQLite 바인드 변수 제한 고려)
+
+
+def read_bulk_issue_csv(data: bytes | str) -> list[dict]:
+    """
+    일괄 발급 CSV 를 읽어 행 목록을 반환합니다. 첫 줄은 헤더 (phone,template,start_date,price,memo).
+    엑셀 저장 파일을 위해 UTF-8(BOM) 과 CP949 를 모두 허용합니다.
+    각 행에는 원본 줄 번호 'line' 이 추가됩니다.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            data = data.decode('cp949')
+    reader = csv.DictReader(io.StringIO(data))
+    missing = [c for c in ('phone', 'template', 'start_date') if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV 헤더에 필수 컬럼이 없습니다: {', '.join(missing)}")
+    rows = []
+    for row in reader:
+        row = {k.strip(): (v or '').strip() for k, v in row.items() if k}
+        row['line'] = reader.line_num
+        rows.append(row)
+    return rows
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def bulk_issue_tickets(rows: list[dict], dry_run: bool = False,
+                       chunk_size: int = BULK_ISSUE_CHUNK_SIZE) -> tuple[int, list[dict]]:
+    """
+    (phone, template, start_date, price, memo) 행들로 이용권을 일괄 발급합니다.
+
+    - 회원은 연락처 IN 쿼리로, 템플릿은 ID 또는 이름으로 한 번에 조회
+    - Ticket 은 executemany INSERT, 회원 레슨 횟수는 회원별로 합산해 executemany UPDATE,
+      최종 만료일은 MAX(expiry_date) 집계 UPDATE 로 갱신
+    - 오류 행은 건너뛰고 보고서에 기록, 정상 행은 한 트랜잭션으로 커밋
+
+    :param dry_run: True 면 검증만 하고 저장하지 않음
+    :return: (발급(예정) 수, 오류 목록 [{'line', 'phone', 'error'}])
+    """
+    errors = []
+    today = datetime.date.today()
+
+    # 1. 회원 조회 (연락처 IN, 청크 단위)
+    phones = list({row.get('phone', '') for row in rows if row.get('phone')})
+    user_id_by_phone = {}
+    for chunk in _chunks(phones, chunk_size):
+        user_id_by_phone.update(db.session.execute(
+            select(User.phone, User.id).where(User.phone.in_(chunk))
+        ).all())
+
+    # 2. 템플릿 조회 (ID 또는 이름, 활성 템플릿만)
+    templates = TicketTemplate.query.filter_by(is_active=True).all()
+    template_by_key = {str(t.id): t for t in templates}
+    template_by_key.update({t.name: t for t in templates})
+
+    # 3. 행 검증 및 INSERT 값 구성
+    ticket_values = []
+    status_by_key = {}
+    for row in rows:
+        line, phone = row.get('line'), row.get('phone', '')
+
+        def fail(message):
+            errors.append({'line': line, 'phone': phone, 'error': message})
+
+        user_id = user_id_by_phone.get(phone)
+        if not phone:
+            fail('연락처가 비어 있습니다.')
+            continue
+        if user_id is None:
+            fail('해당 연락처의 회원이 없습니다.')
+            continue
+        template = template_by_key.get(row.get('template', ''))
+        if template is None:
+            fail(f"활성 템플릿을 찾을 수 없습니다: {row.get('template', '')}")
+            continue
+        try:
+            start_date = datetime.date.fromisoformat(row.get('start_date', ''))
+        except ValueError:
+            fail(f"시작일 형식 오류 (YYYY-MM-DD): {row.get('start_date', '')}")
+            continue
+        price = template.price
+        if row.get('price'):
+            try:
+                price = int(row['price'].replace(',', ''))
+            except ValueError:
+                fail(f"가격 형식 오류: {row['price']}")
+                continue
+            if price < 0:
+                fail('가격은 0 이상이어야 합니다.')
+                continue
+
+        expiry_date = calculate_template_expiry_date(template, start_date)
+        status_key = (template.id, expiry_date)
+        if status_key not in status_by_key: # 상태 플래그는 템플릿 횟수와 만료일로만 결정되므로 조합별로 한 번만 계산
+            probe = Ticket(expiry_date=expiry_date,
+                           total_taseok_count=template.total_count, remaining_taseok_count=template.total_count,
+                           total_lesson_count=template.total_lesson_count, remaining_lesson_count=template.total_lesson_count)
+            probe.update_status()
+            status_by_key[status_key] = {'is_active': probe.is_active, 'is_expired': probe.is_expired, 'is_used_up': probe.is_used_up}
+
+        ticket_values.append({
+            'user_id': user_id,
+            'ticket_template_id': template.id,
+            'category': template.category,
+            'name': template.generate_ticket_name(),
+            'issue_date': today,
+            'start_date': start_date,
+            'expiry_date': expiry_date,
+            'total_taseok_count': template.total_count,
+            'remaining_taseok_count': template.total_count,
+            'total_lesson_count': template.total_lesson_count,
+            'remaining_lesson_count': template.total_lesson_count,
+            'price': price,
+            'memo': row.get('memo') or None,
+            **status_by_key[status_key]
+        })
+
+    if dry_run or not ticket_values:
+        return len(ticket_values), errors
+
+    # 4. 저장 (한 트랜잭션)
+    lesson_by_user = {}
+    for values in ticket_values:
+        if values['total_lesson_count']:
+            lesson_by_user[values['user_id']] = lesson_by_user.get(values['user_id'], 0) + values['total_lesson_count']
+    user_ids = list({values['user_id'] for values in ticket_values})
+    try:
+        # ORM bulk insert 는 행마다 INSERT 를 나눌 수 있어 Core executemany 로 실행
+        for chunk in _chunks(ticket_values, chunk_size):
+            db.session.connection().execute(insert(Ticket.__table__), chunk)
+        record_ticket_sales(ticket_values) # 일별 집계 (발급일/담당 프로/대분류별로 합산해 UPSERT)
+
+        if lesson_by_user:
+            db.session.connection().execute(
+                update(User.__table__).where(User.__table__.c.id == bindparam('uid'))
+                .values(remaining_lesson_total=func.coalesce(User.__table__.c.remaining_lesson_total, 0) + bindparam('lessons')),
+                [{'uid': uid, 'lessons': lessons} for uid, lessons in lesson_by_user.items()]
+            )
+
+        latest_expiry = select(func.max(Ticket.expiry_date)).where(
+            Ticket.user_id == User.id,
+            Ticket.is_active == True
+        ).correlate(User).scalar_subquery()
+        for chunk in _chunks(user_ids, chunk_size):
+            db.session.execute(
+                update(User).where(User.id.in_(chunk))
+                .values(master_expiry_date=latest_expiry, data_version=User.data_version + 1) # API ETag 갱신
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(ticket_values), errors
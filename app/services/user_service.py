@@ -0,0 +1,190 @@
+# app/services/user_service.py
+import csv
+import io
+from app.extensions import db
+from app.models import User
+from app.models.user import USER_SEARCH_TABLE
+from sqlalchemy import or_, case, func, text, table, column, literal_column, select, insert
+from werkzeug.security import generate_password_hash
+
+MEMBER_SEARCH_DEFAULT_LIMIT = 20
+MEMBER_SEARCH_MAX_LIMIT = 50
+FTS_MIN_TERM_LENGTH = 3 # trigram 색인은 3글자 이상부터 사용 가능
+
+_member_search_index_ready = set() # FTS 색인이 확인된 DB (engine URL)
+
+
+def has_member_search_index() -> bool:
+    """현재 DB 에 회원 검색용 FTS5 색인(user_search)이 있는지 확인합니다 (SQLite 전용)."""
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return False
+    key = str(engine.url)
+    if key in _member_search_index_ready:
+        return True
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': USER_SEARCH_TABLE}
+    ).first() is not None
+    if exists: # 없을 때는 캐시하지 않음 (이후 마이그레이션/생성 반영)
+        _member_search_index_ready.add(key)
+    return exists
+
+
+def member_search_query(term: str):
+    """
+    회원 검색 쿼리 (이름/연락처/메모, 관련도순 정렬)를 반환합니다.
+
+    SQLite + FTS5 색인이 있고 검색어가 3글자 이상이면 trigram 색인(bm25 순위)을 사용하고,
+    그 외(짧은 검색어, 다른 DB)에는 LIKE 검색으로 대체합니다.
+    """
+    term = (term or '').strip()
+    digits = term.replace('-', '')
+    last4_first = case((User.phone_last4 == digits, 0), else_=1)
+
+    if len(term) >= FTS_MIN_TERM_LENGTH and has_member_search_index():
+        user_search = table(USER_SEARCH_TABLE, column('rowid'))
+        fts_term = '"' + term.replace('"', '""') + '"' # 구문 검색으로 감싸 FTS 연산자 해석 방지
+        return User.query.join(user_search, user_search.c.rowid == User.id) \
+            .filter(literal_column(USER_SEARCH_TABLE).op('MATCH')(fts_term)) \
+            .order_by(last4_first, func.bm25(literal_column(USER_SEARCH_TABLE)), User.id)
+
+    search_pattern = f"%{term}%"
+    conditions = [User.name.like(search_pattern), User.phone.like(search_pattern), User.memo.like(search_pattern)]
+    if digits.isdigit() and len(digits) == 4:
+        conditions.append(User.phone_last4 == digits)
+    name_prefix_first = case((User.name.like(f"{term}%"), 0), else_=1)
+    return User.query.filter(or_(*conditions)).order_by(last4_first, name_prefix_first, User.name, User.id)
+
+
+def search_members(term: str, limit: int = MEMBER_SEARCH_DEFAULT_LIMIT) -> list[User]:
+    """
+    이름, 연락처, 연락처 뒷 4자리로 회원을 검색합니다 (자동완성용).
+    전체 회원을 불러오지 않고 결과 수를 limit 으로 제한합니다.
+    """
+    if not (term or '').strip():
+        return []
+    limit = max(1, min(limit or MEMBER_SEARCH_DEFAULT_LIMIT, MEMBER_SEARCH_MAX_LIMIT))
+    return member_search_query(term).limit(limit).all()
+
+
+def member_search_label(user: User) -> str:
+    """선택 목록/입력창에 보여줄 회원 표시 문자열"""
+    return f"{user.name} ({user.phone})"
+
+
+# --- 회원 CSV 가져오기/내보내기 (기존 POS 이관용) ---
+MEMBER_CSV_COLUMNS = ['name', 'phone', 'memo', 'remaining_lesson_total', 'master_expiry_date', 'created_at'] # 가져오기는 name, phone, memo 만 사용
+MEMBER_IMPORT_CHUNK_SIZE = 1000
+MEMBER_EXPORT_BATCH_SIZE = 1000
+MEMBER_INITIAL_PASSWORD = '0000' # auth.register 와 동일한 초기 비밀번호
+
+
+def iter_member_import(text_stream, chunk_size: int = MEMBER_IMPORT_CHUNK_SIZE, skip_until_line: int = 0):
+    """
+    회원 CSV(name,phone,memo)를 청크 단위로 읽어 저장하고, 청크를 커밋할 때마다
+    (가져온 수, 오류 목록, 마지막 처리 줄 번호) 를 yield 합니다.
+
+    - 파일 전체를 메모리에 올리지 않고 한 줄씩 읽음
+    - 연락처 중복은 청크마다 IN 조회 한 번으로 확인 (파일 내 중복도 함께 확인)
+    - 비밀번호 해시는 초기 비밀번호로 한 번만 계산해 모든 행에 사용
+    - 청크마다 커밋하므로 실패 시 마지막으로 yield 된 줄 번호를 skip_until_line 으로 넘겨 이어서 실행 가능
+
+    :param text_stream: 텍스트 모드 파일 객체 (헤더 포함)
+    :param skip_until_line: 이 줄 번호까지는 이미 처리된 것으로 보고 건너뜀 (재개용)
+    """
+    reader = csv.DictReader(text_stream)
+    missing = [c for c in ('name', 'phone') if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV 헤더에 필수 컬럼이 없습니다: {', '.join(missing)}")
+
+    password_hash = generate_password_hash(MEMBER_INITIAL_PASSWORD)
+    seen_phones = set() # 이번 실행에서 가져온 연락처 (파일 내 중복 확인용)
+
+    def save_chunk(chunk):
+        errors = []
+        phones = [row['phone'] for _, row in chunk]
+        existing = set(db.session.scalars(select(User.phone).where(User.phone.in_(phones))))
+        values = []
+        for line, row in chunk:
+            phone = row['phone']
+            if phone in existing:
+                errors.append({'line': line, 'phone': phone, 'error': '이미 등록된 연락처입니다.'})
+                continue
+            if phone in seen_phones:
+                errors.append({'line': line, 'phone': phone, 'error': '파일 안에서 중복된 연락처입니다.'})
+                continue
+            seen_phones.add(phone)
+            values.append({
+                'name': row['name'],
+                'phone': phone,
+                'phone_last4': phone[-4:] if len(phone) >= 4 else None,
+                'memo': row.get('memo') or None,
+                'password_hash': password_hash,
+                'is_admin': False,
+                'remaining_lesson_total': 0,
+            })
+        try:
+            if values:
+                db.session.connection().execute(insert(User.__table__), values) # FTS 색인은 트리거로 함께 갱신
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(values), errors
+
+    chunk, errors = [], []
+    last_line = skip_until_line
+    for row in reader:
+        line = reader.line_num
+        if line <= skip_until_line:
+            continue
+        last_line = line
+        row = {k.strip(): (v or '').strip() for k, v in row.items() if k}
+        if not row.get('name') or not row.get('phone'):
+            errors.append({'line': line, 'phone': row.get('phone', ''), 'error': '이름과 연락처는 필수입니다.'})
+        elif len(row['phone']) > 20 or len(row['name']) > 100:
+            errors.append({'line': line, 'phone': row['phone'], 'error': '이름(100자) 또는 연락처(20자) 길이 초과입니다.'})
+        else:
+            chunk.append((line, row))
+        if len(chunk) >= chunk_size:
+            imported, chunk_errors = save_chunk(chunk)
+            yield imported, errors + chunk_errors, last_line
+            chunk, errors = [], []
+    if chunk or errors:
+        imported, chunk_errors = save_chunk(chunk) if chunk else (0, [])
+        yield imported, errors + chunk_errors, last_line
+
+
+def iter_member_csv(batch_size: int = MEMBER_EXPORT_BATCH_SIZE):
+    """
+    전체 회원을 CSV 문자열 조각으로 yield 합니다 (헤더 포함, 엑셀용 BOM 포함).
+    ORM 객체 대신 컬럼만 yield_per 로 나눠 읽어 회원 수와 무관하게 메모리 사용량이 일정합니다.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
+
+    buffer.write('\ufeff')
+    writer.writerow(MEMBER_CSV_COLUMNS)
+    yield flush()
+
+    result = db.session.execute(
+        select(User.name, User.phone, User.memo, User.remaining_lesson_total, User.master_expiry_date, User.created_at)
+        .where(User.is_admin == False)
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        for name, phone, memo, lessons, expiry, created_at in partition:
+            writer.writerow([
+                name, phone, memo or '', lessons or 0,
+                expiry.isoformat() if expiry else '',
+                created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else ''
+            ])
+        yield flush()
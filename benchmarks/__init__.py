@@ -0,0 +1,48 @@
+# benchmarks/__init__.py
+# 성능 확인용 스크립트 모음. 메모리 DB(testing 설정)에 데이터를 채워 실행합니다.
+# 실행 예: python -m benchmarks.bench_availability
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+
+
+def make_app():
+    """testing 설정(메모리 DB)으로 앱을 만들고 테이블을 생성합니다."""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def login_as(client, user_id):
+    """Flask-Login 세션을 직접 설정하여 로그인 상태로 만듭니다."""
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+
+
+class QueryCounter:
+    """블록 안에서 실행된 SQL 문 수와 경과 시간을 기록합니다."""
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+        self.elapsed = 0.0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counter._on_execute)
+    started = time.perf_counter()
+    try:
+        yield counter
+    finally:
+        counter.elapsed = time.perf_counter() - started
+        event.remove(engine, 'before_cursor_execute', counter._on_execute)
@@ -0,0 +1,72 @@
+# benchmarks/bench_availability.py
+# /admin/api/availability 가 타석/슬롯 수와 무관하게 한 번의 조회 쿼리로 동작하는지 확인합니다.
+# 실행: python -m benchmarks.bench_availability
+import datetime
+import random
+from app.extensions import db
+from app.models import User, Booth, Booking
+from app.models.enums import BoothSystemType, BoothStatus, BookingType, BookingStatus
+from app.services.booking_service import is_booth_available, SLOTS_PER_DAY, SLOT_MINUTES
+from . import make_app, login_as, count_queries
+
+TARGET_DATE = datetime.date(2025, 6, 14)
+
+
+def seed(booth_count, bookings_per_booth):
+    admin = User(name='관리자', phone='010-0000-0000', is_admin=True)
+    db.session.add(admin)
+    db.session.flush()
+    day_start = datetime.datetime.combine(TARGET_DATE, datetime.time(9, 0))
+    for i in range(booth_count):
+        booth = Booth(name=f'타석 {i + 1:03d}', system_type=BoothSystemType.QED,
+                      is_available=True, current_status=BoothStatus.AVAILABLE)
+        db.session.add(booth)
+        db.session.flush()
+        start = day_start
+        for _ in range(bookings_per_booth):
+            start += datetime.timedelta(minutes=random.choice([0, 10, 30, 60]))
+            end = start + datetime.timedelta(minutes=70)
+            db.session.add(Booking(user_id=admin.id, booth_id=booth.id, booking_type=BookingType.TASEOK_ONLY,
+                                   status=BookingStatus.SCHEDULED, start_time=start, end_time=end))
+            start = end
+    db.session.commit()
+    return admin.id
+
+
+def run(booth_count, bookings_per_booth=8):
+    app = make_app()
+    with app.app_context():
+        admin_id = seed(booth_count, bookings_per_booth)
+        client = app.test_client()
+        login_as(client, admin_id)
+        # 첫 요청에서 로그인 사용자 조회 등 준비 작업을 마친 뒤 측정
+        client.get(f'/admin/api/availability?date={TARGET_DATE}&duration=70')
+
+        with count_queries() as counter:
+            response = client.get(f'/admin/api/availability?date={TARGET_DATE}&duration=70')
+        assert response.status_code == 200, response.status_code
+        data = response.get_json()
+        free_slots = sum(len(b['free_start_times']) for b in data['booths'])
+        availability_queries = sum(1 for s in counter.statements if 'FROM booth' in s)
+
+        # 비교: 기존 방식 (타석 x 슬롯마다 is_booth_available 호출) - 첫 타석만 측정
+        booth = Booth.query.order_by(Booth.name).first()
+        day_start = datetime.datetime.combine(TARGET_DATE, datetime.time.min)
+        with count_queries() as naive:
+            for slot in range(SLOTS_PER_DAY):
+                start = day_start + datetime.timedelta(minutes=slot * SLOT_MINUTES)
+                is_booth_available(booth.id, start, start + datetime.timedelta(minutes=70))
+
+        print(f"booths={booth_count:4d} bookings={booth_count * bookings_per_booth:5d} "
+              f"free_slots={free_slots:6d} | api: {counter.count} queries "
+              f"({availability_queries} availability) {counter.elapsed * 1000:7.1f}ms | "
+              f"naive (1 booth): {naive.count} queries {naive.elapsed * 1000:7.1f}ms "
+              f"-> x{booth_count} booths ≈ {naive.count * booth_count} queries")
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    random.seed(42)
+    for count in (7, 30, 100, 300):
+        run(count)
@@ -0,0 +1,81 @@
+# benchmarks/bench_bulk_issue.py
+# 이용권 일괄 발급: 2만 행 CSV 를 회원 IN 조회 + bulk INSERT + 집계 UPDATE 로 처리하는 시간과 쿼리 수를 확인합니다.
+# 실행: python -m benchmarks.bench_bulk_issue
+import datetime
+import random
+import time
+from sqlalchemy import insert, func
+from app.extensions import db
+from app.models import User, Ticket, TicketTemplate
+from app.models.ticket_template import TicketCategory
+from app.services.ticket_service import bulk_issue_tickets, read_bulk_issue_csv
+from . import make_app, count_queries
+
+MEMBER_COUNT = 10_000
+ROW_COUNT = 20_000
+BAD_ROW_RATIO = 0.01 # 없는 연락처/잘못된 날짜 행 비율
+
+
+def seed(member_count):
+    phones = [f"010-{i // 10000:04d}-{i % 10000:04d}" for i in range(1, member_count + 1)]
+    db.session.execute(insert(User), [
+        {'name': f'회원{i}', 'phone': phone, 'phone_last4': phone[-4:], 'is_admin': False, 'remaining_lesson_total': 0}
+        for i, phone in enumerate(phones)
+    ])
+    db.session.add_all([
+        TicketTemplate(name='3개월 기간권', category=TicketCategory.PERIOD, duration_days=90, price=300000),
+        TicketTemplate(name='쿠폰 10회 (레슨 5회)', category=TicketCategory.COUPON, total_count=10,
+                       total_lesson_count=5, default_validity_days=60, price=200000),
+    ])
+    db.session.commit()
+    return phones
+
+
+def build_csv(phones, row_count):
+    lines = ['phone,template,start_date,price,memo']
+    start = datetime.date.today()
+    for i in range(row_count):
+        phone = random.choice(phones)
+        start_date = (start + datetime.timedelta(days=random.randint(-30, 30))).isoformat()
+        if random.random() < BAD_ROW_RATIO:
+            if i % 2:
+                phone = '010-9999-0000'
+            else:
+                start_date = '2024/13/01'
+        template = random.choice(['3개월 기간권', '쿠폰 10회 (레슨 5회)'])
+        lines.append(f"{phone},{template},{start_date},,일괄 발급 {i}")
+    return '\n'.join(lines).encode('utf-8')
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        phones = seed(MEMBER_COUNT)
+        data = build_csv(phones, ROW_COUNT)
+
+        started = time.perf_counter()
+        with count_queries() as counter:
+            rows = read_bulk_issue_csv(data)
+            issued, errors = bulk_issue_tickets(rows)
+        elapsed = time.perf_counter() - started
+
+        print(f"행 {ROW_COUNT}개 -> 발급 {issued}건, 오류 {len(errors)}건, {elapsed:.2f}초, SQL {counter.count}회")
+
+        # 검증: 회원 레슨 합계/최종 만료일이 티켓 집계와 일치하는지
+        ticket_count = db.session.scalar(db.select(func.count(Ticket.id)))
+        lesson_sum = db.session.scalar(db.select(func.coalesce(func.sum(User.remaining_lesson_total), 0)))
+        ticket_lessons = db.session.scalar(db.select(func.coalesce(func.sum(Ticket.total_lesson_count), 0)))
+        mismatch = db.session.scalar(
+            db.select(func.count(User.id)).where(
+                User.master_expiry_date != db.select(func.max(Ticket.expiry_date))
+                .where(Ticket.user_id == User.id, Ticket.is_active == True).correlate(User).scalar_subquery()
+            )
+        )
+        assert ticket_count == issued, (ticket_count, issued)
+        assert lesson_sum == ticket_lessons, (lesson_sum, ticket_lessons)
+        assert mismatch == 0, mismatch
+        print(f"검증 통과: 티켓 {ticket_count}개, 레슨 합계 {lesson_sum}, 최종 만료일 불일치 {mismatch}명")
+
+
+if __name__ == '__main__':
+    main()
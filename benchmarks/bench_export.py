@@ -0,0 +1,111 @@
+# benchmarks/bench_export.py
+# 정산 내보내기: 1년치 예약(약 10만 건)과 이용권 판매 내역을 스트리밍 응답으로 받을 때
+# 쿼리 수(조인 한 번)와 최대 메모리 사용량이 행 수와 무관하게 유지되는지 확인합니다.
+# 실행: python -m benchmarks.bench_export
+import datetime
+import json
+import random
+import time
+import tracemalloc
+from flask import g
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import User, Pro, Booth, Ticket, Booking
+from app.models.enums import BoothSystemType, BookingType, BookingStatus
+from app.models.ticket_template import TicketCategory
+from . import make_app, login_as, count_queries
+
+MEMBER_COUNT = 2_000
+BOOKINGS_PER_DAY = 280
+YEAR = 2024
+
+
+def seed():
+    admin = User(name='관리자', phone='010-0000-0000', is_admin=True)
+    db.session.add(admin)
+    db.session.add_all([Pro(name=f'프로{i}') for i in range(4)] +
+                       [Booth(name=f'{i}번 타석', system_type=BoothSystemType.QED) for i in range(1, 13)])
+    db.session.execute(insert(User), [
+        {'name': f'회원{i}', 'phone': f'010-1{i:03d}-{i:04d}', 'is_admin': False, 'remaining_lesson_total': 0}
+        for i in range(MEMBER_COUNT)
+    ])
+    db.session.flush()
+    member_ids = [uid for (uid,) in db.session.query(User.id).filter_by(is_admin=False)]
+    start = datetime.date(YEAR, 1, 1)
+    tickets = [{
+        'user_id': uid, 'name': '쿠폰 10회', 'category': TicketCategory.COUPON,
+        'issue_date': start + datetime.timedelta(days=random.randrange(365)),
+        'start_date': start, 'expiry_date': start + datetime.timedelta(days=365),
+        'total_taseok_count': 10, 'remaining_taseok_count': 5, 'total_lesson_count': 5, 'remaining_lesson_count': 2,
+        'price': 200000, 'pro_id': random.choice([None, 1, 2]), 'is_active': True, 'is_expired': False, 'is_used_up': False,
+    } for uid in member_ids for _ in range(3)]
+    db.session.execute(insert(Ticket), tickets)
+
+    bookings = []
+    for day in range(365):
+        date = start + datetime.timedelta(days=day)
+        for n in range(BOOKINGS_PER_DAY):
+            begin = datetime.datetime.combine(date, datetime.time(6)) + datetime.timedelta(minutes=(n // 12) * 60)
+            is_lesson = n % 5 == 0
+            bookings.append({
+                'user_id': random.choice(member_ids), 'booth_id': n % 12 + 1, 'pro_id': 1 if is_lesson else None,
+                'booking_type': BookingType.LESSON if is_lesson else BookingType.TASEOK_ONLY,
+                'status': BookingStatus.COMPLETED, 'start_time': begin, 'end_time': begin + datetime.timedelta(minutes=60),
+                'duration_minutes': 60, 'used_lesson_count': 1 if is_lesson else 0, 'used_taseok_ticket_id': random.randint(1, len(tickets)),
+            })
+    for i in range(0, len(bookings), 10_000):
+        db.session.execute(insert(Booking), bookings[i:i + 10_000])
+    db.session.commit()
+    return admin.id, len(bookings), len(tickets)
+
+
+def _consume(client, url):
+    response = client.get(url, buffered=False)
+    assert response.status_code == 200, response.status_code
+    lines, first = 0, None
+    for chunk in response.response:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if first is None:
+            first = text.split('\n', 2)[:2]
+        lines += text.count('\n')
+    return lines, first
+
+
+def export(app, client, url):
+    with app.app_context():
+        g.pop('_login_user', None)
+        with count_queries() as counter:
+            started = time.perf_counter()
+            lines, first = _consume(client, url)
+            elapsed = time.perf_counter() - started
+    # tracemalloc 은 실행을 크게 느리게 하므로 메모리는 따로 한 번 더 받아 측정
+    with app.app_context():
+        tracemalloc.start()
+        _consume(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return lines, elapsed, peak, counter.count, first
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        admin_id, booking_count, ticket_count = seed()
+    client = app.test_client()
+    login_as(client, admin_id)
+
+    for url, expected in [
+        (f'/admin/exports/bookings.csv?date_from={YEAR}-01-01&date_to={YEAR}-12-31', booking_count + 1),
+        (f'/admin/exports/bookings.jsonl?date_from={YEAR}-01-01&date_to={YEAR}-12-31', booking_count),
+        (f'/admin/exports/bookings.csv?date_from={YEAR}-03-01&date_to={YEAR}-03-31', 31 * BOOKINGS_PER_DAY + 1),
+        (f'/admin/exports/tickets.csv?date_from={YEAR}-01-01&date_to={YEAR}-12-31', ticket_count + 1),
+    ]:
+        lines, elapsed, peak, queries, first = export(app, client, url)
+        assert lines == expected, (url, lines, expected)
+        print(f"{url:70s} rows={lines:7d} {elapsed:5.2f}s peak={peak / 1024 / 1024:5.1f}MB queries={queries}")
+        if url.endswith('.jsonl') or '.jsonl?' in url:
+            json.loads(first[0]) # 한 줄이 하나의 JSON 객체
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_member_search.py
+# 회원 검색: 기존 LIKE '%검색어%' 전체 스캔과 FTS5(trigram) 색인 검색을 5만 명 기준으로 비교합니다.
+# 실행: python -m benchmarks.bench_member_search
+import random
+import time
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import User
+from app.services.user_service import member_search_query, has_member_search_index
+from . import make_app, login_as, count_queries
+
+MEMBER_COUNT = 50_000
+REPEAT = 20
+SURNAMES = '김이박최정강조윤장임한오서신권황안송류홍'
+SYLLABLES = '민서준지현우예도하은수윤재영진주원성혜경'
+MEMOS = [None, None, None, '주말반', '오전 레슨 선호', '법인 회원', '재등록 예정']
+TERMS = ['김민준', '서윤', '1234', '010-77', '주말반', '법인']
+
+
+def seed(member_count):
+    rows = []
+    phones = random.sample(range(100_000_000), member_count)
+    for i, number in enumerate(phones):
+        phone = f"010-{number // 10000:04d}-{number % 10000:04d}"
+        rows.append({
+            'name': random.choice(SURNAMES) + random.choice(SYLLABLES) + random.choice(SYLLABLES),
+            'phone': phone,
+            'phone_last4': phone[-4:],
+            'memo': random.choice(MEMOS),
+            'is_admin': i == 0,
+            'remaining_lesson_total': 0,
+        })
+    db.session.execute(insert(User), rows) # 트리거로 FTS 색인도 함께 채워짐
+    db.session.commit()
+    return User.query.filter_by(is_admin=True).first().id
+
+
+def legacy_like_query(term):
+    """기존 list_users 검색 (앞뒤 와일드카드 LIKE -> 전체 스캔)"""
+    pattern = f"%{term}%"
+    return User.query.filter(User.name.like(pattern) | User.phone.like(pattern)).order_by(User.created_at.desc())
+
+
+def timed_page(build_query, term):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        pagination = build_query(term).paginate(page=1, per_page=10, error_out=False)
+    return (time.perf_counter() - started) / REPEAT * 1000, pagination.total
+
+
+def run():
+    app = make_app()
+    with app.test_request_context():
+        started = time.perf_counter()
+        admin_id = seed(MEMBER_COUNT)
+        print(f"members={MEMBER_COUNT} seeded in {time.perf_counter() - started:.1f}s, "
+              f"fts index={'yes' if has_member_search_index() else 'no (LIKE fallback)'}")
+
+        for term in TERMS:
+            like_ms, like_total = timed_page(legacy_like_query, term)
+            fts_ms, fts_total = timed_page(member_search_query, term)
+            print(f"term={term!r:10} | LIKE: {like_total:5d} hits {like_ms:7.2f}ms | "
+                  f"search: {fts_total:5d} hits {fts_ms:7.2f}ms (x{like_ms / fts_ms:5.1f})")
+
+    with app.app_context():
+        client = app.test_client()
+        login_as(client, admin_id)
+        client.get('/admin/users') # 첫 요청 준비 작업 제외
+        with count_queries() as counter:
+            response = client.get('/admin/users?search=김민준')
+        assert response.status_code == 200, response.status_code
+        print(f"/admin/users?search=김민준: {counter.count} queries {counter.elapsed * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    random.seed(42)
+    run()
@@ -0,0 +1,64 @@
+# benchmarks/bench_view_user.py
+# 회원 상세(/admin/users/<id>)가 보유 이용권/홀딩 수와 무관하게 고정된 쿼리 수로 렌더링되는지 확인합니다.
+# 실행: python -m benchmarks.bench_view_user
+import datetime
+from flask import g
+from app.extensions import db
+from app.models import User, Pro, Ticket, Holding
+from app.models.ticket_template import TicketCategory
+from . import make_app, login_as, count_queries
+
+
+def seed(ticket_count, holdings_per_ticket=2):
+    admin = User(name='관리자', phone='010-0000-0000', is_admin=True)
+    member = User(name='장기회원', phone='010-1234-5678')
+    member.set_phone_last4()
+    pros = [Pro(name=f'프로{i}') for i in range(3)]
+    db.session.add_all([admin, member] + pros)
+    db.session.flush()
+    start = datetime.date(2023, 1, 1)
+    for i in range(ticket_count):
+        ticket = Ticket(user_id=member.id, name=f'쿠폰 {i + 1}', category=TicketCategory.COUPON,
+                        start_date=start, expiry_date=start + datetime.timedelta(days=90),
+                        total_taseok_count=10, remaining_taseok_count=i % 10,
+                        total_lesson_count=5, remaining_lesson_count=i % 5,
+                        pro_id=pros[i % len(pros)].id if i % 4 else None)
+        ticket.update_status()
+        db.session.add(ticket)
+        db.session.flush()
+        for h in range(holdings_per_ticket):
+            hold_start = start + datetime.timedelta(days=10 + h * 20)
+            db.session.add(Holding(ticket_id=ticket.id, start_date=hold_start,
+                                   end_date=hold_start + datetime.timedelta(days=6)))
+        start += datetime.timedelta(days=30)
+    db.session.commit()
+    return admin.id, member.id
+
+
+def run(ticket_count):
+    app = make_app()
+    with app.app_context():
+        admin_id, member_id = seed(ticket_count)
+        client = app.test_client()
+        login_as(client, admin_id)
+        client.get(f'/admin/users/{member_id}') # 첫 요청 준비 작업 제외
+        # 같은 앱 컨텍스트를 재사용하므로 실제 요청처럼 세션/로그인 사용자 캐시를 비움
+        db.session.remove()
+        g.pop('_login_user', None)
+
+        with count_queries() as counter:
+            response = client.get(f'/admin/users/{member_id}')
+        assert response.status_code == 200, response.status_code
+        assert response.data.decode().count('홀딩 내역 (') == ticket_count
+        print(f"tickets={ticket_count:3d} holdings={ticket_count * 2:3d} | "
+              f"{counter.count} queries {counter.elapsed * 1000:6.1f}ms")
+        db.session.remove()
+        db.drop_all()
+        return counter.count
+
+
+if __name__ == '__main__':
+    counts = [run(n) for n in (1, 10, 40, 100)]
+    # 로그인 사용자, 회원, 티켓(+프로), 홀딩 -> 티켓 수와 무관하게 동일해야 함
+    assert len(set(counts)) == 1, f"query count grows with tickets: {counts}"
+    print(f"OK: {counts[0]} queries regardless of ticket count")
@@ -0,0 +1,138 @@
+# benchmarks/stress_booth_server.py
+# 타석 상태 서버(reference/server_final_v2.py): 여러 스레드가 동시에 /update, /queue, /cancel, /admin 을 보낼 때
+# 한 사람이 두 타석에 배정되지 않는지, 대기열/비는 시각 색인이 깨지지 않는지, 등록되지 않은 타석 이름이
+# 상태를 늘리지 않는지, 저널을 처음부터 다시 적용하면 메모리 상태와 같아지는지 확인합니다.
+# /update/batch 로 온 오래된 상태가 그 뒤의 보고를 되돌리지 않는지도 확인합니다.
+# 실행: python -m benchmarks.stress_booth_server
+import importlib.util
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+THREADS = 16
+REQUESTS_PER_THREAD = 1_500
+BOOTH_COUNT = 24
+BOOTH_NAMES = [str(i) for i in range(1, BOOTH_COUNT + 1)]
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reference', 'server_final_v2.py')
+
+
+def load_server():
+    spec = importlib.util.spec_from_file_location('booth_server', SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def worker(srv, idx, barrier, joined):
+    rnd = random.Random(idx)
+    client = srv.app.test_client()
+    barrier.wait()
+    for i in range(REQUESTS_PER_THREAD):
+        booth = str(rnd.randint(1, BOOTH_COUNT))
+        r = rnd.random()
+        if r < 0.35:
+            client.post('/update', json={'booth': booth, 'status': f"{rnd.randint(1, 70):02d}:{rnd.randint(0, 59):02d}"})
+        elif r < 0.55:
+            client.post('/update', json={'booth': booth, 'status': '사용가능'}) # 종료 → 대기열 배정
+        elif r < 0.75:
+            name = f"손님{idx}-{i}"
+            joined.append(name)
+            client.post('/queue', data={'name': name})
+        elif r < 0.82 and joined:
+            client.post('/cancel', data={'name': rnd.choice(joined)})
+        elif r < 0.9 and joined:
+            client.post('/admin', data={'action': rnd.choice(['up', 'down']), 'name': rnd.choice(joined)})
+        elif r < 0.95:
+            client.post('/admin/update', data={'booth': booth, 'status': rnd.choice(['사용가능', '사용중'])})
+        elif r < 0.97:
+            res = client.post('/update', json={'booth': f"타석{idx}-{i}", 'status': '10:00'}) # 등록되지 않은 이름
+            assert res.status_code == 404
+        elif r < 0.985:
+            sent_at = time.time()
+            samples = [{'status': rnd.choice(['사용가능', f"{rnd.randint(1, 70):02d}:00"]), 'at': sent_at - rnd.randint(0, 600)}
+                       for _ in range(rnd.randint(1, 5))]
+            client.post('/update/batch', json={'booth': booth, 'sent_at': sent_at, 'samples': samples})
+        else:
+            client.post('/update', json={'booth': booth, 'status': 'DECREASE'})
+
+
+def check_stale_batch(srv):
+    """사용중으로 보고된 타석에 그보다 먼저 측정된 '사용가능' 배치가 와도 타석이 비거나 배정되지 않아야 함"""
+    srv.store = srv.BoothStateStore(BOOTH_NAMES)
+    client = srv.app.test_client()
+    client.post('/update', json={'booth': '1', 'status': '30:00'})
+    client.post('/queue', data={'name': '대기손님'})
+    before = srv.store.snapshot()['status_data']['1']
+
+    sent_at = time.time()
+    res = client.post('/update/batch', json={'booth': '1', 'sent_at': sent_at,
+                                             'samples': [{'status': '사용가능', 'at': sent_at - 3000}]})
+    assert res.get_json() == {'applied': 0, 'rejected': ['사용가능']}, res.get_json()
+    after = srv.store.snapshot()
+    state = after['status_data']['1']
+    assert (state.status, state.end_at, state.last_update) == (before.status, before.end_at, before.last_update), \
+        "오래된 배치 상태가 타석 상태를 되돌림"
+    assert after['queue'] == ['대기손님'] and '1' not in after['assignments'], "오래된 배치 상태로 사용중 타석에 배정됨"
+
+
+def main():
+    srv = load_server()
+    srv.store = srv.BoothStateStore(BOOTH_NAMES)
+    barrier = threading.Barrier(THREADS)
+    joined = []
+    threads = [threading.Thread(target=worker, args=(srv, i, barrier, joined)) for i in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    state = srv.store.snapshot()
+    records = [json.loads(line) for line in srv.journal_pending]
+
+    # 1) 한 사람은 한 번만 배정되고, 배정된 사람은 대기열에 남아 있지 않음
+    assigned = Counter(r['value']['name'] for r in records if r['op'] == 'assign')
+    duplicated = [name for name, n in assigned.items() if n > 1]
+    assert not duplicated, f"중복 배정: {duplicated[:5]}"
+    assert not set(assigned) & set(state['queue']), "배정된 사람이 대기열에 남아 있음"
+    assert len(state['queue']) == len(set(state['queue']))
+    assert set(state['status_data']) <= set(BOOTH_NAMES), "등록되지 않은 타석 상태가 생김"
+
+    # 2) 기록 순서(seq)가 중복/누락 없이 이어짐
+    seqs = [r['seq'] for r in records]
+    assert seqs == list(range(1, len(records) + 1)), "저널 순서 번호가 어긋남"
+
+    # 3) 저널을 새 저장소에 다시 적용하면 같은 상태 (확인 시각만 갱신한 heartbeat 는 저널에 없으므로 제외)
+    replayed = srv.BoothStateStore(BOOTH_NAMES)
+    for record in records:
+        replayed.apply_record(record)
+    again = replayed.snapshot()
+    strip = lambda data: {b: (v.status, v.end_at) for b, v in data.items() if v.last_update}
+    assert strip(again['status_data']) == strip(state['status_data']), "저널 재적용 결과가 다름 (타석)"
+    assert again['assignments'] == state['assignments'], "저널 재적용 결과가 다름 (배정)"
+    assert again['queue'] == state['queue'], "저널 재적용 결과가 다름 (대기열)"
+
+    # 4) 예상 배정(비는 시각 색인)의 대기 시간이 현재 상태를 전체 정렬한 결과와 같음
+    now_ts = int(time.time())
+    wait = lambda v: 0 if v.status == '사용가능' else v.remaining(now_ts)
+    expected = sorted(wait(v) for v in state['status_data'].values()
+                      if v.status == '사용가능' or (v.status == '사용중' and v.end_at))
+    projected = [wait(state['status_data'][booth]) for _, _, booth, _ in srv.store.queue_projection() if booth != '-']
+    assert projected == expected[:len(state['queue'])], "예상 배정 순서가 다름"
+
+    total = THREADS * REQUESTS_PER_THREAD
+    print(f"{THREADS} threads x {REQUESTS_PER_THREAD} requests: {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    print(f"배정 {sum(assigned.values())}건 (중복 없음), 저널 {len(records)}건 재적용 일치, 대기 {len(state['queue'])}명")
+
+    # 5) 타석 상태보다 오래된 배치 상태는 거절
+    check_stale_batch(srv)
+    print("오래된 배치 상태 거절 확인")
+
+
+if __name__ == '__main__':
+    main()
@@ -90,9 +90,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # FTS5 회원 검색 색인(user_search 및 shadow 테이블)은 모델에 없으므로
+    # autogenerate 가 삭제 마이그레이션을 만들지 않도록 제외
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == 'table' and reflected and name.startswith('user_search'):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,36 @@
+"""Add denormalized category column to Ticket
+
+Revision ID: 3f6d2a91c7e4
+Revises: 154f343f3dcf
+Create Date: 2025-05-12 21:14:03.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6d2a91c7e4'
+down_revision = '154f343f3dcf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category', sa.Enum('PERIOD', 'COUNT', 'COUPON', 'LESSON_ADD', 'COMBO', name='ticketcategory'), nullable=True))
+        batch_op.create_index('ix_ticket_user_active_category_expiry', ['user_id', 'is_active', 'category', 'expiry_date'], unique=False)
+
+    # 기존 티켓의 대분류를 템플릿에서 채움
+    op.execute(
+        "UPDATE ticket SET category = ("
+        "SELECT ticket_template.category FROM ticket_template "
+        "WHERE ticket_template.id = ticket.ticket_template_id) "
+        "WHERE ticket_template_id IS NOT NULL"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_user_active_category_expiry')
+        batch_op.drop_column('category')
@@ -0,0 +1,38 @@
+"""Add composite indexes for filtered booking list and phone_last4 index
+
+Revision ID: 5e9b2f7a1c38
+Revises: d4a7c3e915b2
+Create Date: 2025-05-17 10:12:47.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9b2f7a1c38'
+down_revision = 'd4a7c3e915b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_booth_start_time', ['booth_id', 'start_time'], unique=False)
+        batch_op.create_index('ix_booking_pro_start_time', ['pro_id', 'start_time'], unique=False)
+        batch_op.create_index('ix_booking_user_start_time', ['user_id', 'start_time'], unique=False)
+        batch_op.create_index('ix_booking_status_start_time', ['status', 'start_time'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_phone_last4'), ['phone_last4'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_phone_last4'))
+
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_status_start_time')
+        batch_op.drop_index('ix_booking_user_start_time')
+        batch_op.drop_index('ix_booking_pro_start_time')
+        batch_op.drop_index('ix_booking_booth_start_time')
@@ -0,0 +1,26 @@
+"""Add ticket issue_date index for accounting exports
+
+Revision ID: 7b4e0c2d9a15
+Revises: f05d9e3a6b21
+Create Date: 2025-05-19 10:41:08.215730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4e0c2d9a15'
+down_revision = 'f05d9e3a6b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_issue_date', ['issue_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_issue_date')
@@ -0,0 +1,41 @@
+"""Add non-negative CHECK constraints to ticket and lesson counters
+
+Revision ID: 8c1e4b7d2f90
+Revises: 3f6d2a91c7e4
+Create Date: 2025-05-14 20:02:47.906115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e4b7d2f90'
+down_revision = '3f6d2a91c7e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 제약 추가 전에 기존 음수 값을 0으로 정리
+    ticket = sa.table('ticket', sa.column('remaining_taseok_count', sa.Integer), sa.column('remaining_lesson_count', sa.Integer))
+    user = sa.table('user', sa.column('remaining_lesson_total', sa.Integer))
+    op.execute(ticket.update().where(ticket.c.remaining_taseok_count < 0).values(remaining_taseok_count=0))
+    op.execute(ticket.update().where(ticket.c.remaining_lesson_count < 0).values(remaining_lesson_count=0))
+    op.execute(user.update().where(user.c.remaining_lesson_total < 0).values(remaining_lesson_total=0))
+
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.create_check_constraint('ck_ticket_remaining_taseok_count_nonnegative', 'remaining_taseok_count >= 0')
+        batch_op.create_check_constraint('ck_ticket_remaining_lesson_count_nonnegative', 'remaining_lesson_count >= 0')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_check_constraint('ck_user_remaining_lesson_total_nonnegative', 'remaining_lesson_total >= 0')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_user_remaining_lesson_total_nonnegative', type_='check')
+
+    with op.batch_alter_table('ticket', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_ticket_remaining_lesson_count_nonnegative', type_='check')
+        batch_op.drop_constraint('ck_ticket_remaining_taseok_count_nonnegative', type_='check')
@@ -0,0 +1,29 @@
+"""Seed the reference_data cache_version row for existing databases
+
+Revision ID: 9d3b6e0f4a27
+Revises: c58f1a7e3d42
+Create Date: 2025-05-20 10:12:48.603117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b6e0f4a27'
+down_revision = 'c58f1a7e3d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # e2c84b61f7a3 이 행을 만들기 전에 마이그레이션한 DB 에 버전 행이 없으면 추가
+    cache_version = sa.table('cache_version', sa.column('name', sa.String), sa.column('version', sa.Integer))
+    exists = sa.select(cache_version.c.name).where(cache_version.c.name == 'reference_data').exists()
+    op.execute(cache_version.insert().from_select(
+        ['name', 'version'], sa.select(sa.literal('reference_data'), sa.literal(0)).where(~exists)
+    ))
+
+
+def downgrade():
+    pass # 시드 행은 그대로 둠 (e2c84b61f7a3 downgrade 에서 테이블과 함께 삭제)
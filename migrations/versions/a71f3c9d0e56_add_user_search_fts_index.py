@@ -0,0 +1,58 @@
+"""Add FTS5 trigram search index over user name/phone/memo (SQLite only)
+
+Revision ID: a71f3c9d0e56
+Revises: 5e9b2f7a1c38
+Create Date: 2025-05-17 14:03:29.518204
+
+"""
+import sqlite3
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a71f3c9d0e56'
+down_revision = '5e9b2f7a1c38'
+branch_labels = None
+depends_on = None
+
+
+# app/models/user.py 의 USER_SEARCH_CREATE_SQL 과 동일하게 유지
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5("
+    "name, phone, memo, content='user', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON user BEGIN "
+    "INSERT INTO user_search(rowid, name, phone, memo) VALUES (new.id, new.name, new.phone, new.memo); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON user BEGIN "
+    "INSERT INTO user_search(user_search, rowid, name, phone, memo) VALUES ('delete', old.id, old.name, old.phone, old.memo); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF name, phone, memo ON user BEGIN "
+    "INSERT INTO user_search(user_search, rowid, name, phone, memo) VALUES ('delete', old.id, old.name, old.phone, old.memo); "
+    "INSERT INTO user_search(rowid, name, phone, memo) VALUES (new.id, new.name, new.phone, new.memo); END",
+]
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS user_search_au",
+    "DROP TRIGGER IF EXISTS user_search_ad",
+    "DROP TRIGGER IF EXISTS user_search_ai",
+    "DROP TABLE IF EXISTS user_search",
+]
+
+
+def _fts_supported():
+    # 다른 DB 나 trigram 미지원 SQLite(<3.34) 에서는 LIKE 검색으로 동작하므로 건너뜀
+    return op.get_bind().dialect.name == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def upgrade():
+    if not _fts_supported():
+        return
+    for statement in CREATE_SQL:
+        op.execute(statement)
+    # 기존 회원 데이터로 색인 채우기
+    op.execute("INSERT INTO user_search(user_search) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        op.execute(statement)
@@ -0,0 +1,36 @@
+"""Add daily_stats rollup table for reports
+
+Revision ID: c58f1a7e3d42
+Revises: 7b4e0c2d9a15
+Create Date: 2025-05-19 15:07:33.482915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c58f1a7e3d42'
+down_revision = '7b4e0c2d9a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_stats',
+    sa.Column('stat_date', sa.Date(), nullable=False),
+    sa.Column('booth_id', sa.Integer(), nullable=False),
+    sa.Column('pro_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('booking_count', sa.Integer(), nullable=False),
+    sa.Column('booked_minutes', sa.Integer(), nullable=False),
+    sa.Column('lesson_count', sa.Integer(), nullable=False),
+    sa.Column('ticket_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('stat_date', 'booth_id', 'pro_id', 'category')
+    )
+    # 과거 데이터는 배포 후 `flask rebuild-daily-stats` 로 채웁니다.
+
+
+def downgrade():
+    op.drop_table('daily_stats')
@@ -0,0 +1,26 @@
+"""Add (status, end_time) index to Booking for the status sweeper
+
+Revision ID: d4a7c3e915b2
+Revises: 8c1e4b7d2f90
+Create Date: 2025-05-16 22:31:10.442871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c3e915b2'
+down_revision = '8c1e4b7d2f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_status_end_time', ['status', 'end_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_status_end_time')
@@ -0,0 +1,31 @@
+"""Add cache_version table for the reference-data cache version stamp
+
+Revision ID: e2c84b61f7a3
+Revises: a71f3c9d0e56
+Create Date: 2025-05-18 09:41:02.117430
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c84b61f7a3'
+down_revision = 'a71f3c9d0e56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_version = op.create_table('cache_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # 버전 증가는 UPDATE 만 하므로 행을 미리 만들어 둠 (첫 변경 동시 INSERT 충돌 방지)
+    op.bulk_insert(cache_version, [{'name': 'reference_data', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('cache_version')
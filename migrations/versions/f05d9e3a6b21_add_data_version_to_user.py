@@ -0,0 +1,26 @@
+"""Add data_version to User for admin JSON API ETags
+
+Revision ID: f05d9e3a6b21
+Revises: e2c84b61f7a3
+Create Date: 2025-05-18 16:22:54.803617
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f05d9e3a6b21'
+down_revision = 'e2c84b61f7a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -1,6 +1,7 @@
 import time
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import pytesseract
 import cv2
 import numpy as np
@@ -9,6 +10,7 @@ import os
 import sys
 import re
 import threading
+from collections import deque
 from datetime import datetime
 from pystray import Icon, MenuItem, Menu
 from PIL import Image as PILImage
@@ -41,6 +43,11 @@ TESSERACT_PATH = config.get("tesseract_path", r"C:\\Program Files\\Tesseract-OCR
 SEND_INTERVAL = config.get("send_interval", 3)
 FAIL_THRESHOLD = config.get("fail_threshold", 4)
 USE_TEMPLATE_MATCHING = config.get("use_template_matching", True)
+# 서버가 종료 시각으로 남은 시간을 계산하므로 전환/보정/주기 확인만 전송
+HEARTBEAT_INTERVAL = config.get("heartbeat_interval", 60) # 변화가 없어도 이 간격마다 한 번 전송 (서버 오프라인 판단 300초보다 짧게)
+CORRECTION_TOLERANCE = config.get("correction_tolerance", 5) # 예상 남은 시간과 이 이상 차이 나면 보정 전송
+BATCH_URL = config.get("batch_url", SERVER_URL.rstrip("/") + "/batch") # 밀린 상태를 한 번에 보내는 주소
+MAX_PENDING_SAMPLES = config.get("max_pending_samples", 200) # 서버에 못 보낸 상태를 이만큼까지 보관 (오래된 것부터 버림)
 
 pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
 last_time = None
@@ -49,6 +56,20 @@ consecutive_errors = 0
 MAX_ERROR_COUNT = 10
 running = True
 
+# 마지막 전송 내용 (전송 여부 판단용)
+last_sent_state = None # "사용가능" 또는 "사용중"
+last_sent_seconds = None # 사용중일 때 전송한 남은 시간 (초)
+last_sent_at = None # time.monotonic()
+
+# 전송은 별도 스레드가 연결을 재사용(keep-alive)하며 처리합니다.
+# 보내는 중(네트워크가 느리거나 끊김)에 쌓인 상태는 다음 전송 때 /update/batch 로 한 번에 보냅니다.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+outbox = deque(maxlen=MAX_PENDING_SAMPLES) # {"status", "at"} (at: 측정 시각 epoch 초)
+outbox_cond = threading.Condition()
+batch_supported = True # 이전 서버(/update/batch 없음)면 False 로 바꾸고 마지막 상태만 보냄
+
 # ───────────── 로그 기록 ─────────────
 
 def log(text):
@@ -153,15 +174,77 @@ def decrease_time_str(time_str, seconds=SEND_INTERVAL):
         return None
 
 def send_status(time_value, status):
-    try:
-        payload = {
-            "booth": BOOTH_NAME,
-            "status": status
-        }
-        res = requests.post(SERVER_URL, json=payload, timeout=10)
-        log(f"OCR: {time_value}, Sent: {payload}, Response: {res.status_code}")
-    except Exception as e:
-        log(f"[SEND ERROR] {e}")
+    """보낼 상태를 전송 대기열에 넣습니다 (실제 전송은 sender_loop)."""
+    with outbox_cond:
+        outbox.append({"status": status, "at": time.time()})
+        outbox_cond.notify()
+    log(f"OCR: {time_value}, Queued: {status}")
+
+def post_samples(samples):
+    """상태 한 건은 /update, 여러 건은 /update/batch 로 전송. 실패하면 예외"""
+    global batch_supported
+    if len(samples) > 1 and batch_supported:
+        payload = {"booth": BOOTH_NAME, "sent_at": time.time(), "samples": samples}
+        res = session.post(BATCH_URL, json=payload, timeout=10)
+        if res.status_code != 404 or "Unknown booth" in res.text:
+            log(f"Sent batch: {len(samples)}건, Response: {res.status_code} {res.text[:200]}")
+            return
+        batch_supported = False
+        log("[BATCH] 서버가 /update/batch 를 지원하지 않아 마지막 상태만 전송합니다.")
+    payload = {"booth": BOOTH_NAME, "status": samples[-1]["status"]}
+    res = session.post(SERVER_URL, json=payload, timeout=10)
+    log(f"Sent: {payload}, Response: {res.status_code}")
+
+def sender_loop():
+    while running:
+        with outbox_cond:
+            if not outbox:
+                outbox_cond.wait(timeout=1)
+            samples = list(outbox)
+            outbox.clear()
+        if not samples:
+            continue
+        try:
+            post_samples(samples)
+        except Exception as e:
+            log(f"[SEND ERROR] {e}")
+            with outbox_cond: # 못 보낸 상태를 되돌려 다음에 함께 전송 (최근 것 우선 보관)
+                pending = samples + list(outbox)
+                outbox.clear()
+                outbox.extend(pending[-MAX_PENDING_SAMPLES:])
+            time.sleep(SEND_INTERVAL)
+
+def report_status(time_value, status):
+    """
+    서버에 보낼 필요가 있을 때만 send_status 로 전송 대기열에 넣습니다.
+    - 사용가능 <-> 사용중 전환
+    - 남은 시간이 마지막 전송 기준 예상값과 CORRECTION_TOLERANCE 초 이상 차이 (보정)
+    - 마지막 전송 후 HEARTBEAT_INTERVAL 초 경과 (확인)
+    """
+    global last_sent_state, last_sent_seconds, last_sent_at
+    now = time.monotonic()
+    seconds = None
+    if ':' in status:
+        try:
+            m, s = map(int, status.split(":"))
+            seconds = m * 60 + s
+        except ValueError:
+            seconds = None
+    state = "사용중" if seconds else "사용가능" # "00:00" 도 사용가능 전환
+
+    heartbeat_due = last_sent_at is None or now - last_sent_at >= HEARTBEAT_INTERVAL
+    changed = state != last_sent_state
+    drifted = False
+    if state == "사용중" and last_sent_seconds is not None:
+        expected = last_sent_seconds - (now - last_sent_at)
+        drifted = abs(expected - seconds) >= CORRECTION_TOLERANCE
+    if not (changed or drifted or heartbeat_due):
+        return
+
+    send_status(time_value, status)
+    last_sent_state = state
+    last_sent_seconds = seconds if state == "사용중" else None
+    last_sent_at = now
 
 # ───────────── 메인 OCR 루프 ─────────────
 
@@ -178,7 +261,7 @@ def main_loop():
         while running:
             try:
                 if is_screensaver_active():
-                    send_status("-", "사용가능")
+                    report_status("-", "사용가능")
                     log("[SCREEN SAVER] OCR 생략, 사용가능 전송됨")
                     time.sleep(SEND_INTERVAL)
                     continue
@@ -206,12 +289,12 @@ def main_loop():
                                         if m * 60 + s <= 19:
                                             decreased = "00:00"
                                         last_time = decreased
-                                        send_status(decreased, decreased)
+                                        report_status(decreased, decreased)
                                         log(f"[TEMPLATE MATCH] {decreased} 전송됨")
                                         fail_count = 0
                                 else:
                                     last_time = "사용가능"
-                                    send_status("-", "사용가능")
+                                    report_status("-", "사용가능")
                                     log("[TEMPLATE MATCH INIT] 사용가능 전송됨")
                                 time.sleep(SEND_INTERVAL)  # OCR 건너뛰고 기다린다.
                                 break  # OCR 시도 없이 바로 종료
@@ -244,7 +327,7 @@ def main_loop():
                         time_text = "00:00"
                     last_time = time_text
                     fail_count = 0
-                    send_status(time_text, time_text)
+                    report_status(time_text, time_text)
 
                 else:
                     fail_count += 1
@@ -253,15 +336,15 @@ def main_loop():
                         decreased = decrease_time_str(last_time, SEND_INTERVAL)
                         if decreased:
                             last_time = decreased
-                            send_status(decreased, decreased)
+                            report_status(decreased, decreased)
                             log(f"[FAIL BACKUP] {decreased} 전송됨")
                     elif fail_count >= FAIL_THRESHOLD:
                         if last_time != "사용가능":
                             last_time = "사용가능"
-                            send_status("-", "사용가능")
+                            report_status("-", "사용가능")
                             log("[FAIL THRESHOLD] 사용가능 전환 전송됨")
                         else:
-                            send_status("-", "사용가능")
+                            report_status("-", "사용가능")
                             log("[FAIL THRESHOLD] 여전히 사용가능 재전송됨")
 
                 consecutive_errors = 0
@@ -300,6 +383,7 @@ def setup_tray():
     icon_img = PILImage.new("RGB", (64, 64), color="black")
     tray_icon.icon = icon_img
     threading.Thread(target=main_loop, daemon=True).start()
+    threading.Thread(target=sender_loop, daemon=True).start()
     tray_icon.run()
 
 # ───────────── 시작 ─────────────
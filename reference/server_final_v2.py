@@ -1,9 +1,11 @@
-from flask import Flask, request, render_template, redirect, url_for
-from datetime import datetime, timedelta
-from collections import defaultdict
-import os, json, sys, calendar, time
-from threading import Thread
+from flask import Flask, request, render_template, redirect, url_for, Response, jsonify
+from datetime import datetime
+from collections import defaultdict, deque
+import os, json, sys, calendar, time, heapq, sqlite3
+from threading import Thread, Lock, Condition, Event
 from waitress import serve
+import atexit
+from contextlib import contextmanager, closing
 
 # --- 상수 및 유틸 함수 ---
 
@@ -16,6 +18,10 @@ def time_str_to_seconds(time_str):
     except:
         return 0
 
+def format_seconds(seconds):
+    mins, secs = divmod(max(0, int(seconds)), 60)
+    return f"{mins:02d}:{secs:02d}"
+
 def mask_name(name):
     if len(name) <= 1:
         return "*"
@@ -30,11 +36,11 @@ BASE_DIR = os.path.dirname(os.path.abspath(sys.executable if getattr(sys, 'froze
 STATE_FILE = os.path.join(BASE_DIR, 'server_state.json')
 CONFIG_FILE = os.path.join(BASE_DIR, 'server_config.json')
 QUEUE_FILE = os.path.join(BASE_DIR, 'queue.json')
+JOURNAL_FILE = os.path.join(BASE_DIR, 'server_state.journal') # 상태 변경 기록 (JSON Lines, 추가 전용)
 
 # --- 초기 데이터 및 상태 ---
-status_data = defaultdict(lambda: {'status': '사용가능', 'time': '-', 'last_update': datetime.min})
-booth_assignments = defaultdict(lambda: None)
-ignored_state = defaultdict(lambda: {'in_ignore': False, 'start_time': None, 'start_remaining': None})
+SESSION_SECONDS = 4200 # 배정 시 기본 이용 시간 (70:00)
+STATE_LOCK_STRIPES = 16 # 타석 잠금 개수 (타석 이름 해시로 나눠 씀)
 
 def load_json(filename, default=[]):
     if not os.path.exists(filename):
@@ -78,45 +84,764 @@ OFFLINE_SUNDAYS = config["offline_sundays"]
 CUSTOM_HOLIDAYS = config["custom_holidays"]
 WEEKDAY_KEYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
 WAIT_BEFORE_ENFORCE_CLIENT_SECONDS = config.get("wait_before_enforce_client_seconds", 60)
+TIME_CORRECTION_TOLERANCE_SECONDS = config.get("time_correction_tolerance_seconds", 5) # 이 이내 차이는 보정하지 않음 (확인 시각만 갱신)
+JOURNAL_FLUSH_SECONDS = config.get("journal_flush_seconds", 1) # 저널 fsync 주기 (이 간격의 기록을 한 번에 디스크에 씀)
+SNAPSHOT_INTERVAL_SECONDS = config.get("snapshot_interval_seconds", 300) # 스냅샷(압축) 주기
+SNAPSHOT_MAX_JOURNAL_RECORDS = config.get("snapshot_max_journal_records", 5000) # 저널이 이만큼 쌓이면 주기 전이라도 스냅샷
+SERVER_THREADS = config.get("server_threads", 32) # waitress 작업 스레드 수 (실시간 화면 연결도 하나씩 사용)
+LIVE_MAX_SUBSCRIBERS = config.get("live_max_subscribers", max(1, SERVER_THREADS - 8)) # 나머지 스레드는 /update 등 요청 처리용
+LIVE_REFRESH_SECONDS = config.get("live_refresh_seconds", 5) # 시간 경과로 바뀌는 값(오프라인 판단 등) 확인 주기
+LIVE_KEEPALIVE_SECONDS = 15 # 변경이 없을 때 연결 유지용 주석 전송 간격
+LIVE_DELTA_HISTORY = 256 # 재연결 시 이어 보낼 수 있는 delta 개수
+BOOTH_NAMES = [str(b) for b in config.get("booths", [])] # 상태를 받을 타석 이름
+BOOTH_DB_PATH = config.get("booth_db_path") # 골프 관리 앱 SQLite DB (booth 테이블의 타석 이름도 등록)
+MAX_AUTO_BOOTHS = config.get("max_booths", 64) # 등록 타석이 없을 때 자동 등록할 최대 타석 수
+MAX_BATCH_SAMPLES = config.get("max_batch_samples", 500) # /update/batch 한 번에 받을 최대 상태 수
+MAX_SAMPLE_AGE_SECONDS = config.get("max_sample_age_seconds", 3600) # 배치 상태의 측정 후 경과 시간 상한 (더 오래된 값은 이 시간으로 봄)
+
+
+# --- 대기열 ---
+# 이중 연결 리스트 + 이름→노드 색인으로, 포함 여부/추가/삭제/한 칸 이동/맨 앞 꺼내기가 모두 O(1) 입니다.
+# 저장/표시할 때는 이름 목록(list)으로 직렬화합니다.
+class _QueueNode:
+    __slots__ = ('name', 'prev', 'next')
+
+    def __init__(self, name):
+        self.name = name
+        self.prev = None
+        self.next = None
+
+
+class WaitingQueue:
+    def __init__(self, names=()):
+        self.version = 0 # 내용/순서가 바뀔 때마다 증가 (표시용 캐시 무효화)
+        self.reset(names)
+
+    def reset(self, names):
+        """목록 전체를 names 로 교체 (저장된 상태 복원용, 중복 이름은 처음 것만)"""
+        self.version += 1
+        self._nodes = {}
+        self._head = self._tail = None
+        for name in names:
+            self.append(name)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __bool__(self):
+        return bool(self._nodes)
+
+    def __contains__(self, name):
+        return name in self._nodes
+
+    def __iter__(self):
+        node = self._head
+        while node is not None:
+            yield node.name
+            node = node.next
+
+    def to_list(self):
+        return list(self)
+
+    def _link_before(self, node, before):
+        """node 를 before 노드 앞에 연결 (before 가 None 이면 맨 뒤)"""
+        node.next = before
+        node.prev = before.prev if before is not None else self._tail
+        if node.prev is not None:
+            node.prev.next = node
+        else:
+            self._head = node
+        if before is not None:
+            before.prev = node
+        else:
+            self._tail = node
+
+    def _unlink(self, node):
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self._head = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self._tail = node.prev
+        node.prev = node.next = None
+
+    def append(self, name):
+        """맨 뒤에 추가. 이미 있으면 False"""
+        if name in self._nodes:
+            return False
+        node = self._nodes[name] = _QueueNode(name)
+        self._link_before(node, None)
+        self.version += 1
+        return True
+
+    def remove(self, name):
+        """삭제. 없으면 False"""
+        node = self._nodes.pop(name, None)
+        if node is None:
+            return False
+        self._unlink(node)
+        self.version += 1
+        return True
+
+    def popleft(self):
+        """맨 앞 이름을 꺼냄 (비어 있으면 None)"""
+        if self._head is None:
+            return None
+        name = self._head.name
+        self.remove(name)
+        return name
+
+    def next_of(self, name):
+        """name 바로 뒤의 이름 (맨 뒤면 None)"""
+        node = self._nodes[name].next
+        return node.name if node is not None else None
+
+    def place_before(self, name, before):
+        """name 을 before 바로 앞으로 옮김 (before 가 None 이면 맨 뒤). 같은 기록을 두 번 적용해도 결과가 같습니다."""
+        node = self._nodes.get(name)
+        if node is None or name == before:
+            return False
+        anchor = self._nodes.get(before) if before is not None else None
+        if before is not None and anchor is None:
+            return False
+        self._unlink(node)
+        self._link_before(node, anchor)
+        self.version += 1
+        return True
+
+    def move_up(self, name):
+        """한 칸 앞으로. 옮겼으면 True"""
+        node = self._nodes.get(name)
+        if node is None or node.prev is None:
+            return False
+        return self.place_before(name, node.prev.name)
+
+    def move_down(self, name):
+        """한 칸 뒤로. 옮겼으면 True"""
+        node = self._nodes.get(name)
+        if node is None or node.next is None:
+            return False
+        after = node.next.next
+        return self.place_before(name, after.name if after is not None else None)
+
+
+
+# --- 타석별 비는 시각 ---
+# 예상 배정 표시를 위해 요청마다 전체 타석을 정렬하지 않도록, 사용중 타석의 종료 시각을 최소 힙으로 유지합니다.
+# 타석 상태가 바뀔 때만 갱신하며(BoothStateStore._put), 바뀌기 전 항목은 힙에 남겨 두었다가 꺼낼 때 건너뜁니다(지연 삭제).
+# 사용가능 타석은 바로 배정되므로 힙과 별도로 등록 순서대로 둡니다.
+class BoothFreeTimes:
+    def __init__(self):
+        self._heap = [] # (종료 시각, 등록 순번, 타석)
+        self._in_use = {} # 타석 → 현재 유효한 힙 항목
+        self._end_at = {} # 타석 → 종료 시각 (epoch 초)
+        self._available = {} # 사용가능 타석 → 등록 순번
+        self._order = {} # 타석 → 처음 등록된 순번 (종료 시각이 같으면 먼저 등록된 타석 우선)
+        self.version = 0 # 비는 순서가 바뀔 때마다 증가 (표시용 캐시 무효화)
+
+    def update(self, booth, state):
+        """타석 상태 변경 반영 (last_update 만 바뀐 경우는 호출할 필요 없음)"""
+        order = self._order.setdefault(booth, len(self._order))
+        end_at = state.end_at if state.status == '사용중' else None
+        if end_at is not None:
+            if booth in self._in_use and self._end_at[booth] == end_at:
+                return
+            entry = (end_at, order, booth)
+            self._in_use[booth] = entry
+            self._end_at[booth] = end_at
+            self._available.pop(booth, None)
+            heapq.heappush(self._heap, entry)
+            if len(self._heap) > 2 * len(self._in_use) + 16:
+                self._heap = list(self._in_use.values()) # 지난 항목이 쌓이면 압축
+                heapq.heapify(self._heap)
+        else:
+            was_available = booth in self._available
+            if state.status == '사용가능':
+                self._available[booth] = order
+            else:
+                self._available.pop(booth, None) # OFFLINE 등 → 배정 대상 아님
+            if booth not in self._in_use and was_available == (booth in self._available):
+                return
+            self._in_use.pop(booth, None)
+            self._end_at.pop(booth, None)
+        self.version += 1
+
+    def due(self, now_ts):
+        """종료 시각이 now_ts 이하인 사용중 타석 (힙 앞부분만 확인)"""
+        found = []
+        while self._heap and self._heap[0][0] <= now_ts:
+            entry = heapq.heappop(self._heap)
+            if self._in_use.get(entry[2]) is entry:
+                found.append(entry)
+        for entry in found: # 조회만 하므로 유효한 항목은 되돌려 둠
+            heapq.heappush(self._heap, entry)
+        return [entry[2] for entry in found]
+
+    def earliest(self, k):
+        """먼저 비는 순서로 앞의 k개 [(타석, 종료 시각)]. 사용가능 타석은 종료 시각 None"""
+        if k <= 0:
+            return []
+        result = [(booth, None) for booth in self.available()[:k]]
+        if len(result) < k:
+            valid = (entry for entry in self._heap if self._in_use.get(entry[2]) is entry)
+            result += [(entry[2], self._end_at[entry[2]]) for entry in heapq.nsmallest(k - len(result), valid)]
+        return result
+
+    def available(self):
+        """사용가능 타석 (등록 순서)"""
+        return sorted(self._available, key=self._available.get)
+
+
+# --- 타석 상태 (종료 시각 기준) ---
+# 남은 시간 문자열 대신 종료 시각을 저장하고, 남은 시간은 읽을 때 계산합니다.
+# 시각은 모두 epoch 초(int)로 두고, 저장 파일/저널에는 기존처럼 ISO 문자열로 씁니다.
+def _ts(dt):
+    return int(dt.timestamp())
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+def _parse_ts(value):
+    """ISO 문자열 → epoch 초 (없거나 이전 형식의 datetime.min 이면 0)"""
+    if not value:
+        return 0
+    dt = datetime.fromisoformat(value)
+    return _ts(dt) if dt.year >= 1970 else 0
+
+
+class BoothState:
+    """타석 상태 한 건. end_at 은 사용중일 때 종료 시각, last_update 는 클라이언트가 마지막으로 확인해 준 시각(0 = 없음)"""
+    __slots__ = ('status', 'end_at', 'last_update')
+
+    def __init__(self, status='사용가능', end_at=None, last_update=0):
+        self.status = status
+        self.end_at = end_at
+        self.last_update = last_update
+
+    def copy(self):
+        return BoothState(self.status, self.end_at, self.last_update)
+
+    def remaining(self, now_ts):
+        """사용중 타석의 남은 시간(초), 사용중이 아니면 None"""
+        if self.status != '사용중' or self.end_at is None:
+            return None
+        return max(0, self.end_at - now_ts)
+
+    def to_record(self):
+        return {'status': self.status, 'end_at': _iso(self.end_at), 'last_update': _iso(self.last_update)}
+
+    @classmethod
+    def from_record(cls, v):
+        """저장된 타석 상태 복원 (이전 형식의 'time' 문자열은 마지막 확인 시각 기준 종료 시각으로 변환)"""
+        last_update = _parse_ts(v.get('last_update'))
+        end_at = _parse_ts(v.get('end_at')) or None
+        if end_at is None and v.get('status') == '사용중' and ':' in (v.get('time') or ''):
+            end_at = last_update + time_str_to_seconds(v['time'])
+        return cls(v.get('status', '사용가능'), end_at, last_update)
+
+
+def display_time(state, now_ts):
+    remaining = state.remaining(now_ts)
+    return format_seconds(remaining) if remaining is not None else '-'
+
+
+def expire_finished_sessions(now=None):
+    """종료 시각이 지난 타석을 사용가능으로 바꾸고 대기열을 배정합니다 (요청 처리 시 지연 실행)."""
+    store.expire(now or datetime.now())
+
+
+def assign_first_queue_to_booth():
+    store.assign_waiting(datetime.now())
+
+
+# --- 타석 등록부 ---
+# 설정(booths) 또는 골프 관리 앱 DB 의 booth 테이블에 있는 타석만 받습니다. 오타나 잘못된 클라이언트가 보낸
+# 이름으로 상태/저장 파일/화면이 끝없이 늘어나지 않도록, 모르는 이름은 상태를 만들기 전에 거절합니다.
+# 둘 다 없으면(이전 설치) 처음 보고한 순서대로 MAX_AUTO_BOOTHS 개까지만 자동 등록합니다.
+def load_booth_names():
+    names = list(BOOTH_NAMES)
+    if BOOTH_DB_PATH:
+        try:
+            with closing(sqlite3.connect(f"file:{BOOTH_DB_PATH}?mode=ro", uri=True)) as conn:
+                names += [row[0] for row in conn.execute("SELECT name FROM booth")]
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to load booths from {BOOTH_DB_PATH}: {e}")
+    return names
+
+
+# --- 타석 상태 저장소 ---
+# waitress 는 여러 스레드에서 요청을 처리하므로, 타석 상태/배정/무시구간/대기열은 이 저장소의 메서드로만 바꿉니다.
+# - 타석 잠금은 고정 개수의 잠금을 타석 이름 해시로 나눠 씁니다. 같은 타석의 변경은 한 번에 하나씩 처리됩니다.
+# - 대기열은 별도 잠금, 비는 시각 힙(여러 타석이 공유)은 색인 잠금으로 보호합니다.
+# - 잠금 순서: 타석 잠금 → 대기열 잠금 → 색인 잠금 → 저널 잠금. 타석 잠금 여러 개를 함께 잡는 곳은 frozen() 뿐입니다.
+# - 변경은 해당 잠금을 잡은 채로 저널에 기록하므로, 같은 타석/대기열의 기록 순서가 실제 변경 순서와 같습니다.
+class BoothStateStore:
+    def __init__(self, booth_names=(), stripes=STATE_LOCK_STRIPES):
+        self._locks = [Lock() for _ in range(stripes)]
+        self._queue_lock = Lock()
+        self._index_lock = Lock()
+        self._registry = set(booth_names) # 받을 타석 이름
+        self._fixed_registry = bool(self._registry) # False 면 MAX_AUTO_BOOTHS 까지 자동 등록
+        self._status = {} # 타석 → BoothState (등록된 타석만, 제자리에서 갱신)
+        self._assignments = {} # 타석 → {'name', 'assigned_time'} 또는 None
+        self._ignore_since = {} # 무시구간 중인 타석 → 진입 시각
+        self._free_times = BoothFreeTimes()
+        self._queue = WaitingQueue()
+        self._projection_key = None
+        self._projection = [] # [(이름, 가린 이름, 예상 타석, 예상 종료 시각)]
+
+    def _lock_for(self, booth):
+        return self._locks[hash(booth) % len(self._locks)]
+
+    def admit(self, booth):
+        """받을 수 있는 타석인지 (등록부에 없으면 상태를 만들지 않고 거절)"""
+        if booth in self._registry:
+            return True
+        if self._fixed_registry or not isinstance(booth, str):
+            return False
+        with self._index_lock:
+            if len(self._registry) >= MAX_AUTO_BOOTHS:
+                return False
+            self._registry.add(booth)
+            return True
+
+    @contextmanager
+    def frozen(self):
+        """모든 잠금을 순서대로 잡아 변경을 멈춥니다 (일관된 스냅샷/저장용)."""
+        for lock in self._locks:
+            lock.acquire()
+        self._queue_lock.acquire()
+        try:
+            yield
+        finally:
+            self._queue_lock.release()
+            for lock in reversed(self._locks):
+                lock.release()
+
+    # 아래 _ 로 시작하는 변경 메서드는 해당 타석 잠금을 잡은 상태에서 호출합니다.
+    def _put(self, booth, status, end_at, last_update, journal=True):
+        state = self._status.get(booth)
+        if state is None:
+            state = self._status[booth] = BoothState()
+        state.status, state.end_at, state.last_update = status, end_at, last_update
+        with self._index_lock:
+            self._free_times.update(booth, state)
+        if journal:
+            journal_status(booth, state)
+
+    def _start_session(self, booth, seconds, now_ts, journal=True):
+        self._put(booth, '사용중', now_ts + seconds, now_ts, journal)
+
+    def _set_available(self, booth, last_update, journal=True):
+        self._put(booth, '사용가능', None, last_update, journal)
+
+    def _state(self, booth):
+        if booth not in self._status: # 처음 보고하는 타석 (확인 시각은 호출한 쪽에서 갱신)
+            self._put(booth, '사용가능', None, 0, journal=False)
+        return self._status[booth]
+
+    def _apply_report(self, booth, status_str, now_ts, journal=True):
+        """상태 보고 한 건 반영 (타석 잠금을 잡은 상태에서 호출)"""
+        current = self._state(booth)
+        ignore_since = self._ignore_since.get(booth)
+
+        if ignore_since is not None:
+            elapsed = now_ts - ignore_since
+
+            # 정상값 (00:01~70:00) 수신 시 무시구간 탈출
+            if ':' in status_str:
+                sec = time_str_to_seconds(status_str)
+                if 1 <= sec <= SESSION_SECONDS:
+                    print(f"[EXIT IGNORED] {booth} → 정상값 수신")
+                    del self._ignore_since[booth]
+                    self._start_session(booth, sec, now_ts, journal)
+                    return "OK", 200, False
+
+            # 시간 경과에 의한 무시구간 탈출
+            if elapsed >= WAIT_BEFORE_ENFORCE_CLIENT_SECONDS:
+                print(f"[EXIT IGNORED] {booth} → 시간 경과")
+                del self._ignore_since[booth]
+                return "OK", 200, False
+            # 여전히 무시 중 → 남은 시간은 종료 시각으로 계속 줄어들므로 확인 시각만 갱신
+            current.last_update = now_ts
+            print(f"[IGNORED] {booth} → {status_str} (무시구간 중)")
+            return "IGNORED", 200, False
+
+        if status_str == "DECREASE":
+            # 이전 클라이언트 호환: 서버가 이미 종료 시각으로 줄이고 있으므로 확인 시각만 갱신
+            current.last_update = now_ts
+            return "OK", 200, False
+
+        if status_str == "00:00" or status_str == '사용가능':
+            if current.status == '사용가능':
+                current.last_update = now_ts # 상태 변화 없음 (heartbeat)
+                return "OK", 200, False
+            self._set_available(booth, now_ts, journal)
+            return "OK", 200, status_str == '사용가능'
+
+        if ':' in status_str and status_str.replace(':', '').isdigit():
+            sec = time_str_to_seconds(status_str)
+            remaining = current.remaining(now_ts)
+            if remaining is not None and abs(remaining - sec) <= TIME_CORRECTION_TOLERANCE_SECONDS:
+                current.last_update = now_ts # 예상과 같음 → 확인 시각만 갱신
+                return "OK", 200, False
+            print(f"[CORRECTION] {booth} → {format_seconds(remaining) if remaining is not None else '-'} → {status_str}")
+            self._start_session(booth, sec, now_ts, journal)
+            return "OK", 200, False
+
+        return "Invalid status format", 400, False
+
+    def report(self, booth, status_str, now):
+        """
+        클라이언트 상태 보고를 원자적으로 반영합니다. (응답, 상태 코드, 대기열 배정 필요 여부)
+        허용 오차 이내의 보고는 확인 시각만 갱신하고 저널에 기록하지 않습니다.
+        """
+        if not self.admit(booth):
+            return "Unknown booth", 404, False
+        with self._lock_for(booth):
+            return self._apply_report(booth, status_str, _ts(now))
+
+    def report_batch(self, booth, samples):
+        """
+        한 타석의 상태 여러 건 [(epoch 초, 상태 문자열)] 을 시각 순서대로 한 번의 잠금 안에서 반영합니다.
+        중간 전환은 저널에 남기지 않고 마지막 상태만 한 번 기록합니다. (반영 건수, 거절된 상태 목록, 대기열 배정 필요 여부)
+        타석의 마지막 확인 시각보다 먼저 측정된 상태는 그 뒤의 보고/관리자 변경/배정을 되돌리므로 거절합니다.
+        """
+        applied, rejected, assign = 0, [], False
+        with self._lock_for(booth):
+            current = self._state(booth)
+            before = (current.status, current.end_at)
+            for sample_ts, status_str in sorted(samples, key=lambda x: x[0]):
+                if sample_ts < current.last_update:
+                    rejected.append(status_str) # 오래된 상태
+                    continue
+                body, code, needs_assign = self._apply_report(booth, status_str, sample_ts, journal=False)
+                if code != 200:
+                    rejected.append(status_str)
+                    continue
+                applied += 1
+                assign = assign or needs_assign
+            if (current.status, current.end_at) != before:
+                journal_status(booth, current)
+        return applied, rejected, assign
+
+    def assign_waiting(self, now):
+        """사용가능 타석에 대기열 앞사람을 배정합니다. 타석 상태 확인과 대기열 꺼내기를 잠금 안에서 함께 하므로
+        한 사람이 두 타석에 배정되거나 한 타석에 두 사람이 배정되지 않습니다."""
+        now_ts = _ts(now)
+        with self._index_lock:
+            candidates = self._free_times.available()
+        for booth in candidates:
+            with self._lock_for(booth):
+                if self._status[booth].status != '사용가능':
+                    continue # 그 사이 다른 요청이 먼저 사용중으로 바꿈
+                with self._queue_lock:
+                    name = self._queue.popleft() # 큐에서 바로 꺼내기
+                    if name is None:
+                        return
+                    journal_queue_remove(name)
+
+                self._start_session(booth, SESSION_SECONDS, now_ts)
+                self._assignments[booth] = {
+                    "name": name,
+                    "assigned_time": now.strftime("%Y-%m-%d %H:%M:%S")
+                }
+                journal_assignment(booth, self._assignments[booth])
+                self._ignore_since[booth] = now_ts # ✅ 무시구간 진입
+            print(f"{name} 님이 {booth} 타석에 배정되었습니다.")
+
+    def expire(self, now):
+        """종료 시각이 지난 사용중 타석을 사용가능으로 바꾸고 대기열을 배정합니다."""
+        now_ts = _ts(now)
+        with self._index_lock:
+            due = self._free_times.due(now_ts)
+        expired = False
+        for booth in due:
+            with self._lock_for(booth):
+                state = self._status[booth]
+                if state.status != '사용중' or state.end_at is None or state.end_at > now_ts:
+                    continue # 그 사이 보정/종료됨
+                self._set_available(booth, state.last_update)
+                expired = True
+            print(f"[TIMER] {booth} → 이용 시간 종료, 사용가능")
+        if expired:
+            self.assign_waiting(now)
+
+    def release(self, booth, now):
+        """관리자: 타석을 사용가능으로 (무시구간 해제)"""
+        if not self.admit(booth):
+            return False
+        with self._lock_for(booth):
+            self._set_available(booth, _ts(now))
+            self._ignore_since.pop(booth, None)
+        return True
+
+    def start(self, booth, now):
+        """관리자: 기본 이용 시간으로 사용 시작 (무시구간 진입)"""
+        if not self.admit(booth):
+            return False
+        with self._lock_for(booth):
+            self._start_session(booth, SESSION_SECONDS, _ts(now))
+            self._ignore_since[booth] = _ts(now)
+        return True
+
+    def set_status(self, booth, status, time_str, now):
+        """관리자: 상태를 받은 적이 있는 타석의 상태/남은 시간 직접 수정"""
+        with self._lock_for(booth):
+            if booth not in self._status:
+                return False
+            if status == '사용중' and time_str and ':' in time_str:
+                self._start_session(booth, time_str_to_seconds(time_str), _ts(now))
+            else:
+                self._put(booth, status, None, _ts(now))
+            return True
+
+    # --- 대기열 ---
+    def enqueue(self, name):
+        with self._queue_lock:
+            if not self._queue.append(name):
+                return False
+            journal_queue_add(name)
+            return True
+
+    def dequeue(self, name):
+        with self._queue_lock:
+            if not self._queue.remove(name):
+                return False
+            journal_queue_remove(name)
+            return True
+
+    def move(self, name, up):
+        with self._queue_lock:
+            if not (self._queue.move_up(name) if up else self._queue.move_down(name)):
+                return False
+            journal_queue_move(name, self._queue.next_of(name))
+            return True
+
+    def queue_projection(self):
+        """대기열 예상 배정 [(이름, 가린 이름, 예상 타석, 예상 종료 시각)].
+        (대기열 버전, 비는 순서 버전)이 바뀔 때만 다시 만들고, 가린 이름은 이전 결과를 재사용합니다."""
+        with self._queue_lock, self._index_lock:
+            key = (self._queue.version, self._free_times.version)
+            if key != self._projection_key:
+                names = self._queue.to_list()
+                booths = self._free_times.earliest(len(names))
+                masked = {row[0]: row[1] for row in self._projection}
+                rows = []
+                for i, name in enumerate(names):
+                    booth, end_at = booths[i] if i < len(booths) else ('-', None)
+                    rows.append((name, masked.get(name) or mask_name(name), booth, end_at))
+                self._projection_key, self._projection = key, rows
+            return self._projection
+
+    # --- 읽기 / 저장 / 복원 ---
+    def export(self):
+        """현재 상태 복사본 (frozen() 안에서 호출)"""
+        return {
+            'seq': journal_seq, # 이 번호까지의 저널 기록이 반영된 상태
+            'status_data': {k: v.copy() for k, v in self._status.items()},
+            'assignments': {k: dict(v) if v else None for k, v in self._assignments.items()},
+            'queue': self._queue.to_list()
+        }
+
+    def snapshot(self):
+        """모든 타석/대기열이 같은 시점인 상태 복사본"""
+        with self.frozen():
+            return self.export()
+
+    def restore(self, saved):
+        """스냅샷 파일 내용으로 초기화 (시작 시 1회)"""
+        with self.frozen():
+            for k, v in saved.get('status_data', {}).items():
+                if self.admit(k):
+                    self._restore_status(k, v)
+                else:
+                    print(f"[STATE] 등록되지 않은 타석 상태를 버립니다: {k}")
+            for booth, v in saved.get('assignments', {}).items():
+                if booth not in self._registry:
+                    continue
+                self._assignments[booth] = {
+                    'name': v.get('name', ''),
+                    'assigned_time': v.get('assigned_time', '')
+                } if v else None
+            # 이전 형식(대기열을 queue.json 에만 저장)과 호환
+            self._queue.reset(saved['queue'] if 'queue' in saved else load_json(QUEUE_FILE, default=[]))
+
+    def _restore_status(self, booth, v):
+        state = BoothState.from_record(v)
+        self._put(booth, state.status, state.end_at, state.last_update, journal=False)
+
+    def apply_record(self, record):
+        """저널 기록 다시 적용 (시작 시)"""
+        with self.frozen():
+            op = record.get('op')
+            if op == 'status':
+                if self.admit(record['booth']):
+                    self._restore_status(record['booth'], record)
+            elif op == 'assign':
+                if record['booth'] in self._registry:
+                    self._assignments[record['booth']] = record['value']
+            elif op == 'queue_add':
+                self._queue.append(record['name'])
+            elif op == 'queue_remove':
+                self._queue.remove(record['name'])
+            elif op == 'queue_move':
+                self._queue.place_before(record['name'], record['before'])
+            elif op == 'queue': # 이전 형식 (전체 목록)
+                self._queue.reset(record['value'])
+
+
+store = BoothStateStore(load_booth_names())
+
+# --- 상태 저장: 추가 전용 저널 + 주기적 스냅샷 ---
+# 변경 시마다 전체 상태를 다시 쓰지 않고, 바뀐 타석/배정/대기열만 한 줄씩 저널에 추가합니다.
+# 기록은 메모리에 모았다가 JOURNAL_FLUSH_SECONDS 마다 한 번에 쓰고 fsync 하며,
+# 주기적으로 전체 상태를 스냅샷(STATE_FILE)으로 저장한 뒤 저널을 비웁니다.
+# 시작 시에는 스냅샷을 읽고 그 이후의 저널 기록을 순서대로 다시 적용합니다.
+# 모든 기록은 "값 설정" 형태라 같은 기록을 두 번 적용해도 결과가 같습니다.
+journal_lock = Lock()
+journal_pending = [] # 아직 디스크에 쓰지 않은 저널 줄
+journal_seq = 0 # 마지막 저널 기록 번호
+journal_records_since_snapshot = 0
+journal_file = None
+last_snapshot_at = time.monotonic()
+
+
+def _status_record(booth, state):
+    return {'op': 'status', 'booth': booth, **state.to_record()}
+
+
+def _journal(record):
+    global journal_seq, journal_records_since_snapshot
+    with journal_lock:
+        journal_seq += 1
+        record['seq'] = journal_seq
+        journal_pending.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        journal_records_since_snapshot += 1
+    live_changed.set() # 실시간 화면 발행 스레드 깨우기
+
+
+def journal_status(booth, data):
+    """타석 상태 변경 기록"""
+    _journal(_status_record(booth, data))
+
+
+def journal_assignment(booth, value):
+    """타석 배정 변경 기록"""
+    _journal({'op': 'assign', 'booth': booth, 'value': value})
+
+
+def journal_queue_add(name):
+    """대기열 추가 기록 (전체 목록 대신 바뀐 이름만 기록)"""
+    _journal({'op': 'queue_add', 'name': name})
+
+
+def journal_queue_remove(name):
+    """대기열 삭제/배정으로 꺼냄 기록"""
+    _journal({'op': 'queue_remove', 'name': name})
+
+
+def journal_queue_move(name, before):
+    """대기열 순서 변경 기록 (바로 뒤 이름 before 앞에 두기 → 다시 적용해도 결과가 같음)"""
+    _journal({'op': 'queue_move', 'name': name, 'before': before})
 
-queue = []
 
 def load_state():
+    """스냅샷을 읽고, 스냅샷 이후의 저널 기록을 다시 적용합니다 (시작 시 1회)."""
+    global journal_seq
     saved = load_json(STATE_FILE, default={'status_data': {}, 'assignments': {}})
-    for k, v in saved.get('status_data', {}).items():
-        status_data[k] = {
-            'status': v.get('status', '사용가능'), # 기본 상태 설정
-            'time': v.get('time', '-'), # 기본 시간 설정
-            'last_update': datetime.fromisoformat(v.get('last_update', datetime.min.isoformat()))
-        }
-    for booth, v in saved.get('assignments', {}).items():
-        booth_assignments[booth] = {
-            'name': v.get('name', ''),
-            'assigned_time': v.get('assigned_time', '')
-        }
-    global queue
-    queue = load_json(QUEUE_FILE, default=[])
+    store.restore(saved)
+
+    snapshot_seq = saved.get('seq', 0)
+    journal_seq = snapshot_seq
+    replayed = 0
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"[WARN] 저널의 손상된 줄을 건너뜁니다: {line[:80]!r}") # 쓰는 도중 종료된 마지막 줄 등
+                    continue
+                if record.get('seq', 0) <= snapshot_seq:
+                    continue # 이미 스냅샷에 반영된 기록
+                store.apply_record(record)
+                journal_seq = max(journal_seq, record['seq'])
+                replayed += 1
+    print(f"[STATE] 스냅샷(seq={snapshot_seq}) + 저널 {replayed}건 적용")
+
+
+def _write_json_atomic(filename, data):
+    tmp = filename + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def _flush_journal_locked():
+    """대기 중인 저널 기록을 한 번에 쓰고 fsync (journal_lock 을 잡은 상태에서 호출)"""
+    global journal_file
+    if not journal_pending:
+        return
+    if journal_file is None:
+        journal_file = open(JOURNAL_FILE, 'a', encoding='utf-8')
+    journal_file.write('\n'.join(journal_pending) + '\n')
+    journal_file.flush()
+    os.fsync(journal_file.fileno())
+    journal_pending.clear()
+
+
+def flush_journal():
+    try:
+        with journal_lock:
+            _flush_journal_locked()
+    except Exception as e:
+        print(f"[ERROR] Failed to write journal: {e}")
+
 
 def save_state():
+    """전체 상태를 스냅샷으로 저장하고 저널을 비웁니다 (압축)."""
+    global journal_file, journal_records_since_snapshot, last_snapshot_at
     try:
-        save_data = {
-            'status_data': {
-                k: {
-                    'status': v['status'],
-                    'time': v['time'],
-                    'last_update': v['last_update'].isoformat()
-                } for k, v in status_data.items()
-            },
-            'assignments': booth_assignments # 직접 할당
-        }
-        with open(STATE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
-        with open(QUEUE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(queue, f, ensure_ascii=False, indent=2)
+        # 저장하는 동안 상태 변경을 멈춰, 스냅샷과 seq 이후 저널 기록이 정확히 이어지게 합니다.
+        with store.frozen(), journal_lock:
+            _flush_journal_locked()
+            save_data = store.export()
+            save_data['status_data'] = {k: v.to_record() for k, v in save_data['status_data'].items()}
+            _write_json_atomic(STATE_FILE, save_data)
+            _write_json_atomic(QUEUE_FILE, save_data['queue']) # 기존 queue.json 사용처 호환
+            # 스냅샷에 모두 반영되었으므로 저널 비우기
+            if journal_file is not None:
+                journal_file.close()
+            journal_file = open(JOURNAL_FILE, 'w', encoding='utf-8')
+            journal_records_since_snapshot = 0
+            last_snapshot_at = time.monotonic()
     except Exception as e:
         print(f"[ERROR] Failed to save state: {e}")
 
 
+def journal_writer_loop():
+    """저널을 주기적으로 fsync 하고, 주기/기록 수에 따라 스냅샷을 만듭니다."""
+    while True:
+        time.sleep(JOURNAL_FLUSH_SECONDS)
+        if (journal_records_since_snapshot >= SNAPSHOT_MAX_JOURNAL_RECORDS or
+                time.monotonic() - last_snapshot_at >= SNAPSHOT_INTERVAL_SECONDS):
+            save_state()
+        else:
+            flush_journal()
+
+
+def start_journal_writer():
+    Thread(target=journal_writer_loop, daemon=True).start()
+    atexit.register(save_state) # 정상 종료 시 스냅샷
+
+
 
 def get_offline_days_this_month(now: datetime):
     offline_dates = set()
@@ -143,78 +868,249 @@ def is_within_operating_hours(now: datetime):
     hrs = OPERATING_HOURS.get(key)
     return bool(hrs and hrs[0] <= now.hour < hrs[1])
 
-def assign_first_queue_to_booth():
-    updated = False
-    now = datetime.now()
-
-    for booth, status in status_data.items():
-        if status['status'] == '사용가능' and queue:
-            first_queue = queue.pop(0) # 큐에서 바로 꺼내기
-
-            status_data[booth] = {
-                'status': '사용중',
-                'time': '70:00',
-                'last_update': now
-            }
-            booth_assignments[booth] = {
-                "name": first_queue,
-                "assigned_time": now.strftime("%Y-%m-%d %H:%M:%S")
-            }
-
-            # ✅ 무시구간 진입
-            ignored_state[booth] = {
-                'in_ignore': True,
-                'start_time': now,
-                'start_remaining': 4200
-            }
-
-            print(f"{first_queue} 님이 {booth} 타석에 배정되었습니다.")
-            updated = True
 
-    if updated:
-        save_state()
-
-
-from threading import Thread
-
-
-def get_expected_booth_assignments():
-    now = datetime.now()
-    booth_remaining = []
-    for booth, data in status_data.items():
-        if data['status'] == '사용중' and ':' in data['time']:
-            try:
-                mins, secs = map(int, data['time'].split(':'))
-                remaining = mins * 60 + secs
-                booth_remaining.append((booth, remaining))
-            except:
-                continue
-        elif data['status'] == '사용가능':
-            booth_remaining.append((booth, 0))
-
-    booth_remaining.sort(key=lambda x: x[1])
+# 예상 배정 목록은 저장소가 캐시하고, 요청마다는 화면에 보일 행의 남은 대기 시간만 계산합니다.
+def get_expected_booth_assignments(limit=None):
+    now_ts = _ts(datetime.now())
+    rows = store.queue_projection()
+    if limit is not None:
+        rows = rows[:limit]
 
     assignments = []
-    for i, name in enumerate(queue):
-        if i < len(booth_remaining):
-            booth, wait_sec = booth_remaining[i]
-            assignments.append({
-                'name': name,
-                'masked_name': mask_name(name),
-                'expected_booth': booth,
-                'expected_wait': f"{wait_sec // 60:02d}:{wait_sec % 60:02d}"
-            })
+    for name, masked_name, booth, end_at in rows:
+        if booth == '-':
+            expected_wait = '-'
         else:
-            assignments.append({
-                'name': name,
-                'masked_name': mask_name(name),
-                'expected_booth': '-',
-                'expected_wait': '-'
-            })
+            wait_sec = max(0, end_at - now_ts) if end_at else 0
+            expected_wait = f"{wait_sec // 60:02d}:{wait_sec % 60:02d}"
+        assignments.append({
+            'name': name,
+            'masked_name': masked_name,
+            'expected_booth': booth,
+            'expected_wait': expected_wait
+        })
     return assignments
 
+
+def booth_display(state, now, offline_today):
+    """화면 표시용 (상태, 종료 시각). 확인이 끊긴 타석은 휴무일/운영 시간에 따라 사용가능 또는 OFFLINE"""
+    if _ts(now) - state.last_update > OFFLINE_THRESHOLD_SECONDS:
+        if not offline_today and is_within_operating_hours(now):
+            return '사용가능', None
+        return 'OFFLINE', None
+    return state.status, state.end_at if state.status == '사용중' else None
+
+
+# --- 실시간 대시보드 (Server-Sent Events) ---
+# 화면마다 /status 를 새로고침해 같은 계산을 반복하지 않도록, 발행 스레드가 화면용 상태를 한 번 만들고
+# 직렬화한 스냅샷/변경분(delta)을 모든 구독자에게 그대로 나눠 보냅니다.
+# 남은 시간은 종료 시각(epoch ms)으로 보내 화면에서 직접 줄이므로, 타석/대기열이 바뀔 때만 delta 가 생깁니다.
+# 저널 기록 시 live_changed 로 발행 스레드를 깨우고, 오프라인 판단처럼 시간이 지나 바뀌는 값은
+# LIVE_REFRESH_SECONDS 마다 다시 확인합니다.
+live_cond = Condition()
+live_changed = Event()
+live_version = 0
+live_view = {'booths': {}, 'queue': []} # 마지막으로 발행한 화면용 상태 (발행 스레드만 갱신)
+live_deltas = deque(maxlen=LIVE_DELTA_HISTORY) # (버전, 직렬화된 delta 메시지)
+live_subscribers = 0
+LIVE_BOOT_ID = os.urandom(4).hex() # 프로세스마다 다른 값. 재시작 전 이벤트 id 로 재연결하면 스냅샷부터 보냄
+
+
+def _epoch_ms(value):
+    """datetime 또는 epoch 초 → epoch ms"""
+    if not value:
+        return None
+    return int((value.timestamp() if isinstance(value, datetime) else value) * 1000)
+
+
+def _sse(event, payload, event_id=None):
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    prefix = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{prefix}event: {event}\ndata: {data}\n\n"
+
+
+def _event_id(version):
+    return f"{LIVE_BOOT_ID}:{version}"
+
+
+def _parse_event_id(last_id):
+    """Last-Event-ID → 이 프로세스의 버전 (다른 프로세스의 id 이거나 형식이 틀리면 None)"""
+    boot_id, _, version = last_id.partition(':')
+    return int(version) if boot_id == LIVE_BOOT_ID and version.isdigit() else None
+
+
+live_snapshot_msg = _sse('snapshot', {'v': 0, **live_view}, _event_id(0))
+
+
+def build_live_view(now):
+    """화면용 상태: 타석별 {s: 상태, end: 종료 시각}, 대기열 [{n: 가린 이름, b: 예상 타석, end: 예상 시각}]"""
+    offline_today = now.date() in get_offline_days_this_month(now)
+    status_data = store.snapshot()['status_data']
+    booths = {}
+    for name in sorted(status_data):
+        st, end_at = booth_display(status_data[name], now, offline_today)
+        booths[name] = {'s': st, 'end': _epoch_ms(end_at)}
+
+    queue_view = [{'n': masked_name, 'b': booth, 'end': _epoch_ms(end_at)}
+                  for _, masked_name, booth, end_at in store.queue_projection()]
+    return {'booths': booths, 'queue': queue_view}
+
+
+def publish_live_view(now=None):
+    """화면용 상태를 다시 만들고, 달라진 부분이 있으면 delta/스냅샷을 한 번만 직렬화해 구독자에게 알립니다."""
+    global live_version, live_view, live_snapshot_msg
+    view = build_live_view(now or datetime.now())
+    delta = {}
+    changed = {b: v for b, v in view['booths'].items() if live_view['booths'].get(b) != v}
+    if changed:
+        delta['booths'] = changed
+    if view['queue'] != live_view['queue']:
+        delta['queue'] = view['queue']
+    if not delta:
+        return False
+
+    with live_cond:
+        live_version += 1
+        live_view = view
+        live_snapshot_msg = _sse('snapshot', {'v': live_version, **view}, _event_id(live_version))
+        live_deltas.append((live_version, _sse('delta', {'v': live_version, **delta}, _event_id(live_version))))
+        live_cond.notify_all()
+    return True
+
+
+def live_publisher_loop():
+    while True:
+        if live_changed.wait(LIVE_REFRESH_SECONDS):
+            time.sleep(0.1) # 한 요청에서 이어지는 변경(배정 + 대기열 등)을 한 번에 발행
+        live_changed.clear()
+        try:
+            expire_finished_sessions()
+            publish_live_view()
+        except Exception as e:
+            print(f"[ERROR] Failed to publish live view: {e}")
+
+
+def start_live_publisher():
+    publish_live_view()
+    Thread(target=live_publisher_loop, daemon=True).start()
+
+
+def _live_messages(version):
+    """version 이후 구독자에게 보낼 메시지 (live_cond 를 잡은 상태에서 호출)"""
+    if version == live_version:
+        return ': keepalive\n\n'
+    if (version is None or version > live_version or
+            not live_deltas or live_deltas[0][0] > version + 1):
+        # 첫 연결, 서버 재시작(다른 부트 id), 놓친 delta 가 보관 범위를 넘은 경우 → 전체 스냅샷
+        return live_snapshot_msg
+    return ''.join(msg for v, msg in live_deltas if v > version)
+
+
+@app.route('/status/stream')
+def status_stream():
+    """실시간 대시보드 구독 (text/event-stream). 처음에 스냅샷, 이후 변경분만 보냅니다."""
+    global live_subscribers
+    with live_cond:
+        if live_subscribers >= LIVE_MAX_SUBSCRIBERS:
+            return "Too many live viewers", 503 # 화면은 새로고침 방식으로 대체
+        live_subscribers += 1
+    version = _parse_event_id(request.headers.get('Last-Event-ID', ''))
+
+    def stream(version):
+        global live_subscribers
+        try:
+            # 남은 시간 계산용 서버 시각 (화면 시계 오차 보정)
+            yield f"retry: 3000\nevent: clock\ndata: {_epoch_ms(datetime.now())}\n\n"
+            while True:
+                with live_cond:
+                    live_cond.wait_for(lambda: live_version != version, timeout=LIVE_KEEPALIVE_SECONDS)
+                    message = _live_messages(version)
+                    version = live_version
+                yield message
+        finally:
+            with live_cond:
+                live_subscribers -= 1
+
+    return Response(stream(version), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# dashboard.html 에서 <script src="/status/live.js"></script> 로 불러 씁니다.
+# 타석: data-booth="이름" 요소 안의 data-field="status" / data-field="time" 을 갱신하고 data-status 속성을 바꿉니다.
+# 대기열: id="live-queue" 요소(tbody)의 행을 다시 그립니다 (순번, 이름, 예상 타석, 예상 대기).
+LIVE_JS = """(function () {
+  var offset = 0, booths = {}, queue = [];
+  function pad(n) { return (n < 10 ? '0' : '') + n; }
+  function fmt(end) {
+    var s = Math.max(0, Math.floor((end - (Date.now() + offset)) / 1000));
+    return pad(Math.floor(s / 60)) + ':' + pad(s % 60);
+  }
+  function boothEl(name) {
+    var els = document.querySelectorAll('[data-booth]');
+    for (var i = 0; i < els.length; i++) if (els[i].getAttribute('data-booth') === name) return els[i];
+    return null;
+  }
+  function tick() {
+    for (var name in booths) {
+      var el = boothEl(name), t = el && el.querySelector('[data-field="time"]');
+      if (t) t.textContent = booths[name].end ? fmt(booths[name].end) : '-';
+    }
+    var waits = document.querySelectorAll('#live-queue [data-field="wait"]');
+    for (var i = 0; i < waits.length && i < queue.length; i++)
+      waits[i].textContent = queue[i].b === '-' ? '-' : (queue[i].end ? fmt(queue[i].end) : '00:00');
+  }
+  function renderBooth(name) {
+    var el = boothEl(name);
+    if (!el) return;
+    el.setAttribute('data-status', booths[name].s);
+    var s = el.querySelector('[data-field="status"]');
+    if (s) s.textContent = booths[name].s;
+  }
+  function renderQueue() {
+    var box = document.getElementById('live-queue');
+    if (!box) return;
+    box.textContent = '';
+    queue.forEach(function (q, i) {
+      var tr = document.createElement('tr');
+      [i + 1, q.n, q.b, ''].forEach(function (v, j) {
+        var td = document.createElement('td');
+        td.textContent = v;
+        if (j === 3) td.setAttribute('data-field', 'wait');
+        tr.appendChild(td);
+      });
+      box.appendChild(tr);
+    });
+  }
+  function apply(data, full) {
+    if (full) booths = {};
+    for (var name in data.booths || {}) { booths[name] = data.booths[name]; renderBooth(name); }
+    if (data.queue) { queue = data.queue; renderQueue(); }
+    tick();
+  }
+  var es = new EventSource('/status/stream');
+  es.addEventListener('clock', function (e) { offset = Number(e.data) - Date.now(); });
+  es.addEventListener('snapshot', function (e) { apply(JSON.parse(e.data), true); });
+  es.addEventListener('delta', function (e) { apply(JSON.parse(e.data), false); });
+  es.onerror = function () {
+    // 연결 수 초과(503) 등으로 재연결을 멈추면 예전처럼 주기적으로 새로고침
+    if (es.readyState === 2) setTimeout(function () { location.reload(); }, 30000);
+  };
+  setInterval(tick, 1000);
+})();
+"""
+
+
+@app.route('/status/live.js')
+def status_live_js():
+    return Response(LIVE_JS, mimetype='application/javascript', headers={'Cache-Control': 'max-age=3600'})
+
 @app.route('/update', methods=['POST'])
 def update():
+    """
+    클라이언트 상태 보고. 남은 시간은 서버가 종료 시각으로 계산하므로 클라이언트는
+    전환(사용가능/사용중), 남은 시간 보정, 주기적 확인(heartbeat)만 보내면 됩니다.
+    허용 오차 이내의 보고는 확인 시각만 갱신하고 저널에 기록하지 않습니다.
+    """
     data = request.get_json() or {}
     booth = data.get('booth')
     status_str = data.get('status')
@@ -222,146 +1118,65 @@ def update():
     if not booth or status_str is None:
         return "Invalid data", 400
 
-    now = datetime.now()
-    last_update = status_data[booth]['last_update']
-    time_since_update = (now - last_update).total_seconds()
-
-    booth_time_str = status_data[booth]['time']
-    booth_seconds = time_str_to_seconds(booth_time_str)
-    remaining_seconds = booth_seconds - int(time_since_update)
-
-    ignore = ignored_state[booth]
-
-    if ignore['in_ignore']:
-        elapsed = (now - ignore['start_time']).total_seconds()
-
-        # 정상값 (00:01~70:00) 수신 시 무시구간 탈출
-        if ':' in status_str:
-            try:
-                sec = time_str_to_seconds(status_str)
-                if 1 <= sec <= 4200:
-                    print(f"[EXIT IGNORED] {booth} → 정상값 수신")
-                    ignored_state[booth] = {'in_ignore': False, 'start_time': None, 'start_remaining': None}
-                    status_data[booth] = {
-                        'status': '사용중',
-                        'time': status_str,
-                        'last_update': now
-                    }
-                    save_state()
-                    return "OK", 200
-            except:
-                pass
-
-        # 시간 경과에 의한 무시구간 탈출
-        if elapsed >= WAIT_BEFORE_ENFORCE_CLIENT_SECONDS:
-            print(f"[EXIT IGNORED] {booth} → 시간 경과")
-            ignored_state[booth] = {'in_ignore': False, 'start_time': None, 'start_remaining': None}
-            return "OK", 200
-        else:
-            # 여전히 무시 중 → 시간만 표시 갱신
-            remaining = max(0, ignore['start_remaining'] - int(elapsed))
-            mins, secs = divmod(remaining, 60)
-            status_data[booth]['time'] = f"{mins:02d}:{secs:02d}"
-            save_state()
-            print(f"[IGNORED] {booth} → {status_str} (무시구간 중)")
-            return "IGNORED", 200
-
-    if status_str == "DECREASE":
-        # 기존 남은 시간 가져오기
-        old_time_str = status_data[booth]['time']
-        old_sec = time_str_to_seconds(old_time_str)
-        try:
-            interval = int(data.get('interval', 3))
-        except (ValueError, TypeError):
-            print(f"[ERROR] Invalid interval value from client: {data.get('interval')} ({e})")
-            return "Invalid interval", 400
-
-
-        new_sec = max(0, old_sec - interval)
-
-        if new_sec == 0:
-            # 시간이 0이면 사용가능 처리 + 큐 자동 배정
-            status_data[booth] = {
-                'status': '사용가능',
-                'time': '-',
-                'last_update': now
-            }
-            assign_first_queue_to_booth()
-            print(f"[DECREASE → 사용가능] {booth} → {old_time_str} → 00:00")
-        else:
-            mins, secs = divmod(new_sec, 60)
-            new_time_str = f"{mins:02d}:{secs:02d}"
-            status_data[booth] = {
-                'status': '사용중',
-                'time': new_time_str,
-                'last_update': now
-            }
-            print(f"[DECREASE] {booth} → {old_time_str} → {new_time_str}")
-
-        save_state()
-        return "OK", 200
-
-
-
-    if status_str == "00:00":
-        ignore = ignored_state[booth]
-        if ignore['in_ignore']:
-            elapsed_since_ignore = (now - ignore['start_time']).total_seconds()
-            if elapsed_since_ignore < WAIT_BEFORE_ENFORCE_CLIENT_SECONDS:
-                print(f"[IGNORED] {booth} → 00:00 (무시구간 타이머 내)")
-                return "IGNORED", 200
-            else:
-                print(f"[EXIT IGNORED] {booth} → 00:00 수신, 시간 경과")
-                ignored_state[booth] = {'in_ignore': False, 'start_time': None, 'start_remaining': None}
-        # 무시구간이 아니거나 시간이 충분히 경과함 → 사용가능 처리
-        status_data[booth] = {
-            'status': '사용가능',
-            'time': '-',
-            'last_update': now
-        }
-        save_state()
-        return "OK", 200
+    if not store.admit(booth):
+        return "Unknown booth", 404 # 등록되지 않은 타석 (상태를 만들지 않음)
 
-
-    # 기본 처리
-    if ':' in status_str and status_str.replace(':', '').isdigit():
-        status_data[booth] = {'status': '사용중', 'time': status_str, 'last_update': now}
-    elif status_str == '사용가능':
-        status_data[booth] = {'status': '사용가능', 'time': '-', 'last_update': now}
+    now = datetime.now()
+    expire_finished_sessions(now)
+    body, code, assign = store.report(booth, status_str, now)
+    if assign:
         assign_first_queue_to_booth()
-    else:
-        return "Invalid status format", 400
-
-    if status_data[booth]['status'] == '사용가능' and status_data[booth]['time'] != '-':
-        status_data[booth]['time'] = '-'
+    return body, code
 
-    save_state()
-    return "OK", 200
 
+@app.route('/update/batch', methods=['POST'])
+def update_batch():
+    """
+    상태 여러 건을 한 번에 받습니다 (네트워크가 느릴 때 클라이언트가 모아 보냄).
+    {"booth": 이름, "sent_at": 보낸 시각, "samples": [{"status": 상태, "at": 측정 시각}, ...]}
+    시각은 클라이언트 시계 기준 epoch 초이며, 서버는 보낸 시각과의 차이만 사용하므로 시계가 어긋나도 됩니다.
+    """
+    data = request.get_json(silent=True) or {}
+    booth = data.get('booth')
+    samples = data.get('samples')
+    sent_at = data.get('sent_at')
+    if not booth or not isinstance(samples, list) or not isinstance(sent_at, (int, float)):
+        return "Invalid data", 400
+    if len(samples) > MAX_BATCH_SAMPLES:
+        return "Too many samples", 413
+    if not store.admit(booth):
+        return "Unknown booth", 404
 
+    now = datetime.now()
+    now_ts = _ts(now)
+    parsed = []
+    for sample in samples:
+        if not isinstance(sample, dict) or not isinstance(sample.get('status'), str) \
+                or not isinstance(sample.get('at'), (int, float)):
+            return "Invalid sample", 400
+        age = min(max(0, sent_at - sample['at']), MAX_SAMPLE_AGE_SECONDS) # 측정 후 지난 시간 (비정상 값 제한)
+        parsed.append((now_ts - int(age), sample['status']))
+
+    expire_finished_sessions(now)
+    applied, rejected, assign = store.report_batch(booth, parsed)
+    if assign:
+        assign_first_queue_to_booth()
+    return jsonify({'applied': applied, 'rejected': rejected})
 
 
 @app.route('/status')
 def status():
     now = datetime.now()
+    expire_finished_sessions(now)
     today = now.date()
     offline_days = get_offline_days_this_month(now)
 
+    status_data = store.snapshot()['status_data']
     processed = {}
-    for name in sorted(status_data.keys()):
+    for name in sorted(status_data):
         d = status_data[name]
-        diff = (now - d['last_update']).total_seconds()
-        if diff > OFFLINE_THRESHOLD_SECONDS:
-            if today in offline_days:
-                st = 'OFFLINE'
-            elif is_within_operating_hours(now):
-                st = '사용가능'
-            else:
-                st = 'OFFLINE'
-            tm = '-'
-        else:
-            st, tm = d['status'], d['time']
-        processed[name] = {'status': st, 'time': tm}
+        st, end_at = booth_display(d, now, today in offline_days)
+        processed[name] = {'status': st, 'time': display_time(d, _ts(now)) if end_at else '-'}
 
     expected_assignments = get_expected_booth_assignments()
     msg = request.args.get('msg')  # ✅ 메시지 코드 받기
@@ -382,21 +1197,18 @@ def home():
 @app.route('/queue', methods=['POST'])
 def join_queue():
     name = request.form.get('name', '').strip()
-    if name in queue:
+    if name and not store.enqueue(name):
         return redirect(url_for('status', msg='already'))
     if name:
-        queue.append(name)
+        expire_finished_sessions()
         assign_first_queue_to_booth() 
-        save_state()
     return redirect(url_for('status', msg='joined'))
 
 
 @app.route('/cancel', methods=['POST'])
 def cancel_queue():
     name = request.form.get('name', '').strip()
-    if name in queue:
-        queue.remove(name)
-        save_state()
+    store.dequeue(name)
     return redirect(url_for('status'))
 
 
@@ -404,8 +1216,9 @@ def cancel_queue():
 
 @app.route("/admin", methods=["GET", "POST"])
 def admin():
-    load_state()  # 항상 최신 상태를 반영
-    global queue, status_data, booth_assignments
+    # 메모리의 현재 상태를 그대로 사용 (디스크에서 다시 읽지 않음)
+    now = datetime.now()
+    expire_finished_sessions(now)
 
     if request.method == "POST":
         action = request.form.get("action")
@@ -415,39 +1228,32 @@ def admin():
         time_str = request.form.get("time")
 
         if action == "add" and name:
-            if name not in queue:
-                queue.append(name)
-        elif action == "remove" and name in queue:
-            queue.remove(name)
-        elif action == "up" and name in queue:
-            idx = queue.index(name)
-            if idx > 0:
-                queue[idx], queue[idx - 1] = queue[idx - 1], queue[idx]
-        elif action == "down" and name in queue:
-            idx = queue.index(name)
-            if idx < len(queue) - 1:
-                queue[idx], queue[idx + 1] = queue[idx + 1], queue[idx]
-        elif action == "update_booth" and booth in status_data:
-            status_data[booth]['status'] = status
-            status_data[booth]['time'] = time_str
-            status_data[booth]['last_update'] = datetime.now()
-
-        save_state()
+            store.enqueue(name)
+        elif action == "remove" and name:
+            store.dequeue(name)
+        elif action in ("up", "down") and name:
+            store.move(name, up=(action == "up"))
+        elif action == "update_booth" and booth:
+            store.set_status(booth, status, time_str, now)
         return redirect("/admin")
 
-    # GET 요청 처리
+    # GET 요청 처리 (모든 타석/대기열이 같은 시점인 복사본 사용)
+    state = store.snapshot()
+    status_data = state['status_data']
     booth_data = {
         booth: {
-            'status': status_data[booth]['status'],
-            'time': status_data[booth]['time'],
-            'last_update': status_data[booth]['last_update'].strftime('%Y-%m-%d %H:%M:%S')
+            'status': status_data[booth].status,
+            'time': display_time(status_data[booth], _ts(now)),
+            'last_update': datetime.fromtimestamp(status_data[booth].last_update).strftime('%Y-%m-%d %H:%M:%S')
+                           if status_data[booth].last_update else '-'
+
         }
         for booth in sorted(status_data)
     }
 
     # ✅ 최근 배정 5개만 추출
     recent_assignments = sorted(
-        [(booth, info) for booth, info in booth_assignments.items() if info and info.get('assigned_time')],
+        [(booth, info) for booth, info in state['assignments'].items() if info and info.get('assigned_time')],
         key=lambda x: x[1]['assigned_time'],
         reverse=True
     )[:5]
@@ -463,7 +1269,7 @@ def admin():
     return render_template(
         "admin.html",
         booths=booth_data,
-        queue=queue,
+        queue=state['queue'],
         booth_assignments=dict(recent_assignments)  # ✅ 최신 5개만 넘김
     )
 
@@ -477,32 +1283,9 @@ def admin_update():
 
     if booth and new_status:
         if new_status == '사용가능':
-            status_data[booth] = {
-                'status': '사용가능',
-                'time': '-',
-                'last_update': now
-            }
-            # ✅ 무시구간 해제
-            ignored_state[booth] = {
-                'in_ignore': False,
-                'start_time': None,
-                'start_remaining': None
-            }
-
+            store.release(booth, now) # ✅ 무시구간 해제
         elif new_status == '사용중':
-            status_data[booth] = {
-                'status': '사용중',
-                'time': '70:00',
-                'last_update': now
-            }
-            # ✅ 무시구간 진입
-            ignored_state[booth] = {
-                'in_ignore': True,
-                'start_time': now,
-                'start_remaining': 4200
-            }
-
-        save_state()
+            store.start(booth, now) # ✅ 무시구간 진입
 
     return redirect(url_for('admin'))
 
@@ -510,4 +1293,6 @@ def admin_update():
 
 if __name__ == '__main__':
     load_state()
-    serve(app, host='0.0.0.0', port=5000)
+    start_journal_writer()
+    start_live_publisher()
+    serve(app, host='0.0.0.0', port=5000, threads=SERVER_THREADS)
@@ -5,6 +5,7 @@ from flask.cli import with_appcontext # 데코레이터 임포트 추가
 from app import create_app, db # app/__init__.py 에서 create_app 함수와 db 객체 가져오기
 from app.models import User, Pro, Booth
 from app.models.enums import BoothSystemType, BoothStatus
+from app.services.reference_cache import bump_reference_version
 
 # .env 파일 로드 (config.py에서도 로드하지만, 여기서도 명시적으로 로드 가능)
 from dotenv import load_dotenv
@@ -56,6 +57,8 @@ def init_booths_command():
             db.session.add(new_booth)
             created_count += 1
 
+        if created_count:
+            bump_reference_version() # 타석 선택지 캐시 갱신
         db.session.commit() # 모든 추가 작업 후 한번에 커밋
         print(f"초기 타석 데이터 생성 완료: {created_count}개 생성, {skipped_count}개 건너<0xEB><0x9C><0x89> (이미 존재).")
 
@@ -97,5 +100,205 @@ def init_admin_command():
         print(f"초기 관리자 계정 생성 중 오류 발생: {e}")
 # --- ▲ 초기 관리자 생성 CLI 명령어 끝 ▲ ---
 
+# --- ▼ 지난 예약 상태 일괄 처리 CLI 명령어 ▼ ---
+@app.cli.command('sweep-bookings')
+@click.option('--status', 'status_name', type=click.Choice(['completed', 'no_show']), default='completed',
+              help='지난 예약을 변경할 상태 (기본: completed)')
+@click.option('--grace-minutes', type=int, default=None, help='종료 후 유예 시간(분). 기본값은 BOOKING_SWEEP_GRACE_MINUTES 설정')
+@click.option('--chunk-size', type=int, default=1000, help='한 번에 UPDATE 할 예약 수')
+@with_appcontext
+def sweep_bookings_command(status_name, grace_minutes, chunk_size):
+    """종료 시간이 지난 '예약 확정' 예약을 이용 완료(또는 노쇼)로 일괄 변경합니다."""
+    from app.services.booking_sweeper import sweep_past_bookings
+    from app.models.enums import BookingStatus
+
+    new_status = BookingStatus.NO_SHOW if status_name == 'no_show' else BookingStatus.COMPLETED
+    if grace_minutes is None:
+        grace_minutes = app.config.get('BOOKING_SWEEP_GRACE_MINUTES', 30)
+    try:
+        changed, elapsed = sweep_past_bookings(grace_minutes=grace_minutes, new_status=new_status, chunk_size=chunk_size)
+        print(f"지난 예약 처리 완료: {changed}건 '{new_status.value}' 처리 ({elapsed:.2f}초)")
+    except Exception as e:
+        print(f"지난 예약 처리 중 오류 발생: {e}")
+# --- ▲ 지난 예약 상태 일괄 처리 CLI 명령어 끝 ▲ ---
+
+# --- ▼ 만료 이용권 일괄 처리 CLI 명령어 (매일 밤 cron 등으로 실행) ▼ ---
+@app.cli.command('expire-tickets')
+@with_appcontext
+def expire_tickets_command():
+    """만료일이 지난 이용권을 만료 처리하고 회원 최종 만료일을 다시 계산합니다."""
+    import time
+    from app.services.ticket_service import expire_overdue_tickets
+
+    started = time.perf_counter()
+    try:
+        expired, users = expire_overdue_tickets()
+        print(f"만료 처리 완료: 이용권 {expired}개, 회원 {users}명 최종 만료일 재계산 ({time.perf_counter() - started:.2f}초)")
+    except Exception as e:
+        print(f"만료 이용권 처리 중 오류 발생: {e}")
+# --- ▲ 만료 이용권 일괄 처리 CLI 명령어 끝 ▲ ---
+
+# --- ▼ 이용권 일괄 발급 CLI 명령어 ▼ ---
+@app.cli.command('bulk-issue-tickets')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='검증만 하고 저장하지 않습니다.')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), default=None, help='오류 행 보고서(CSV) 저장 경로')
+@with_appcontext
+def bulk_issue_tickets_command(csv_path, dry_run, report_path):
+    """CSV(phone,template,start_date,price,memo)로 이용권을 일괄 발급합니다."""
+    import csv
+    import time
+    from app.services.ticket_service import bulk_issue_tickets, read_bulk_issue_csv
+
+    started = time.perf_counter()
+    try:
+        with open(csv_path, 'rb') as f:
+            rows = read_bulk_issue_csv(f.read())
+        issued, errors = bulk_issue_tickets(rows, dry_run=dry_run)
+    except Exception as e:
+        print(f"이용권 일괄 발급 중 오류 발생: {e}")
+        return
+
+    label = "발급 가능 (dry-run, 저장 안 함)" if dry_run else "발급 완료"
+    print(f"{label}: {issued}건, 오류: {len(errors)}건 ({time.perf_counter() - started:.2f}초)")
+    if report_path:
+        with open(report_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=['line', 'phone', 'error'])
+            writer.writeheader()
+            writer.writerows(errors)
+        print(f"오류 보고서 저장: {report_path}")
+    else:
+        for error in errors[:20]:
+            print(f"  {error['line']}행 ({error['phone']}): {error['error']}")
+        if len(errors) > 20:
+            print(f"  ... 외 {len(errors) - 20}건 (--report 로 전체 저장)")
+# --- ▲ 이용권 일괄 발급 CLI 명령어 끝 ▲ ---
+
+# --- ▼ 회원 CSV 가져오기/내보내기 CLI 명령어 ▼ ---
+@app.cli.command('import-members')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', default=1000, show_default=True, help='청크(커밋) 단위 행 수')
+@click.option('--resume', is_flag=True, help='체크포인트 파일(<csv_path>.progress)의 줄 번호 다음부터 이어서 가져옵니다.')
+@click.option('--encoding', default='utf-8-sig', show_default=True, help='CSV 인코딩 (엑셀 저장 파일은 cp949 일 수 있음)')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), default=None, help='오류 행 보고서(CSV) 저장 경로')
+@with_appcontext
+def import_members_command(csv_path, chunk_size, resume, encoding, report_path):
+    """기존 POS 회원 CSV(name,phone,memo)를 청크 단위로 가져옵니다. 초기 비밀번호는 0000 입니다."""
+    import csv
+    import time
+    from app.services.user_service import iter_member_import
+
+    checkpoint_path = f"{csv_path}.progress"
+    skip_until_line = 0
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            skip_until_line = int(f.read().strip() or 0)
+        print(f"{skip_until_line}행까지 처리된 체크포인트에서 이어서 가져옵니다.")
+
+    started = time.perf_counter()
+    imported_total, all_errors = 0, []
+    try:
+        with open(csv_path, newline='', encoding=encoding) as stream: # 한 줄씩 읽음 (파일 전체를 올리지 않음)
+            for imported, errors, last_line in iter_member_import(stream, chunk_size=chunk_size, skip_until_line=skip_until_line):
+                imported_total += imported
+                all_errors.extend(errors)
+                with open(checkpoint_path, 'w') as f: # 커밋된 청크까지 기록 (실패 시 --resume 으로 재개)
+                    f.write(str(last_line))
+                print(f"  {last_line}행까지 처리: 누적 {imported_total}명")
+    except Exception as e:
+        print(f"회원 가져오기 중 오류 발생 (--resume 으로 이어서 실행 가능): {e}")
+        return
+
+    if os.path.exists(checkpoint_path): # 완료 시 체크포인트 삭제
+        os.remove(checkpoint_path)
+    print(f"회원 가져오기 완료: {imported_total}명, 오류 {len(all_errors)}건 ({time.perf_counter() - started:.2f}초)")
+    if report_path:
+        with open(report_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=['line', 'phone', 'error'])
+            writer.writeheader()
+            writer.writerows(all_errors)
+        print(f"오류 보고서 저장: {report_path}")
+    else:
+        for error in all_errors[:20]:
+            print(f"  {error['line']}행 ({error['phone']}): {error['error']}")
+        if len(all_errors) > 20:
+            print(f"  ... 외 {len(all_errors) - 20}건 (--report 로 전체 저장)")
+
+
+@app.cli.command('export-members')
+@click.argument('csv_path', type=click.Path(dir_okay=False))
+@with_appcontext
+def export_members_command(csv_path):
+    """전체 회원을 CSV 로 내보냅니다 (yield_per 로 나눠 읽음)."""
+    from app.services.user_service import iter_member_csv
+
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in iter_member_csv():
+            f.write(chunk)
+    print(f"회원 내보내기 완료: {csv_path}")
+# --- ▲ 회원 CSV 가져오기/내보내기 CLI 명령어 끝 ▲ ---
+
+# --- ▼ 정산용 내보내기 CLI 명령어 ▼ ---
+def _write_export(output_path, chunks):
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+@app.cli.command('export-bookings')
+@click.argument('output_path', type=click.Path(dir_okay=False))
+@click.option('--from', 'date_from', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='시작일 (YYYY-MM-DD)')
+@click.option('--to', 'date_to', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='종료일 (YYYY-MM-DD, 포함)')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv', show_default=True)
+@with_appcontext
+def export_bookings_command(output_path, date_from, date_to, fmt):
+    """기간 내 예약 내역(회원/타석/프로/사용 이용권 포함)을 CSV 또는 JSON Lines 로 내보냅니다."""
+    import time
+    from app.services.export_service import booking_export_rows, stream_export, BOOKING_EXPORT_COLUMNS
+
+    started = time.perf_counter()
+    rows = booking_export_rows(date_from=date_from.date() if date_from else None,
+                               date_to=date_to.date() if date_to else None)
+    _write_export(output_path, stream_export(BOOKING_EXPORT_COLUMNS, rows, fmt))
+    print(f"예약 내역 내보내기 완료: {output_path} ({time.perf_counter() - started:.2f}초)")
+
+
+@app.cli.command('export-tickets')
+@click.argument('output_path', type=click.Path(dir_okay=False))
+@click.option('--from', 'date_from', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='발급 시작일 (YYYY-MM-DD)')
+@click.option('--to', 'date_to', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='발급 종료일 (YYYY-MM-DD, 포함)')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv', show_default=True)
+@with_appcontext
+def export_tickets_command(output_path, date_from, date_to, fmt):
+    """발급일 기준 기간의 이용권 판매 내역(가격 포함)을 CSV 또는 JSON Lines 로 내보냅니다."""
+    import time
+    from app.services.export_service import ticket_export_rows, stream_export, TICKET_EXPORT_COLUMNS
+
+    started = time.perf_counter()
+    rows = ticket_export_rows(date_from=date_from.date() if date_from else None,
+                              date_to=date_to.date() if date_to else None)
+    _write_export(output_path, stream_export(TICKET_EXPORT_COLUMNS, rows, fmt))
+    print(f"이용권 판매 내역 내보내기 완료: {output_path} ({time.perf_counter() - started:.2f}초)")
+# --- ▲ 정산용 내보내기 CLI 명령어 끝 ▲ ---
+
+# --- ▼ 일별 집계 재계산 CLI 명령어 ▼ ---
+@app.cli.command('rebuild-daily-stats')
+@click.option('--from', 'date_from', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='시작일 (YYYY-MM-DD, 없으면 전체)')
+@click.option('--to', 'date_to', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='종료일 (YYYY-MM-DD, 포함)')
+@with_appcontext
+def rebuild_daily_stats_command(date_from, date_to):
+    """예약/이용권 원본에서 daily_stats 일별 집계를 다시 계산합니다 (최초 도입 시 또는 보정용)."""
+    import time
+    from app.services.stats_service import rebuild_daily_stats
+
+    started = time.perf_counter()
+    try:
+        created = rebuild_daily_stats(date_from=date_from.date() if date_from else None,
+                                      date_to=date_to.date() if date_to else None)
+        print(f"일별 집계 재계산 완료: {created}행 ({time.perf_counter() - started:.2f}초)")
+    except Exception as e:
+        print(f"일별 집계 재계산 중 오류 발생: {e}")
+# --- ▲ 일별 집계 재계산 CLI 명령어 끝 ▲ ---
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
\ No newline at end of file